@@ -0,0 +1,76 @@
+# benchmarks/bench_box_packing.py
+"""혼합 주문 박스 분할 벤치마크 - 한 달치 합성 주문
+
+실행: python -m benchmarks.bench_box_packing
+"""
+import random
+import time
+
+import pandas as pd
+
+from core.boxes import (
+    calculate_box_requirements, pack_quantity_vector, _pack_single_capacity
+)
+
+# 실제 출고내역서와 같은 형식의 옵션 문자열
+OPTION_SAMPLES = [
+    ("[서로 단호박식혜]", "단호박식혜 1.5L 2병"),
+    ("[서로 단호박식혜]", "용량 : 1L 2병"),
+    ("[서로 단호박식혜]", "5개, 240ml"),
+    ("[서로 진하고 깊은 식혜]", "식혜 1.5L 3병"),
+    ("[서로 진하고 깊은 식혜]", "4, 1L"),
+    ("[서로 진하고 깊은 식혜]", "10개, 240ml"),
+    ("[서로 수정과]", "500ml 3병"),
+    ("[서로 수정과]", "10개, 500ml"),
+    ("[서로 플레인 쌀요거트]", "플레인 쌀요거트 1L"),
+    ("[서로 플레인 쌀요거트]", "5개, 200ml"),
+]
+
+
+def make_synthetic_month(days=30, orders_per_day=400, seed=42):
+    """일자별 합성 주문 DataFrame 목록 생성"""
+    rng = random.Random(seed)
+    month = []
+    for day in range(days):
+        rows = []
+        for recipient_id in range(orders_per_day):
+            recipient = f"수취인{day:02d}-{recipient_id:04d}"
+            # 대부분 단일 상품, 일부는 2~3개 상품이 섞인 주문
+            line_count = rng.choices([1, 2, 3], weights=[70, 22, 8])[0]
+            for product_name, option_name in rng.sample(OPTION_SAMPLES, line_count):
+                rows.append({
+                    '상품이름': product_name,
+                    '옵션이름': option_name,
+                    '상품수량': rng.choices([1, 2, 3], weights=[80, 15, 5])[0],
+                    '수취인이름': recipient,
+                })
+        month.append(pd.DataFrame(rows))
+    return month
+
+
+def run():
+    month = make_synthetic_month()
+    total_rows = sum(len(df) for df in month)
+
+    pack_quantity_vector.cache_clear()
+    _pack_single_capacity.cache_clear()
+
+    review_count = 0
+    box_count = 0
+    start = time.perf_counter()
+    for df in month:
+        total_boxes, review_orders = calculate_box_requirements(df)
+        review_count += len(review_orders)
+        box_count += sum(total_boxes.values())
+    elapsed = time.perf_counter() - start
+
+    cache_info = pack_quantity_vector.cache_info()
+    print(f"주문 행: {total_rows:,} / 일수: {len(month)}")
+    print(f"박스 계산 시간: {elapsed:.3f}s ({elapsed / len(month) * 1000:.1f} ms/일)")
+    print(f"총 박스: {box_count:,} / 검토 필요: {review_count:,}")
+    print(f"수량 벡터 캐시: hits={cache_info.hits:,} misses={cache_info.misses:,} "
+          f"(적중률 {cache_info.hits / max(1, cache_info.hits + cache_info.misses):.1%})")
+
+
+if __name__ == "__main__":
+    run()
@@ -1,3 +1,5 @@
+import os
+
 # GitHub 설정 - 수정된 저장소명
 REPO_OWNER = "coder4052"  # 본인 GitHub 사용자명으로 변경하세요
 REPO_NAME = "seroe-dashboard-v2-test"  # 실제 생성한 저장소명
@@ -6,6 +8,33 @@ BASE_DATA_DIR = "data"
 SHIPMENT_FILE_PATH = f"{BASE_DATA_DIR}/출고현황_encrypted.json"
 BOX_FILE_PATH = f"{BASE_DATA_DIR}/박스계산_encrypted.json"
 STOCK_FILE_PATH = f"{BASE_DATA_DIR}/재고현황_encrypted.json"
+UPLOAD_LOG_FILE_PATH = f"{BASE_DATA_DIR}/업로드기록_encrypted.json"
+
+# 고객 주문 이력 저장소 (전화번호 뒤 4자리, 번호가 없으면 정규화한 이름의 해시 기준 샤드)
+CUSTOMER_HISTORY_DIR = f"{BASE_DATA_DIR}/고객이력"
+# 샤드 수는 샤드당 이 행 수가 되도록 2배씩 늘림 (최소/최대) - 오늘 불러오고 다시 쓰는 샤드 수가 오늘 고객 수를 따라감
+HISTORY_SHARD_TARGET_ROWS = 25
+HISTORY_MIN_SHARDS = 16
+HISTORY_MAX_SHARDS = 8192
+
+# 기존 고객 블룸 필터 - 고객마다 '블로킹 키|뒤 4자리' 키 2개 (번호가 없으면 정규화한 이름 키 1개)
+# (2^22비트 = 512KB, 해시 3개 - 고객 5만 명(키 10만 개) 기준 거짓 양성 약 0.03%, 50만 명 기준 약 13%)
+CUSTOMER_FILTER_BITS = 1 << 22
+CUSTOMER_FILTER_HASHES = 3
+
+# 고객 분석 결과/엑셀 파싱 결과 세션 캐시 - 마지막 조회 후 이 시간(초)이 지나면 삭제
+CUSTOMER_ANALYSIS_CACHE_TTL_SECONDS = 600
+
+# 고객 분석/누적 파일/저장소 저장을 짧게 사는 워커 프로세스에서 실행 (서버 프로세스에 고객 프레임을 남기지 않음)
+CUSTOMER_ANALYSIS_ISOLATED = True
+
+# 로그 디렉터리 - SEROE_LOG_DIR 환경 변수로 변경 (기본값: 작업 디렉터리의 logs/, .gitignore에 포함)
+LOG_DIR = os.environ.get("SEROE_LOG_DIR", "logs")
+
+# 처리 단계 프로파일 로그 (JSON lines - 단계 이름과 시간/메모리만 기록, 데이터 내용 없음)
+# 이 크기(MB)를 넘으면 .1 파일로 옮기고 새로 기록 (이전 파일은 하나만 보관)
+STAGE_PROFILE_LOG_PATH = os.path.join(LOG_DIR, "stage_profile.jsonl")
+STAGE_PROFILE_LOG_MAX_MB = 5
 
 # 페이지 설정
 PAGE_CONFIG = {
@@ -14,3 +43,6 @@ PAGE_CONFIG = {
     "layout": "wide"
 }
 
+
+# 업로드 파일 크기 한도 (MB) - 출고내역서는 첫 업로드와 수정 재업로드 모두 청크 단위로 읽으므로 업로드 한도만 적용
+MAX_UPLOAD_SIZE_MB = 200
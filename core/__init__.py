@@ -0,0 +1,6 @@
+# core/__init__.py
+"""서로 출고정리 처리 코어 - Streamlit 없이 사용할 수 있는 파싱/집계/박스 계산/암호화/저장 로직
+
+웹 앱(modules/*)은 이 패키지를 감싸 메시지를 화면에 표시하고,
+배치 CLI(python -m core)는 같은 로직을 서버 밖에서 실행합니다.
+"""
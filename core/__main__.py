@@ -0,0 +1,8 @@
+# core/__main__.py
+"""python -m core 진입점"""
+import sys
+
+from core.cli import main
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,280 @@
+# core/aggregation.py
+"""주문 집계 - 출고 현황 합계와 수취인별 수량을 청크/파일 단위로 누적 (Streamlit 의존 없음)"""
+import os
+import multiprocessing
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from core.excel import iter_excel_chunks, DEFAULT_CHUNK_ROWS
+from core.parsing import SAFE_COLUMNS, ESSENTIAL_COLUMNS, compact_order_frame, normalize_orders, recipient_names
+from core.profiling import profile_stage
+
+# 행 지문 계산에 쓰는 컬럼 (정규화 결과를 결정하는 컬럼만 - 주문자 연락처 등은 제외)
+ROW_KEY_COLUMNS = ['상품이름', '옵션이름', '상품수량', '수취인이름']
+
+# 같은 지문의 n번째 등장을 구분하기 위한 상수 (64비트 골든 비율)
+_OCCURRENCE_STRIDE = np.uint64(0x9E3779B97F4A7C15)
+
+def aggregate_shipment_totals(orders):
+    """정규화된 주문에서 출고 현황 집계 (상품 용량 → 수량, 200ml 그대로 표시)"""
+    grouped = orders.groupby(['상품', '용량'], sort=False, observed=True)['총수량'].sum()
+
+    results = defaultdict(int)
+    for (product, capacity), quantity in grouped.items():
+        key = f"{product} {capacity}" if capacity else product
+        results[key] += int(quantity)
+
+    return results
+
+class OrderAggregate:
+    """청크 단위로 누적되는 주문 집계 - 출고 현황 합계 + 수취인별 상품/박스용량 수량
+
+    행 전체를 보관하지 않으므로 파일 크기와 무관하게 집계 대상 키 수만큼만 메모리를 사용합니다.
+    """
+
+    RECIPIENT_KEYS = ['수취인이름', '상품', '박스용량']
+
+    def __init__(self):
+        self.shipment_totals = defaultdict(int)
+        self.row_count = 0
+        self.has_recipient = False
+        self._recipient_parts = []
+
+    def add_orders(self, orders):
+        """정규화된 주문 청크(normalize_orders 결과)를 집계에 반영"""
+        self.row_count += len(orders)
+        for key, quantity in aggregate_shipment_totals(orders).items():
+            self.shipment_totals[key] += quantity
+
+        if '수취인이름' in orders.columns:
+            self.has_recipient = True
+            self._recipient_parts.append(
+                orders.groupby(self.RECIPIENT_KEYS, sort=False, observed=True)['총수량'].sum()
+            )
+            if len(self._recipient_parts) >= 16:
+                self._compact()
+
+    def merge(self, other):
+        """다른 집계를 합침 (순서와 무관하게 같은 결과 - 파일별 병렬 집계 결과 병합용)"""
+        self.row_count += other.row_count
+        self.has_recipient = self.has_recipient or other.has_recipient
+        for key, quantity in other.shipment_totals.items():
+            self.shipment_totals[key] += quantity
+        self._recipient_parts.extend(other._recipient_parts)
+        if len(self._recipient_parts) >= 16:
+            self._compact()
+        return self
+
+    def _compact(self):
+        """청크별 부분 합계를 하나로 합침 (같은 수취인이 여러 청크에 걸친 경우)"""
+        if len(self._recipient_parts) > 1:
+            merged = (
+                pd.concat(self._recipient_parts)
+                .groupby(level=self.RECIPIENT_KEYS, sort=False).sum()
+            )
+            self._recipient_parts = [merged]
+
+    def recipient_orders(self):
+        """박스 계산용 수취인별 주문 프레임 (calculate_box_requirements 입력)"""
+        if not self._recipient_parts:
+            return pd.DataFrame(columns=self.RECIPIENT_KEYS + ['총수량'])
+        self._compact()
+        return self._recipient_parts[0].reset_index()
+
+def aggregate_excel_stream(source, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """엑셀 파일을 청크 단위로 읽어 정규화 후 바로 집계 (SAFE_COLUMNS만 읽음)
+
+    헤더에 필수 컬럼이 없으면 ExcelHeaderError가 발생합니다.
+    """
+    aggregate = OrderAggregate()
+    for chunk in iter_excel_chunks(source, SAFE_COLUMNS, ESSENTIAL_COLUMNS, chunk_rows):
+        aggregate.add_orders(normalize_orders(compact_order_frame(chunk)))
+    return aggregate
+
+def run_per_file(func, jobs, max_workers=None):
+    """jobs([(파일명, 인자 튜플)])마다 func를 실행 - CPU가 여럿이면 프로세스 풀에서 병렬 실행
+
+    반환값: [(파일명, 결과 또는 발생한 예외)] - 입력 순서 유지
+    """
+    workers = min(len(jobs), max_workers or os.cpu_count() or 1)
+
+    if workers <= 1:
+        results = []
+        for name, args in jobs:
+            try:
+                results.append((name, func(*args)))
+            except Exception as e:
+                results.append((name, e))
+        return results
+
+    # Streamlit 서버 스레드를 fork하지 않도록 spawn 사용
+    context = multiprocessing.get_context('spawn')
+
+    results = []
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        futures = [(name, pool.submit(func, *args)) for name, args in jobs]
+        for name, future in futures:
+            try:
+                results.append((name, future.result()))
+            except Exception as e:
+                results.append((name, e))
+    return results
+
+def aggregate_excel_files(named_files, max_workers=None):
+    """여러 엑셀 파일을 프로세스 풀에서 파일별로 병렬 집계
+
+    named_files: [(파일명, bytes)]
+    반환값: [(파일명, OrderAggregate 또는 발생한 예외)] - 입력 순서 유지
+    파일이 하나이거나 CPU가 하나면 프로세스를 띄우지 않고 현재 프로세스에서 처리합니다.
+    """
+    return run_per_file(aggregate_excel_stream, [(name, (data,)) for name, data in named_files], max_workers)
+
+# ---------------------------
+# 🔁 수정 재업로드 증분 집계
+# ---------------------------
+def row_fingerprints(df):
+    """행별 64비트 지문 (ROW_KEY_COLUMNS 기준) - 같은 행 내용이면 파일이 달라도 같은 지문"""
+    columns = [col for col in ROW_KEY_COLUMNS if col in df.columns]
+    keys = df[columns]
+    if '상품수량' in keys.columns:
+        # 엑셀에서 정수/실수로 섞여 읽혀도 같은 지문이 되도록 실수로 통일
+        keys = keys.assign(상품수량=pd.to_numeric(keys['상품수량'], errors='coerce').astype('float64'))
+    # 범주형 컬럼은 범주값만 해시한 뒤 코드로 펼치므로 행마다 문자열을 해시하지 않음
+    return pd.util.hash_pandas_object(keys, index=False).to_numpy()
+
+def _occurrence_keys(fingerprints):
+    """같은 지문이 여러 번 나오면 등장 순번을 섞어 행마다 다른 키로 만듦 (동일 주문 행이 여러 개인 경우)"""
+    occurrence = pd.Series(fingerprints).groupby(fingerprints, sort=False).cumcount().to_numpy(dtype='uint64')
+    return fingerprints + occurrence * _OCCURRENCE_STRIDE
+
+class OrderSnapshot:
+    """업로드 파일 한 개의 처리 상태 - 행 지문, 수취인 없는 정규화 주문, 집계
+
+    같은 날 일부 행만 고쳐 다시 올린 파일은 이전 스냅샷과 행 지문을 비교해
+    추가된 행만 정규화하고, 그대로인 행은 이전 정규화 값에 새 파일의 수취인을 붙여 다시 집계합니다.
+    orders에는 수취인이름을 두지 않으므로 retained()로 남긴 스냅샷에는 고객 이름이 없습니다.
+    """
+
+    def __init__(self, columns, fingerprints, orders, aggregate, added_rows, removed_rows, incremental):
+        self.columns = columns
+        self.fingerprints = fingerprints
+        self.orders = orders
+        self.aggregate = aggregate
+        self.added_rows = added_rows
+        self.removed_rows = removed_rows
+        self.incremental = incremental
+
+    def retained(self):
+        """다음 재업로드 비교용으로 보관할 스냅샷 - 행 지문과 정규화 값만 (수취인별 집계 제외)"""
+        return OrderSnapshot(self.columns, self.fingerprints, self.orders, None,
+                             self.added_rows, self.removed_rows, self.incremental)
+
+def _read_order_chunks(source, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """SAFE_COLUMNS만 읽은 주문 청크를 차례로 생성 (청크별 읽기 시간은 '엑셀 읽기' 단계로 측정)"""
+    chunks = iter_excel_chunks(source, SAFE_COLUMNS, ESSENTIAL_COLUMNS, chunk_rows)
+    while True:
+        with profile_stage('엑셀 읽기'):
+            chunk = next(chunks, None)
+        if chunk is None:
+            return
+        yield compact_order_frame(chunk)
+
+def _previous_rows(fingerprints, previous_keys, seen):
+    """청크 행마다 이전 파일의 행 번호 (없으면 -1)
+
+    같은 지문의 등장 순번은 파일 전체 기준이어야 하므로 seen(앞 청크까지의 지문별 등장 수)을 이어서 세고 갱신합니다.
+    """
+    codes, uniques = pd.factorize(fingerprints)
+    within = pd.Series(codes).groupby(codes, sort=False).cumcount().to_numpy(dtype='uint64')
+    uniques = uniques.tolist()
+    offsets = np.array([seen.get(fingerprint, 0) for fingerprint in uniques], dtype='uint64')
+    for fingerprint, count in zip(uniques, np.bincount(codes, minlength=len(uniques)).tolist()):
+        seen[fingerprint] = seen.get(fingerprint, 0) + count
+    return previous_keys.get_indexer(fingerprints + (within + offsets[codes]) * _OCCURRENCE_STRIDE)
+
+def _reuse_previous_orders(chunk, previous_rows, previous):
+    """청크의 정규화 주문 - 이전 파일에 있던 행은 이전 정규화 값 + 새 수취인, 추가된 행만 정규화"""
+    kept = previous_rows >= 0
+    kept_positions, added_positions = np.flatnonzero(kept), np.flatnonzero(~kept)
+
+    with profile_stage('정규화'):
+        added_orders = normalize_orders(chunk.iloc[added_positions].reset_index(drop=True))
+
+    kept_orders = previous.orders.iloc[previous_rows[kept]].reset_index(drop=True)
+    if '수취인이름' in chunk.columns:
+        kept_orders['수취인이름'] = recipient_names(chunk['수취인이름'].iloc[kept_positions]).to_numpy()
+    # 청크의 원래 행 순서로 되돌림
+    order = np.argsort(np.concatenate([kept_positions, added_positions]), kind='stable')
+    orders = pd.concat([kept_orders, added_orders], ignore_index=True).iloc[order].reset_index(drop=True)
+    return orders.astype({col: 'category' for col in ('상품', '용량', '박스용량')}), len(added_positions)
+
+def _order_values(orders):
+    """정규화 주문에서 수취인을 뺀 값 (상품/용량/박스용량/총수량) - 스냅샷 보관용"""
+    return orders.drop(columns='수취인이름', errors='ignore')
+
+def snapshot_excel_file(source, previous=None, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """엑셀 파일을 청크 단위로 읽어 OrderSnapshot 생성 - previous(같은 파일의 이전 스냅샷)가 있으면 추가된 행만 정규화
+
+    청크마다 행 지문으로 이전 파일의 행을 찾아, 그대로인 행의 정규화 값은 previous에서 가져오고
+    수취인은 새 파일에서 붙인 뒤 바로 집계합니다. 파일 전체를 하나의 DataFrame으로 모으지 않으며,
+    집계는 행 순서까지 전체 재집계와 같습니다. 읽는 컬럼이 이전과 다르면 전체를 다시 정규화합니다.
+    헤더에 필수 컬럼이 없으면 ExcelHeaderError가 발생합니다.
+    """
+    aggregate = OrderAggregate()
+    fingerprint_parts, value_parts = [], []
+    columns, incremental, previous_keys = None, False, None
+    seen = {}
+    added_rows = kept_rows = 0
+
+    for chunk in _read_order_chunks(source, chunk_rows):
+        if columns is None:
+            columns = list(chunk.columns)
+            incremental = previous is not None and previous.columns == columns
+            if incremental:
+                previous_keys = pd.Index(_occurrence_keys(previous.fingerprints))
+
+        with profile_stage('행 지문'):
+            fingerprints = row_fingerprints(chunk)
+
+        if incremental:
+            previous_rows = _previous_rows(fingerprints, previous_keys, seen)
+            orders, chunk_added = _reuse_previous_orders(chunk, previous_rows, previous)
+            added_rows += chunk_added
+            kept_rows += len(orders) - chunk_added
+        else:
+            with profile_stage('정규화'):
+                orders = normalize_orders(chunk)
+            added_rows += len(orders)
+
+        with profile_stage('집계'):
+            aggregate.add_orders(orders)
+        fingerprint_parts.append(fingerprints)
+        value_parts.append(_order_values(orders))
+
+    if not value_parts:
+        # 데이터 행이 없는 파일 - 집계가 비어 있으므로 호출한 쪽에서 빈 파일로 처리
+        return OrderSnapshot(columns or [], np.zeros(0, dtype='uint64'), pd.DataFrame(columns=['상품', '용량', '박스용량', '총수량']),
+                             aggregate, 0, 0, False)
+
+    values = pd.concat(value_parts, ignore_index=True).astype({col: 'category' for col in ('상품', '용량', '박스용량')})
+    removed_rows = len(previous.fingerprints) - kept_rows if incremental else 0
+    return OrderSnapshot(columns, np.concatenate(fingerprint_parts), values, aggregate,
+                         added_rows, removed_rows, incremental)
+
+def snapshot_excel_files(named_files, previous_snapshots=None, max_workers=None):
+    """여러 엑셀 파일을 파일별로 스냅샷 생성 - 파일명이 같은 이전 스냅샷이 있으면 증분 집계
+
+    처음 올린 파일은 프로세스 풀에서 병렬로, 이전 스냅샷이 있는 파일은 스냅샷을 워커에
+    넘기지 않고 현재 프로세스에서 비교합니다 (단계별 측정도 현재 프로세스에 남음).
+    반환값: [(파일명, OrderSnapshot 또는 발생한 예외)] - 입력 순서 유지
+    """
+    previous_snapshots = previous_snapshots or {}
+    fresh = [(index, (data,)) for index, (name, data) in enumerate(named_files) if name not in previous_snapshots]
+    incremental = [(index, (data, previous_snapshots[name])) for index, (name, data) in enumerate(named_files)
+                   if name in previous_snapshots]
+    results = dict(run_per_file(snapshot_excel_file, fresh, max_workers))
+    results.update(run_per_file(snapshot_excel_file, incremental, max_workers=1))
+    return [(name, results[index]) for index, (name, _) in enumerate(named_files)]
@@ -0,0 +1,147 @@
+# core/analytics.py
+"""고객 이력 분석 - RFM 점수, 첫 구매 월 코호트 재구매율, 상품별 재구매율 (Streamlit 의존 없음)
+
+고객은 (이름, 전화번호 뒤 4자리) 조합으로 구분하고, 같은 고객의 같은 날 주문은 한 번의 구매로 셉니다.
+모든 계산은 이력 전체에 대해 groupby/pivot 한 번으로 처리합니다.
+"""
+import numpy as np
+import pandas as pd
+
+from core.customers import prepare_history, customer_keys, _column
+from core.parsing import normalize_orders, product_keys
+
+# RFM 점수 구간 수 (1 ~ RFM_BINS점)
+RFM_BINS = 5
+
+# F 점수 기준 구매일 수 - 2점부터 RFM_BINS점까지 각 점수의 최소 구매일 수 (한 번 구매한 고객은 1점)
+# 대부분의 고객이 한 번만 구매하므로 순위 대신 고정 기준을 사용 (순위로 나누면 1회 구매 동점자가 중간 점수를 받음)
+FREQUENCY_SCORE_THRESHOLDS = (2, 3, 5, 8)
+
+# (R 최소, F 최소, 최소 구매일 수, 세그먼트) - 위에서부터 처음 만족하는 세그먼트
+RFM_SEGMENTS = [
+    (4, 4, 2, "VIP"),
+    (3, 3, 2, "충성 고객"),
+    (4, 1, 1, "최근 고객"),
+    (2, 3, 2, "이탈 위험"),
+    (1, 1, 1, "휴면 고객"),
+]
+
+def customer_orders(history_df):
+    """이력을 분석용 주문 프레임으로 변환 - customer, order_date(일 단위), amount, product
+
+    주문일시를 변환할 수 없는 행은 제외합니다. 상품은 출고 현황과 같은 '상품 용량' 키입니다.
+    """
+    if '_주문일시' not in history_df.columns:
+        history_df = prepare_history(history_df)
+
+    keys = customer_keys(_column(history_df, '주문자이름'), _column(history_df, '주문자전화번호'))
+    # 이름/뒤 4자리를 각각 정수 코드로 바꾼 뒤 조합 코드를 다시 정수화 (문자열 쌍을 만들지 않음)
+    name_codes, _ = pd.factorize(keys['name'])
+    phone_codes, phone_uniques = pd.factorize(keys['phone_last4'], use_na_sentinel=False)
+    customer_codes, _ = pd.factorize(name_codes.astype('int64') * (len(phone_uniques) + 1) + phone_codes)
+
+    normalized = normalize_orders(history_df)
+    products = product_keys(normalized['상품'], normalized['용량'])
+
+    orders = pd.DataFrame({
+        'customer': customer_codes,
+        'order_date': history_df['_주문일시'].dt.normalize().to_numpy(),
+        'amount': pd.to_numeric(_column(history_df, '상품결제금액', 0), errors='coerce').fillna(0).to_numpy(),
+        'product': products.to_numpy(),
+    })
+    return orders[orders['order_date'].notna()].reset_index(drop=True)
+
+def _score(values, ascending=True):
+    """순위 기반 1 ~ RFM_BINS 점수 (값이 같으면 같은 점수, ascending=False면 작을수록 높은 점수)"""
+    pct = values.rank(method='average', pct=True, ascending=ascending)
+    return np.ceil(pct * RFM_BINS).clip(1, RFM_BINS).astype('int64')
+
+def _frequency_score(frequency):
+    """구매일 수 → 1 ~ RFM_BINS 점수 (FREQUENCY_SCORE_THRESHOLDS 기준)"""
+    return pd.Series(
+        np.searchsorted(FREQUENCY_SCORE_THRESHOLDS, frequency.to_numpy(), side='right') + 1,
+        index=frequency.index, dtype='int64'
+    )
+
+def rfm_scores(orders, as_of=None):
+    """고객별 RFM - recency_days, frequency(구매일 수), monetary(결제 합계), R/F/M 점수, segment
+
+    R/M은 고객 간 순위 점수, F는 구매일 수 고정 기준(FREQUENCY_SCORE_THRESHOLDS) 점수입니다.
+    as_of: 기준일 (기본값: 이력의 마지막 주문일)
+    """
+    as_of = pd.Timestamp(as_of) if as_of is not None else orders['order_date'].max()
+    grouped = orders.groupby('customer', sort=False)
+
+    rfm = pd.DataFrame({
+        'recency_days': (as_of - grouped['order_date'].max()).dt.days,
+        'frequency': grouped['order_date'].nunique(),
+        'monetary': grouped['amount'].sum(),
+    })
+    rfm['R'] = _score(rfm['recency_days'], ascending=False)
+    rfm['F'] = _frequency_score(rfm['frequency'])
+    rfm['M'] = _score(rfm['monetary'])
+
+    rfm['segment'] = np.select(
+        [(rfm['R'] >= min_r) & (rfm['F'] >= min_f) & (rfm['frequency'] >= min_days)
+         for min_r, min_f, min_days, _ in RFM_SEGMENTS],
+        [label for _, _, _, label in RFM_SEGMENTS],
+        default="기타"
+    )
+    return rfm
+
+def cohort_retention(orders):
+    """첫 구매 월 코호트별 월간 재구매율 - (코호트 크기 Series, 유지율 DataFrame[코호트 월 × 경과 개월])
+
+    경과 0개월은 항상 1.0이며, 각 칸은 해당 월에 다시 구매한 고객 비율입니다.
+    """
+    # 월은 (연도 × 12 + 월) 정수로 계산하고 마지막에만 기간(YYYY-MM)으로 표시
+    dates = orders['order_date'].dt
+    months = (dates.year * 12 + dates.month - 1).to_numpy()
+    first_month = pd.Series(months).groupby(orders['customer'].to_numpy()).transform('min').to_numpy()
+
+    active = pd.DataFrame({
+        'cohort': first_month, 'age': months - first_month, 'customer': orders['customer'].to_numpy()
+    }).drop_duplicates()
+    counts = active.groupby(['cohort', 'age']).size().unstack('age', fill_value=0)
+    counts.index = pd.PeriodIndex.from_ordinals(counts.index - 1970 * 12, freq='M')
+    counts.index.name = 'cohort'
+    cohort_sizes = counts[0]
+    return cohort_sizes, counts.div(cohort_sizes, axis=0)
+
+def product_repeat_rates(orders):
+    """상품별 재구매율 - customers(구매 고객 수), repeat_customers(2일 이상 구매한 고객 수), repeat_rate
+
+    재구매율 내림차순, 같으면 구매 고객 수 내림차순으로 정렬합니다.
+    """
+    purchase_days = orders.groupby(['product', 'customer'], observed=True)['order_date'].nunique()
+    repeated = (purchase_days >= 2).groupby(level='product', observed=True)
+    rates = pd.DataFrame({
+        'customers': repeated.size(),
+        'repeat_customers': repeated.sum(),
+    })
+    rates['repeat_rate'] = rates['repeat_customers'] / rates['customers']
+    return rates.sort_values(['repeat_rate', 'customers'], ascending=False)
+
+def analyze_history(history_df, as_of=None):
+    """이력 전체 분석 결과 dict - orders, rfm, cohort_sizes, retention, product_repeat"""
+    orders = customer_orders(history_df)
+    if orders.empty:
+        return None
+
+    cohort_sizes, retention = cohort_retention(orders)
+    return {
+        'orders': orders,
+        'rfm': rfm_scores(orders, as_of),
+        'cohort_sizes': cohort_sizes,
+        'retention': retention,
+        'product_repeat': product_repeat_rates(orders),
+    }
+
+def history_analytics(history_df, shipment_df, events):
+    """source 작업용 이력 분석 - analyze_history() 결과에서 주문 프레임(orders)을 뺀 집계만 (분석할 수 없으면 None)"""
+    analytics = analyze_history(history_df)
+    if analytics is None:
+        events.warning("⚠️ 주문일시를 읽을 수 있는 이력이 없어 분석할 수 없습니다.")
+        return None
+    analytics.pop('orders')
+    return analytics
@@ -0,0 +1,62 @@
+# core/bloom.py
+"""블룸 필터 - 키가 '확실히 없음'을 빠르게 판별하는 고정 크기 비트 배열 (Streamlit 의존 없음)
+
+거짓 음성은 없고 거짓 양성만 있습니다. 비트 수는 만들 때 정해지며 키를 추가해도 늘어나지 않습니다.
+"""
+import base64
+import hashlib
+import zlib
+
+import numpy as np
+
+
+class BloomFilter:
+    """bit_count 비트, 키마다 hash_count개 위치(이중 해싱)를 쓰는 블룸 필터"""
+
+    def __init__(self, bit_count, hash_count, bits=None, key_count=0):
+        self.bit_count = int(bit_count)
+        self.hash_count = int(hash_count)
+        self.bits = bits if bits is not None else np.zeros((self.bit_count + 7) // 8, dtype=np.uint8)
+        self.key_count = key_count
+
+    def _positions(self, keys):
+        """키별 비트 위치 배열 (len(keys) × hash_count) - BLAKE2b 128비트를 두 해시로 나눠 이중 해싱"""
+        digests = b''.join(hashlib.blake2b(key.encode(), digest_size=16).digest() for key in keys)
+        halves = np.frombuffer(digests, dtype='<u8').reshape(-1, 2)
+        steps = np.arange(self.hash_count, dtype=np.uint64)
+        with np.errstate(over='ignore'):
+            combined = halves[:, :1] + steps * (halves[:, 1:] | np.uint64(1))
+        return (combined % np.uint64(self.bit_count)).astype(np.int64)
+
+    def add(self, keys):
+        """키 목록 추가"""
+        keys = list(keys)
+        if not keys:
+            return
+        positions = self._positions(keys).ravel()
+        np.bitwise_or.at(self.bits, positions >> 3, (1 << (positions & 7)).astype(np.uint8))
+        self.key_count += len(keys)
+
+    def might_contain(self, keys):
+        """키별 포함 가능성 (bool 배열) - False면 확실히 추가된 적 없는 키"""
+        keys = list(keys)
+        if not keys:
+            return np.zeros(0, dtype=bool)
+        positions = self._positions(keys)
+        hits = (self.bits[positions >> 3] >> (positions & 7)) & 1
+        return hits.all(axis=1)
+
+    def to_payload(self):
+        """JSON 직렬화 가능한 dict (비트 배열은 zlib 압축 후 base64)"""
+        return {
+            'bit_count': self.bit_count,
+            'hash_count': self.hash_count,
+            'key_count': self.key_count,
+            'bits': base64.b64encode(zlib.compress(self.bits.tobytes())).decode(),
+        }
+
+    @classmethod
+    def from_payload(cls, payload):
+        """to_payload() 결과로 필터 복원"""
+        bits = np.frombuffer(zlib.decompress(base64.b64decode(payload['bits'])), dtype=np.uint8).copy()
+        return cls(payload['bit_count'], payload['hash_count'], bits=bits, key_count=payload.get('key_count', 0))
@@ -0,0 +1,163 @@
+# core/boxes.py
+"""박스 계산 - 수취인별 수량 행렬과 혼합 주문 박스 분할 (Streamlit 의존 없음)"""
+from collections import defaultdict
+from functools import lru_cache
+
+import pandas as pd
+
+from config.constants import BOX_RULES, BOX_COST_ORDER
+from core.parsing import normalize_orders, product_keys
+
+# 박스 계산에 사용하는 용량 순서 (수량 벡터의 순서)
+BOX_CAPACITIES = ('1.5L', '1L', '500ml', '240ml')
+
+def build_recipient_quantity_matrix(orders):
+    """수취인 × 용량(1.5L/1L/500ml/240ml) 정수 수량 행렬 생성
+
+    용량을 인식하지 못한 주문만 있는 수취인도 0 벡터로 포함합니다 (검토 대상).
+    """
+    recipients = pd.unique(orders['수취인이름'])
+    boxable = orders[orders['박스용량'].isin(BOX_CAPACITIES)]
+
+    matrix = boxable.pivot_table(
+        index='수취인이름', columns='박스용량', values='총수량',
+        aggfunc='sum', fill_value=0, observed=True
+    )
+    return matrix.reindex(index=recipients, columns=list(BOX_CAPACITIES), fill_value=0).astype('int32')
+
+# 📦 혼합 주문 박스 분할 (메모이제이션)
+@lru_cache(maxsize=None)
+def _pack_single_capacity(capacity, qty):
+    """단일 용량 수량을 박스들로 분할 - (박스 수, 비용) 최소 조합 반환
+
+    BOX_RULES의 용량 범위와 BOX_COST_ORDER의 비용을 사용합니다.
+    박스 수를 먼저 최소화하고, 같은 박스 수에서는 비용이 낮은 조합을 고릅니다.
+    (한 박스에 들어가는 주문은 기존 단일 박스 규칙과 동일한 결과)
+    분할할 수 없으면 None을 반환합니다.
+    """
+    if qty <= 0:
+        return ()
+
+    candidates = [
+        (box_name, ranges[capacity][0], ranges[capacity][1], BOX_COST_ORDER.get(box_name, 999))
+        for box_name, ranges in BOX_RULES.items()
+        if capacity in ranges
+    ]
+    if not candidates:
+        return None
+
+    # best[n] = (박스 수, 비용, 마지막 박스, 박스 내 수량)
+    best = [None] * (qty + 1)
+    best[0] = (0, 0, None, 0)
+    for n in range(1, qty + 1):
+        for box_name, low, high, cost in candidates:
+            for size in range(low, min(high, n) + 1):
+                prev = best[n - size]
+                if prev is None:
+                    continue
+                score = (prev[0] + 1, prev[1] + cost)
+                if best[n] is None or score < best[n][:2]:
+                    best[n] = (score[0], score[1], box_name, size)
+
+    if best[qty] is None:
+        return None
+
+    boxes = []
+    n = qty
+    while n > 0:
+        _, _, box_name, size = best[n]
+        boxes.append(box_name)
+        n -= size
+    return tuple(sorted(boxes, key=lambda name: BOX_COST_ORDER.get(name, 999)))
+
+@lru_cache(maxsize=None)
+def pack_quantity_vector(quantity_vector):
+    """용량별 수량 벡터 (1.5L, 1L, 500ml, 240ml)를 박스 조합으로 분할
+
+    반환값은 (박스명, 개수) 튜플의 튜플이며, 분할할 수 없으면 None입니다.
+    같은 수량 조합이 반복되므로 벡터 단위로 결과를 캐시합니다.
+    """
+    box_counts = defaultdict(int)
+    for capacity, qty in zip(BOX_CAPACITIES, quantity_vector):
+        boxes = _pack_single_capacity(capacity, qty)
+        if boxes is None:
+            return None
+        for box_name in boxes:
+            box_counts[box_name] += 1
+
+    if not box_counts:
+        return None
+
+    return tuple(sorted(box_counts.items(), key=lambda item: BOX_COST_ORDER.get(item[0], 999)))
+
+def pack_order_boxes(quantities):
+    """주문 수량(용량별 dict)에 필요한 박스 조합 계산 - 분할 불가 시 None"""
+    quantity_vector = tuple(int(quantities.get(capacity, 0)) for capacity in BOX_CAPACITIES)
+    packed = pack_quantity_vector(quantity_vector)
+    return dict(packed) if packed else None
+
+def calculate_box_requirements(orders):
+    """전체 박스 필요량 계산 - 혼합 주문은 박스 조합으로 분할
+
+    normalize_orders()의 정규화 프레임을 받으며, 원본 주문 DataFrame이 오면 먼저 정규화합니다.
+    """
+    if '박스용량' not in orders.columns:
+        orders = normalize_orders(orders)
+    if '수취인이름' not in orders.columns:
+        orders = orders.assign(수취인이름='알 수 없음')
+
+    matrix = build_recipient_quantity_matrix(orders)
+
+    total_boxes = defaultdict(int)
+    review_orders = []  # 검토 필요 주문들 (분할 불가)
+
+    if matrix.empty:
+        return total_boxes, review_orders
+
+    # 같은 수량 벡터는 한 번만 분할하고 수취인 수만큼 곱함
+    capacity_columns = list(BOX_CAPACITIES)
+    vector_counts = matrix.groupby(capacity_columns, sort=False).size()
+
+    unpackable_vectors = set()
+    for vector, recipient_count in vector_counts.items():
+        packed = pack_quantity_vector(tuple(int(qty) for qty in vector))
+        if packed is None:
+            unpackable_vectors.add(vector)
+            continue
+        for box_name, count in packed:
+            total_boxes[box_name] += count * recipient_count
+
+    if unpackable_vectors:
+        review_mask = pd.Series(
+            [tuple(row) in unpackable_vectors for row in matrix.itertuples(index=False)],
+            index=matrix.index
+        )
+        review_matrix = matrix[review_mask]
+        review_rows = orders[orders['수취인이름'].isin(review_matrix.index)]
+        review_keys = product_keys(review_rows['상품'], review_rows['박스용량'])
+        review_products = review_rows['총수량'].groupby(
+            [review_rows['수취인이름'], review_keys], sort=False, observed=True
+        ).sum()
+
+        for recipient, row in review_matrix.iterrows():
+            review_orders.append({
+                'recipient': recipient,
+                'quantities': {capacity: int(qty) for capacity, qty in row.items() if qty > 0},
+                'products': {key: int(qty) for key, qty in review_products.loc[recipient].items()}
+            })
+
+    return total_boxes, review_orders
+
+def build_box_results(total_boxes, review_orders):
+    """저장용 박스 계산 결과 (JSON 직렬화 가능한 dict)"""
+    return {
+        'total_boxes': dict(total_boxes),
+        'box_e_orders': [
+            {
+                'recipient': order['recipient'],
+                'quantities': dict(order['quantities']),
+                'products': dict(order['products'])
+            }
+            for order in review_orders
+        ]
+    }
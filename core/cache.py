@@ -0,0 +1,101 @@
+# core/cache.py
+"""세션 캐시 - 일정 시간 사용하지 않은 항목을 삭제하는 캐시와, 결과를 암호화해 보관하는 캐시 (Streamlit 의존 없음)
+
+만료는 캐시를 조회하거나 evict_expired()를 부를 때 확인합니다 (앱은 매 실행마다 호출).
+그 사이 아무 실행이 없으면 항목은 다음 실행이나 세션 종료 때까지 남습니다.
+"""
+import pickle
+import time
+import weakref
+from collections import OrderedDict
+from collections.abc import MutableMapping
+
+from cryptography.fernet import Fernet
+
+# 캐시별 Fernet 객체 - 캐시 객체 밖에 두어 세션 상태를 직렬화하거나 출력해도 키가 함께 나가지 않음
+_FERNETS = weakref.WeakKeyDictionary()
+
+
+class TimedCache(MutableMapping):
+    """키 → 값 (참조만 보관, dict처럼 사용)
+
+    ttl_seconds 동안 조회되지 않은 항목과 max_entries를 넘는 오래된 항목(마지막 조회 기준)은 삭제됩니다.
+    """
+
+    def __init__(self, ttl_seconds, max_entries, clock=time.monotonic):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.clock = clock
+        self._entries = OrderedDict()
+
+    def evict_expired(self):
+        """마지막 조회 후 ttl_seconds가 지난 항목 삭제 - 삭제한 항목 수 반환"""
+        now = self.clock()
+        expired = [key for key, (last_used, _) in self._entries.items() if now - last_used > self.ttl_seconds]
+        for key in expired:
+            del self._entries[key]
+        return len(expired)
+
+    def __contains__(self, key):
+        self.evict_expired()
+        return key in self._entries
+
+    def __getitem__(self, key):
+        """값 반환 - 조회하면 만료 시간이 연장됨 (없거나 만료되었으면 KeyError)"""
+        self.evict_expired()
+        _, value = self._entries[key]
+        self._entries[key] = (self.clock(), value)
+        self._entries.move_to_end(key)
+        return value
+
+    def __setitem__(self, key, value):
+        self._entries[key] = (self.clock(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __delitem__(self, key):
+        del self._entries[key]
+
+    def __iter__(self):
+        return iter(list(self._entries))
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        self._entries.clear()
+
+
+class EncryptedCache:
+    """입력 지문 → 암호화된 결과 (만료 규칙은 TimedCache와 같음)
+
+    값은 pickle 후 이 캐시만 쓰는 Fernet 키로 암호화해 보관하고, 꺼낼 때만 복호화합니다.
+    키는 캐시 객체가 아닌 모듈의 약한 참조 표에 있어 세션 상태 덤프/직렬화에는 암호문만 드러나지만,
+    같은 프로세스의 메모리를 읽을 수 있으면 키도 읽을 수 있으므로 그 경우에는 보호가 아닌 난독화입니다.
+    shared 값(세션에 이미 있는 원본 DataFrame 등)은 복사본을 만들지 않도록 암호화 없이 참조만 보관합니다.
+    """
+
+    def __init__(self, ttl_seconds, max_entries=2, clock=time.monotonic):
+        self._entries = TimedCache(ttl_seconds, max_entries, clock)
+        _FERNETS[self] = Fernet(Fernet.generate_key())
+
+    def __len__(self):
+        return len(self._entries)
+
+    def evict_expired(self):
+        """마지막 조회 후 ttl_seconds가 지난 항목 삭제 - 삭제한 항목 수 반환"""
+        return self._entries.evict_expired()
+
+    def get(self, key):
+        """캐시된 (결과, shared) - 없거나 만료되었으면 (None, None), 조회하면 만료 시간이 연장됨"""
+        if key not in self._entries:
+            return None, None
+        token, shared = self._entries[key]
+        return pickle.loads(_FERNETS[self].decrypt(token)), shared
+
+    def put(self, key, value, shared=None):
+        self._entries[key] = (_FERNETS[self].encrypt(pickle.dumps(value)), shared)
+
+    def clear(self):
+        self._entries.clear()
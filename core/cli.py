@@ -0,0 +1,153 @@
+# core/cli.py
+"""배치 CLI - 출고내역서를 웹 화면 없이 처리 (파싱 → 집계 → 박스 계산 → 암호화 → 저장)
+
+사용 예:
+    python -m core 출고내역서.xlsx --profile
+    python -m core 1일.xlsx 2일.xlsx --dry-run
+
+비밀 값은 환경 변수(SEROE_ENCRYPTION_KEY, SEROE_GITHUB_TOKEN) 또는
+--secrets 로 지정한 secrets.toml(encryption_key, github_token)에서 읽음
+"""
+import argparse
+import os
+import sys
+
+try:
+    import tomllib
+except ModuleNotFoundError:  # Python 3.10 이하
+    import tomli as tomllib
+
+from config.settings import SHIPMENT_FILE_PATH, BOX_FILE_PATH
+from core.aggregation import aggregate_excel_files
+from core.boxes import calculate_box_requirements, build_box_results
+from core.crypto import encrypt_payload
+from core.events import EventLog
+from core.excel import upload_fingerprint
+from core.profiling import StageProfiler
+from core.storage import publish_encrypted, record_upload, get_current_time_str
+
+DEFAULT_SECRETS_PATH = os.path.join('.streamlit', 'secrets.toml')
+
+
+def load_secrets(path=None):
+    """환경 변수 우선, 없으면 secrets.toml에서 (encryption_key, github_token) 읽기"""
+    secrets = {}
+    secrets_path = path or DEFAULT_SECRETS_PATH
+    if os.path.exists(secrets_path):
+        with open(secrets_path, 'rb') as f:
+            secrets = tomllib.load(f)
+    elif path:
+        raise FileNotFoundError(f"secrets 파일을 찾을 수 없습니다: {path}")
+
+    encryption_key = os.environ.get('SEROE_ENCRYPTION_KEY') or secrets.get('encryption_key')
+    github_token = os.environ.get('SEROE_GITHUB_TOKEN') or secrets.get('github_token')
+    return encryption_key, github_token
+
+
+def print_events(events):
+    for level, message in events:
+        stream = sys.stderr if level in ('warning', 'error') else sys.stdout
+        print(f"[{level}] {message}", file=stream)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m core', description='출고내역서 배치 처리')
+    parser.add_argument('files', nargs='+', help='처리할 출고내역서 (.xlsx)')
+    parser.add_argument('--dry-run', '--no-publish', dest='dry_run', action='store_true',
+                        help='GitHub에 저장하지 않고 결과만 출력')
+    parser.add_argument('--profile', action='store_true', help='단계별 처리 시간/메모리 출력 (tracemalloc 사용)')
+    parser.add_argument('--profile-log', help='단계별 기록을 추가할 JSON lines 파일 경로')
+    parser.add_argument('--secrets', help=f'secrets.toml 경로 (기본: {DEFAULT_SECRETS_PATH})')
+    parser.add_argument('--workers', type=int, default=None, help='파일 병렬 처리 프로세스 수')
+    return parser
+
+
+def run(args):
+    """배치 처리 실행 - 종료 코드 반환"""
+    profiler = StageProfiler(trace_memory=args.profile)
+    events = EventLog()
+
+    encryption_key, github_token = load_secrets(args.secrets)
+    if not encryption_key:
+        print("[error] 암호화 키가 없습니다 (SEROE_ENCRYPTION_KEY 또는 secrets.toml의 encryption_key)", file=sys.stderr)
+        return 2
+    if not args.dry_run and not github_token:
+        print("[error] GitHub 토큰이 없습니다 (SEROE_GITHUB_TOKEN 또는 secrets.toml의 github_token)", file=sys.stderr)
+        return 2
+
+    with profiler.stage('읽기'):
+        named_files = []
+        for path in args.files:
+            with open(path, 'rb') as f:
+                named_files.append((os.path.basename(path), f.read()))
+
+    # 1. 파싱 + 집계
+    with profiler.stage('파싱/집계'):
+        aggregate = None
+        for name, outcome in aggregate_excel_files(named_files, max_workers=args.workers):
+            if isinstance(outcome, Exception):
+                events.error(f"{name}: 처리 실패 ({outcome})")
+            else:
+                events.info(f"{name}: {outcome.row_count:,}행")
+                aggregate = outcome if aggregate is None else aggregate.merge(outcome)
+
+    if aggregate is None or any(level == 'error' for level, _ in events):
+        print_events(events)
+        return 1
+
+    shipment_results = dict(aggregate.shipment_totals)
+
+    # 2. 박스 계산
+    box_results = None
+    with profiler.stage('박스 계산'):
+        if aggregate.has_recipient:
+            total_boxes, review_orders = calculate_box_requirements(aggregate.recipient_orders())
+            box_results = build_box_results(total_boxes, review_orders)
+        else:
+            events.warning("박스 계산을 위한 '수취인이름' 컬럼이 없습니다.")
+
+    # 3. 암호화
+    with profiler.stage('암호화'):
+        encrypted_shipment = encrypt_payload(shipment_results, encryption_key)
+        encrypted_box = encrypt_payload(box_results, encryption_key) if box_results is not None else None
+
+    events.success(f"출고 현황 {len(shipment_results)}개 상품, 총 {sum(shipment_results.values()):,}개")
+    if box_results is not None:
+        events.success(f"박스 {sum(box_results['total_boxes'].values()):,}개, 검토 필요 주문 {len(box_results['box_e_orders'])}건")
+
+    # 4. 저장
+    exit_code = 0
+    if not args.dry_run:
+        with profiler.stage('저장'):
+            commit_message = f"출고 현황 업데이트 - {get_current_time_str()}"
+            shipment_saved = publish_encrypted(encrypted_shipment, SHIPMENT_FILE_PATH, commit_message, github_token, events)
+            box_saved = encrypted_box is not None and publish_encrypted(
+                encrypted_box, BOX_FILE_PATH, commit_message, github_token, events
+            )
+
+            if shipment_saved and box_saved:
+                fingerprint = upload_fingerprint([data for _, data in named_files])
+                record_upload(fingerprint, {
+                    'file_name': ', '.join(name for name, _ in named_files),
+                    'processed_at': get_current_time_str(),
+                    'rows': aggregate.row_count,
+                    'shipment_saved': shipment_saved,
+                    'box_saved': box_saved,
+                }, github_token, encryption_key, events)
+            else:
+                exit_code = 1
+
+        events.add('success' if exit_code == 0 else 'error',
+                   f"GitHub 저장: 출고 현황 {'성공' if shipment_saved else '실패'}, 박스 계산 {'성공' if box_saved else '실패'}")
+
+    print_events(events)
+    if args.profile:
+        print(profiler.report())
+    if args.profile_log:
+        profiler.write_jsonl(args.profile_log, run='cli')
+    return exit_code
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return run(args)
@@ -0,0 +1,24 @@
+# core/crypto.py
+"""집계 결과 암호화/복호화 - 키는 호출한 쪽에서 전달 (Streamlit 의존 없음)"""
+import base64
+import json
+
+from cryptography.fernet import Fernet
+
+
+def encrypt_payload(results, key):
+    """JSON 직렬화 가능한 결과를 Fernet으로 암호화해 base64 문자열로 반환"""
+    f = Fernet(key.encode())
+
+    json_str = json.dumps(results, ensure_ascii=False)
+    encrypted_data = f.encrypt(json_str.encode())
+    return base64.b64encode(encrypted_data).decode()
+
+
+def decrypt_payload(encrypted_data, key):
+    """encrypt_payload 결과를 복호화해 원래 객체로 반환"""
+    f = Fernet(key.encode())
+
+    decoded_data = base64.b64decode(encrypted_data.encode())
+    decrypted_data = f.decrypt(decoded_data)
+    return json.loads(decrypted_data.decode())
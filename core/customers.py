@@ -0,0 +1,320 @@
+# core/customers.py
+"""고객 주문 이력 분석 - 고객주문정보(누적) 파일 전처리와 재주문 판별 (Streamlit 의존 없음)"""
+import re
+from itertools import groupby
+
+import numpy as np
+import pandas as pd
+
+from core.aggregation import run_per_file
+from core.excel import read_excel_frame, parse_cache_key, remember_parsed
+from core.matching import match_identities
+from core.pii import CustomerKeys
+from core.parsing import (
+    extract_product_from_option, extract_product_from_name,
+    parse_option_info, standardize_capacity
+)
+
+# 누적 고객주문정보 파일(create_updated_customer_file)이 기록하는 주문일시 형식
+CUMULATIVE_DATE_FORMAT = '%Y-%m-%d'
+
+# 주문 이력 표시용 날짜 형식
+DISPLAY_DATE_FORMAT = '%Y-%m-%d'
+
+UNKNOWN_DATE = "날짜 미확인"
+
+# 고객별로 보여주는 최근 주문 이력 수
+RECENT_ORDER_COUNT = 10
+
+# 고객주문정보(누적) 파일에서 읽는 컬럼과 필수 컬럼
+HISTORY_COLUMNS = ['주문일시', '주문자이름', '주문자전화번호', '상품이름',
+                   '상품수량', '상품결제금액', '수취인이름', '옵션이름']
+HISTORY_REQUIRED_COLUMNS = ['주문자이름', '주문자전화번호', '상품이름', '상품수량']
+
+# 출고내역서에서 읽는 컬럼과 필수 컬럼 (주소 등 그 외 컬럼은 읽지 않음)
+SHIPMENT_COLUMNS = ['주문자이름', '주문자전화번호1', '수취인이름', '상품이름',
+                    '옵션이름', '상품수량', '상품결제금액']
+SHIPMENT_REQUIRED_COLUMNS = ['주문자이름', '주문자전화번호1']
+
+# 두 파일 합계가 이보다 작으면 프로세스를 띄우지 않고 순서대로 파싱 (프로세스 시작 비용이 더 큼)
+CONCURRENT_READ_MIN_BYTES = 2 * 1024 * 1024
+
+def read_customer_workbooks(history_data, shipment_data, cache=None, max_workers=None):
+    """고객주문정보와 출고내역서를 필요한 컬럼만 동시에 파싱
+
+    openpyxl 파싱은 GIL을 잡고 있으므로 스레드가 아닌 프로세스로 나눠 실행합니다.
+    cache(dict)가 있으면 read_excel_cached()와 같은 키로 파싱 결과를 재사용/보관합니다.
+    반환값: {'history': DataFrame 또는 예외, 'shipment': DataFrame 또는 예외}
+    """
+    specs = {
+        'history': (history_data, HISTORY_COLUMNS, HISTORY_REQUIRED_COLUMNS),
+        'shipment': (shipment_data, SHIPMENT_COLUMNS, SHIPMENT_REQUIRED_COLUMNS),
+    }
+    cache = cache if cache is not None else {}
+    keys = {name: parse_cache_key(data, columns) for name, (data, columns, _) in specs.items()}
+    frames = {name: cache[key] for name, key in keys.items() if key in cache}
+
+    jobs = [(name, spec) for name, spec in specs.items() if name not in frames]
+    if sum(len(data) for _, (data, _, _) in jobs) < CONCURRENT_READ_MIN_BYTES:
+        max_workers = 1
+
+    for name, outcome in run_per_file(read_excel_frame, jobs, max_workers):
+        if not isinstance(outcome, Exception):
+            remember_parsed(cache, keys[name], outcome)
+        frames[name] = outcome
+    return frames
+
+def parse_order_dates(values):
+    """주문일시 컬럼을 한 번에 datetime64로 변환 (변환할 수 없는 값은 NaT)
+
+    누적 파일이 쓰는 'YYYY-MM-DD'는 형식을 지정해 빠르게 변환하고, 쇼핑몰 원본의
+    'YYYY-MM-DD HH:MM:SS' 등은 ISO8601로, 그 밖의 형식만 값별 형식 추론으로 변환합니다.
+    """
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+
+    text = values.astype('string').str.strip()
+    parsed = pd.to_datetime(text, format=CUMULATIVE_DATE_FORMAT, errors='coerce')
+
+    remaining = parsed.isna() & text.notna()
+    if remaining.any():
+        parsed[remaining] = pd.to_datetime(text[remaining], format='ISO8601', errors='coerce')
+
+    remaining = parsed.isna() & text.notna()
+    if remaining.any():
+        parsed[remaining] = pd.to_datetime(text[remaining], format='mixed', errors='coerce')
+
+    return parsed
+
+def format_order_dates(values, parsed):
+    """표시용 주문일 문자열 - 변환된 날짜는 YYYY-MM-DD, 변환 실패는 원본 문자열, 값이 없으면 '날짜 미확인'"""
+    formatted = parsed.dt.strftime(DISPLAY_DATE_FORMAT).astype(object)
+    unparsed = parsed.isna()
+    formatted[unparsed] = values[unparsed].astype(object).where(values[unparsed].notna(), UNKNOWN_DATE).astype(str)
+    return formatted
+
+def prepare_history(history_df):
+    """고객주문정보 DataFrame의 주문일시를 한 번만 변환해 '_주문일시'(datetime64)와 '_주문일'(표시용) 컬럼 추가
+
+    주문일시 컬럼이 없으면 모든 주문을 '날짜 미확인'으로 취급합니다.
+    """
+    if '주문일시' in history_df.columns:
+        raw_dates = history_df['주문일시']
+    else:
+        raw_dates = pd.Series(pd.NA, index=history_df.index, dtype=object)
+
+    parsed = parse_order_dates(raw_dates)
+    return history_df.assign(_주문일시=parsed, _주문일=format_order_dates(raw_dates, parsed))
+
+# ---------------------------
+# 🔎 재주문 고객 매칭 (이름 / 전화번호 뒤 4자리 키, 매칭은 core.matching)
+# ---------------------------
+def _as_text(series):
+    """행별 str() 변환과 같은 결과의 문자열 Series (결측값은 'nan'/'None' 그대로)"""
+    return series.astype(object).map(str)
+
+def _column(df, column, default=''):
+    return df[column] if column in df.columns else pd.Series(default, index=df.index, dtype=object)
+
+def customer_keys(names, phones):
+    """매칭 키 프레임 - name(앞뒤 공백 제거), phone_last4(숫자 4자리 미만이면 결측)"""
+    digits = _as_text(phones).str.replace(r'\D', '', regex=True)
+    last4 = digits.str[-4:].where(digits.str.len() >= 4)
+    return pd.DataFrame({
+        'name': _as_text(names).str.strip().to_numpy(),
+        'phone_last4': last4.to_numpy(),
+    })
+
+def match_customer_history(today_keys, history_keys):
+    """오늘 고객별 과거 주문 행 찾기 - 블로킹 후보 중 이름 유사도/전화번호 뒤 4자리 신뢰도가 기준 이상이면 같은 고객
+
+    today_keys, history_keys: CustomerKeys 버퍼 (행 순서 = 오늘 고객 순번 / 이력 프레임의 행 위치)
+    반환값: (customer, row, confidence) DataFrame - 고객 순번, 이력 행 순서로 정렬 (중복 없음)
+    """
+    return match_identities(today_keys, history_keys)
+
+def describe_product(product_name, option_info):
+    """(표시용 상품명, 옵션 수량) - 옵션이 없으면 원본 상품이름과 수량 1"""
+    if option_info and option_info != 'nan':
+        option_quantity, capacity = parse_option_info(option_info)
+
+        processed_product = extract_product_from_option(option_info)
+        if processed_product == "기타":
+            processed_product = extract_product_from_name(product_name)
+
+        standardized_capacity = standardize_capacity(capacity)
+        if standardized_capacity:
+            return f"{processed_product} {standardized_capacity}", option_quantity
+        return processed_product, option_quantity
+
+    return product_name, 1
+
+def history_orders(history_df, rows):
+    """이력 행(rows 위치)의 주문 정보 프레임 - date, order_datetime, product, quantity, amount
+
+    상품/옵션 조합마다 한 번만 파싱합니다. prepare_history()를 거친 프레임이어야 합니다.
+    """
+    selected = history_df.iloc[rows]
+    product_names = _as_text(_column(selected, '상품이름'))
+    option_names = _as_text(_column(selected, '옵션이름'))
+
+    pairs = pd.MultiIndex.from_arrays([product_names, option_names])
+    pair_codes, unique_pairs = pairs.factorize()
+    described = [describe_product(product, option) for product, option in unique_pairs]
+    products = np.array([product for product, _ in described], dtype=object)[pair_codes]
+    option_quantities = np.array([quantity for _, quantity in described], dtype=object)[pair_codes]
+
+    quantities = _column(selected, '상품수량', 1).to_numpy(dtype=object)
+    amounts = _column(selected, '상품결제금액', 0).to_numpy(dtype=object)
+
+    return pd.DataFrame({
+        'date': selected['_주문일'].to_numpy(),
+        'order_datetime': selected['_주문일시'].to_numpy(),
+        'product': products,
+        'quantity': quantities * option_quantities,
+        'amount': amounts,
+    }, index=pd.Index(rows, name='row'))
+
+def summarize_customer_history(matches, orders, recent_count=RECENT_ORDER_COUNT):
+    """매칭된 고객 전체의 과거 주문 요약을 한 번에 계산
+
+    matches: match_customer_history() 결과, orders: history_orders() 결과
+    반환값: (요약 DataFrame[customer → order_count, total_amount, last_order], {customer: 최근 주문 목록})
+    최근 주문은 주문일 내림차순(날짜 미확인은 뒤로, 같은 날은 이력 순서)으로 recent_count건입니다.
+    """
+    matched = matches.join(orders, on='row')
+    grouped = matched.assign(amount_value=pd.to_numeric(matched['amount'], errors='coerce')).groupby('customer', sort=False)
+
+    summary = pd.DataFrame({
+        'order_count': grouped.size(),
+        'total_amount': grouped['amount_value'].sum(),
+        'last_order': grouped['order_datetime'].max(),
+        'confidence': grouped['confidence'].max(),
+    })
+
+    recent = (
+        matched.sort_values(['customer', 'order_datetime', 'row'], ascending=[True, False, True],
+                            na_position='last', kind='stable')
+        .groupby('customer', sort=False).head(recent_count)
+    )
+    records = recent[['date', 'product', 'quantity', 'amount']].to_dict('records')
+    recent_orders = {
+        customer: [record for _, record in group]
+        for customer, group in groupby(zip(recent['customer'], records), key=lambda item: item[0])
+    }
+    return summary, recent_orders
+
+# ---------------------------
+# 📊 오늘 출고 고객 분석 (재주문/신규 판별)
+# ---------------------------
+def match_and_analyze_customers(history_df, shipment_df):
+    """고객 매칭 및 상세 분석"""
+    results = {
+        'reorder_customers': [],
+        'new_customers': [],
+        'total_today_orders': len(shipment_df),
+        'reorder_rate': 0
+    }
+    
+    # 오늘 출고 고객 정보 추출
+    today_customers = []
+    
+    for _, row in shipment_df.iterrows():
+        customer_info = {
+            'name': str(row.get('주문자이름', '')).strip(),
+            'phone': clean_phone_number(str(row.get('주문자전화번호1', ''))),
+            'recipient': str(row.get('수취인이름', '')).strip(),
+            'product': str(row.get('상품이름', '')),
+            'option': str(row.get('옵션이름', '')),
+            'quantity': row.get('상품수량', 1),
+            'amount': row.get('상품결제금액', 0)
+        }
+        
+        # 상품 정보 정제
+        if customer_info['option']:
+            option_quantity, capacity = parse_option_info(customer_info['option'])
+            total_quantity = customer_info['quantity'] * option_quantity
+            
+            product_name = extract_product_from_option(customer_info['option'])
+            if product_name == "기타":
+                product_name = extract_product_from_name(customer_info['product'])
+            
+            standardized_capacity = standardize_capacity(capacity)
+            if standardized_capacity:
+                customer_info['processed_product'] = f"{product_name} {standardized_capacity}"
+                customer_info['processed_quantity'] = total_quantity
+            else:
+                customer_info['processed_product'] = product_name
+                customer_info['processed_quantity'] = total_quantity
+        else:
+            customer_info['processed_product'] = customer_info['product']
+            customer_info['processed_quantity'] = customer_info['quantity']
+        
+        today_customers.append(customer_info)
+    
+    # 주문일시 변환은 이력 전체에서 한 번만
+    history_df = prepare_history(history_df)
+    
+    # 매칭 키(이름, 전화번호 뒤 4자리)는 고정 폭 버퍼 사본으로 한 번만 만들고, 매칭이 끝나면 사본을 제자리에서 지움 (원본 컬럼은 그대로)
+    with CustomerKeys.from_columns(_column(history_df, '주문자이름'), _column(history_df, '주문자전화번호')) as history_keys, \
+         CustomerKeys.from_columns(_column(shipment_df, '주문자이름'), _column(shipment_df, '주문자전화번호1')) as today_keys:
+        # 오늘 고객 전체를 한 번에 매칭 (고객별 이력 전체 탐색 없음)
+        matches = match_customer_history(today_keys, history_keys)
+    matched_orders = history_orders(history_df, matches['row'].unique())
+    
+    # 재주문 고객 요약(주문 수, 누적 금액, 최근 주문일, 최근 10건)을 고객 전체에 대해 한 번에 계산
+    history_summary, recent_orders = summarize_customer_history(matches, matched_orders)
+    
+    for customer_idx, today_customer in enumerate(today_customers):
+        if customer_idx in history_summary.index:
+            # 재주문 고객
+            customer_analysis = analyze_customer_history(
+                today_customer, history_summary.loc[customer_idx], recent_orders[customer_idx]
+            )
+            results['reorder_customers'].append(customer_analysis)
+        else:
+            # 신규 고객
+            results['new_customers'].append({
+                'name': today_customer['name'],
+                'product': today_customer['processed_product'],
+                'quantity': today_customer['processed_quantity'],
+                'amount': today_customer['amount']
+            })
+    
+    # 재주문율 계산
+    if results['total_today_orders'] > 0:
+        results['reorder_rate'] = (len(results['reorder_customers']) / results['total_today_orders']) * 100
+    
+    return results
+
+def analyze_customer_history(today_customer, history_summary, recent_history):
+    """고객 주문 이력 상세 분석 - summarize_customer_history()의 고객별 요약 사용"""
+    # 총 주문 횟수 (오늘 주문 포함)
+    total_orders = int(history_summary['order_count']) + 1
+    
+    # 총 결제 금액
+    total_amount = history_summary['total_amount'] + today_customer.get('amount', 0)
+    
+    # 최근 주문일 (오늘 제외)
+    last_order = history_summary['last_order']
+    last_order_date = last_order.strftime('%Y-%m-%d') if pd.notna(last_order) else "확인 불가"
+    
+    return {
+        'name': today_customer['name'],
+        'real_name': today_customer['name'],  # 실명 (분석용)
+        'phone': today_customer['phone'],
+        'total_orders': total_orders,
+        'total_amount': total_amount,
+        'last_order_date': last_order_date,
+        'match_confidence': float(history_summary['confidence']),  # 이름 유사도 + 전화번호 뒤 4자리 기반
+        'current_order': {
+            'product': today_customer['processed_product'],
+            'quantity': today_customer['processed_quantity'],
+            'amount': today_customer.get('amount', 0)
+        },
+        'order_history': recent_history
+    }
+
+def clean_phone_number(phone):
+    """전화번호에서 숫자만 추출"""
+    return re.sub(r'\D', '', str(phone))
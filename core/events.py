@@ -0,0 +1,32 @@
+# core/events.py
+"""처리 이벤트 수집 - 코어 로직은 메시지를 모아 반환하고, 출력은 호출한 쪽(Streamlit/CLI)이 담당"""
+
+
+class EventLog:
+    """수준별(info/success/warning/error) 메시지 목록"""
+
+    LEVELS = ('info', 'success', 'warning', 'error')
+
+    def __init__(self):
+        self.events = []
+
+    def add(self, level, message):
+        self.events.append((level, message))
+
+    def info(self, message):
+        self.add('info', message)
+
+    def success(self, message):
+        self.add('success', message)
+
+    def warning(self, message):
+        self.add('warning', message)
+
+    def error(self, message):
+        self.add('error', message)
+
+    def __iter__(self):
+        return iter(self.events)
+
+    def __len__(self):
+        return len(self.events)
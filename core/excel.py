@@ -0,0 +1,189 @@
+# core/excel.py
+"""엑셀 읽기 단일 모듈 - 한 번의 파싱으로 필요한 컬럼만 읽기 (Streamlit 의존 없음)
+
+파일 형식(zip 시그니처), 시트, 헤더 행을 같은 워크북 핸들에서 한 번에 판별하고
+그대로 행을 읽으므로, 실패 시 다른 옵션으로 파일 전체를 다시 파싱하지 않습니다.
+"""
+import hashlib
+import io
+
+import pandas as pd
+from openpyxl import load_workbook
+
+# 한 번에 DataFrame으로 만드는 행 수
+DEFAULT_CHUNK_ROWS = 5000
+
+# 헤더 행을 찾기 위해 살펴보는 최대 행 수
+HEADER_SCAN_ROWS = 20
+
+# .xlsx 파일(zip 컨테이너) 시그니처
+ZIP_SIGNATURE = b'PK\x03\x04'
+
+# 세션 파싱 캐시에 보관하는 최대 파일 수
+PARSE_CACHE_ENTRIES = 4
+
+
+class ExcelFormatError(ValueError):
+    """.xlsx(zip) 형식이 아닌 파일"""
+
+
+class ExcelHeaderError(ValueError):
+    """필수 컬럼이 포함된 헤더 행을 찾지 못한 경우"""
+
+    def __init__(self, missing_columns, available_columns):
+        self.missing_columns = list(missing_columns)
+        self.available_columns = list(available_columns)
+        super().__init__(f"필수 컬럼이 없습니다: {', '.join(self.missing_columns)}")
+
+    def __reduce__(self):
+        # 워커 프로세스에서 발생한 예외도 그대로 전달되도록 생성자 인자로 직렬화
+        return (self.__class__, (self.missing_columns, self.available_columns))
+
+
+def _normalize_header(values):
+    """헤더 셀 값을 비교 가능한 문자열로 정리"""
+    return [str(value).strip() if value is not None else "" for value in values]
+
+
+def content_hash(data):
+    """업로드 파일 내용의 SHA-256 지문"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def combine_fingerprints(file_fingerprints):
+    """파일별 지문(content_hash)을 묶음 지문으로 (파일 순서와 무관) - 파일이 하나면 그 파일의 지문"""
+    file_fingerprints = sorted(file_fingerprints)
+    if len(file_fingerprints) == 1:
+        return file_fingerprints[0]
+    return content_hash("".join(file_fingerprints).encode())
+
+
+def upload_fingerprint(contents):
+    """업로드 파일 묶음의 지문 (파일 순서와 무관) - 파일이 하나면 그 파일의 지문"""
+    return combine_fingerprints([content_hash(data) for data in contents])
+
+
+def _open_stream(source):
+    """bytes 또는 파일 객체를 처음 위치의 스트림으로 열고 zip 시그니처 확인"""
+    stream = io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else source
+    if hasattr(stream, 'seek'):
+        stream.seek(0)
+    signature = stream.read(len(ZIP_SIGNATURE))
+    stream.seek(0)
+    if signature != ZIP_SIGNATURE:
+        raise ExcelFormatError("xlsx 형식의 파일이 아닙니다")
+    return stream
+
+
+def resolve_header(rows, required_columns, scan_rows=HEADER_SCAN_ROWS):
+    """앞쪽 행들 중 필수 컬럼을 모두 포함한 첫 행을 헤더로 선택
+
+    필수 컬럼이 없으면 값이 있는 첫 행을 헤더로 사용합니다.
+    rows 이터레이터는 헤더 행까지 소비됩니다. 헤더를 찾지 못하면 ExcelHeaderError.
+    """
+    best_header = []
+    best_missing = list(required_columns)
+
+    for _, values in zip(range(scan_rows), rows):
+        header = _normalize_header(values)
+        if not any(header):
+            continue
+        missing = [col for col in required_columns if col not in header]
+        if not missing:
+            return header
+        if len(missing) < len(best_missing):
+            best_header, best_missing = header, missing
+
+    if not required_columns:
+        return []
+    raise ExcelHeaderError(best_missing, [col for col in best_header if col])
+
+
+def iter_excel_chunks(source, columns=None, required_columns=(), chunk_rows=DEFAULT_CHUNK_ROWS):
+    """워크북 첫 시트를 읽기 전용 모드로 열어 지정 컬럼만 청크(DataFrame)로 반환
+
+    - source: bytes 또는 파일 객체 (.xlsx)
+    - columns: 읽을 컬럼 (파일에 없는 컬럼은 건너뜀, None이면 헤더의 모든 컬럼)
+    - required_columns: 헤더 행 판별 및 필수 여부 확인용 컬럼
+    지정하지 않은 컬럼(주소 등 개인정보)은 DataFrame으로 만들지 않습니다.
+    """
+    workbook = load_workbook(_open_stream(source), read_only=True, data_only=True)
+    try:
+        worksheet = workbook.worksheets[0]
+        # 일부 쇼핑몰 엑셀은 시트 크기 정보가 잘못되어 있어 전체 행을 직접 읽음
+        worksheet.reset_dimensions()
+        rows = worksheet.iter_rows(values_only=True)
+
+        header = resolve_header(rows, required_columns)
+        if columns is None:
+            columns = [col for col in dict.fromkeys(header) if col]
+        selected = [(col, header.index(col)) for col in columns if col in header]
+        names = [col for col, _ in selected]
+        indexes = [idx for _, idx in selected]
+
+        buffer = []
+        for values in rows:
+            record = tuple(values[idx] if idx < len(values) else None for idx in indexes)
+            if all(value is None for value in record):
+                continue
+            buffer.append(record)
+            if len(buffer) >= chunk_rows:
+                yield pd.DataFrame.from_records(buffer, columns=names)
+                buffer = []
+
+        if buffer:
+            yield pd.DataFrame.from_records(buffer, columns=names)
+    finally:
+        workbook.close()
+
+
+def read_excel_frame(source, columns=None, required_columns=()):
+    """워크북을 한 번 파싱해 하나의 DataFrame으로 반환 (데이터 행이 없으면 빈 DataFrame)"""
+    chunks = list(iter_excel_chunks(source, columns, required_columns))
+    if not chunks:
+        return pd.DataFrame()
+    return pd.concat(chunks, ignore_index=True)
+
+
+def parse_cache_key(data, columns=None):
+    """파싱 캐시 키 - (내용 지문, 읽는 컬럼)"""
+    return (content_hash(data), tuple(columns) if columns is not None else None)
+
+
+def remember_parsed(cache, key, df):
+    """파싱 결과를 cache에 보관 - 가장 오래된 항목부터 PARSE_CACHE_ENTRIES 개수를 넘지 않도록 정리"""
+    cache[key] = df
+    while len(cache) > PARSE_CACHE_ENTRIES:
+        cache.pop(next(iter(cache)))
+
+
+def read_excel_cached(data, cache, columns=None, required_columns=()):
+    """내용 지문(SHA-256) 기준으로 파싱 결과를 cache(dict)에 보관 - 같은 파일은 다시 파싱하지 않음"""
+    key = parse_cache_key(data, columns)
+    if key in cache:
+        return cache[key]
+
+    df = read_excel_frame(data, columns, required_columns)
+    remember_parsed(cache, key, df)
+    return df
+
+
+def record_read_outcome(file_name, outcome, events):
+    """파싱 결과(DataFrame 또는 예외)를 events(EventLog)에 기록 - DataFrame이면 그대로, 예외면 None 반환"""
+    if isinstance(outcome, ExcelFormatError):
+        events.error(f"❌ {file_name}: 파일 형식 오류")
+        events.info("💡 파일이 손상되었거나 올바른 Excel 형식이 아닙니다.")
+        return None
+    if isinstance(outcome, ExcelHeaderError):
+        events.error(f"❌ {file_name}: 필수 컬럼이 없습니다: {', '.join(outcome.missing_columns)}")
+        return None
+    if isinstance(outcome, Exception):
+        events.error(f"❌ {file_name}: 파일 읽기 실패")
+        events.info("💡 파일을 다시 저장하거나 다른 파일을 시도해주세요.")
+        return None
+
+    if len(outcome) == 0:
+        events.warning(f"⚠️ {file_name}: 파일이 비어있습니다")
+    else:
+        events.success(f"✅ {file_name}: 파일 읽기 성공 ({len(outcome):,}행)")
+    return outcome
@@ -0,0 +1,434 @@
+# core/history_store.py
+"""고객 주문 이력 저장소 - 전화번호 뒤 4자리(없으면 정규화한 이름) 해시로 나눈 암호화 샤드 + 블룸 필터 (Streamlit 의존 없음)
+
+매칭은 블로킹 키(첫 두 음절, 첫 음절 + 마지막 음절)가 같은 이력만 비교하고, 뒤 4자리가 서로 다르면
+매칭하지 않습니다. 그래서 각 이력 행은 뒤 4자리의 샤드 한 곳에만 저장되고(번호가 없는 행은
+매칭과 같은 이름 정규화 - NFC, 공백 제거, 영문 소문자 - 를 거친 이름의 샤드), 블룸 필터에는
+'블로킹 키|뒤 4자리' 키가(번호가 없는 행은 정규화한 이름 키가) 들어갑니다.
+
+오늘 고객은 자기 블로킹 키 + 뒤 4자리가 필터에 있을 때만 그 뒤 4자리 샤드를, 정규화한 이름이 필터에
+있을 때만 그 이름 샤드를 불러옵니다. 둘 다 없으면 저장소 모드에서 신규 고객입니다.
+따라서 불러온 샤드에는 블로킹 키 하나와 뒤 4자리가 같은 이력과, 번호 없이 이름만 같은 이력이 모두 포함됩니다.
+그 밖의 매칭 - 첫 음절이 다른 오타, 한쪽에 번호가 없을 때 이름 유사도만으로 통과하는 긴 이름의 오타,
+번호가 없는 오늘 고객과 번호가 있는 이력 - 은 저장소 모드에서 찾지 않고 신규 고객으로 판단될 수 있습니다
+(이력 파일을 함께 올리면 전체와 매칭).
+
+샤드 수는 저장된 행 수에 맞춰(샤드당 HISTORY_SHARD_TARGET_ROWS행) 2배씩 늘어나므로, 오늘 불러오고
+다시 쓰는 샤드 수는 저장소 크기가 아니라 오늘 고객 수를 따라갑니다. 저장할 때는 내용이 바뀐 샤드만
+다시 쓰고, 샤드/필터/목록은 GitHub 커밋 하나로 함께 저장됩니다.
+"""
+import hashlib
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from config.settings import (
+    CUSTOMER_HISTORY_DIR, HISTORY_SHARD_TARGET_ROWS, HISTORY_MIN_SHARDS, HISTORY_MAX_SHARDS,
+    CUSTOMER_FILTER_BITS, CUSTOMER_FILTER_HASHES,
+)
+from core.bloom import BloomFilter
+from core.customers import customer_keys, parse_order_dates, CUMULATIVE_DATE_FORMAT, HISTORY_COLUMNS
+from core.events import EventLog
+from core.excel import DEFAULT_CHUNK_ROWS
+from core.matching import normalize_names, name_blocking_keys
+from core.report import export_frames
+from core.storage import fetch, publish_files, get_current_time_str
+
+# 같은 주문으로 보는 기준 (같은 날 같은 고객이 같은 상품을 주문한 경우 마지막 행만 보관)
+DEDUP_COLUMNS = ['주문일시', '주문자이름', '주문자전화번호', '상품이름']
+
+# 샤드 파일을 동시에 불러오는 요청 수
+FETCH_WORKERS = 8
+
+# 샤드 배치/필터 형식 - 목록의 값이 다르면 다음 저장 때 전체 이력을 한 번 다시 나눠 저장
+STORE_LAYOUT = 3
+
+def shard_count_for_rows(total_rows):
+    """저장 행 수에 맞는 샤드 수 - 샤드당 HISTORY_SHARD_TARGET_ROWS행이 되는 2의 거듭제곱 (최소/최대 설정 안)"""
+    needed = max(1, -(-int(total_rows) // HISTORY_SHARD_TARGET_ROWS))
+    count = 1 << (needed - 1).bit_length()
+    return int(min(max(count, HISTORY_MIN_SHARDS), HISTORY_MAX_SHARDS))
+
+def shard_of_key(key, shard_count):
+    """배치 키의 샤드 번호 (SHA-256 앞 8자리 기준)"""
+    return int(hashlib.sha256(key.encode()).hexdigest()[:8], 16) % shard_count
+
+def lookup_keys(names, phones):
+    """행별 저장소 키 - (배치 키, 번호 필터 키 배열 목록, 이름 필터 키) 모두 object 배열
+
+    배치 키: 'p:뒤 4자리' (번호가 없으면 'n:정규화한 이름')
+    번호 필터 키: 블로킹 키마다 'k:블로킹 키|뒤 4자리' (이름이 비었거나 번호가 없으면 None)
+    이름 필터 키: 'n:정규화한 이름' (이름이 비었으면 None)
+    """
+    keys = customer_keys(names, phones)
+    normalized = normalize_names(keys['name']).astype(object)
+    last4 = keys['phone_last4'].astype(object)
+    has_name = (normalized != '').to_numpy(dtype=bool)
+    has_phone = last4.notna().to_numpy()
+
+    name_keys = ('n:' + normalized).to_numpy(dtype=object)
+    placement = np.where(has_phone, ('p:' + last4.fillna('')).to_numpy(dtype=object), name_keys)
+    phone_keys = [
+        np.where(has_name & has_phone, ('k:' + block.astype(object) + '|' + last4.fillna('')).to_numpy(dtype=object), None)
+        for block in name_blocking_keys(normalized)
+    ]
+    return placement, phone_keys, np.where(has_name, name_keys, None)
+
+def placement_shards(placement, shard_count):
+    """배치 키별 샤드 번호 배열 (해시는 고유 키마다 한 번만 계산)"""
+    codes, unique_keys = pd.factorize(placement)
+    return np.array([shard_of_key(key, shard_count) for key in unique_keys], dtype=np.int64)[codes]
+
+def add_customers_to_filter(customer_filter, rows):
+    """이력 행의 필터 키를 추가 - 번호가 있으면 '블로킹 키|뒤 4자리', 없으면 정규화한 이름"""
+    _, phone_keys, name_keys = lookup_keys(rows['주문자이름'], rows['주문자전화번호'])
+    has_phone = pd.notna(phone_keys[0])
+    keys = set(name_keys[~has_phone & pd.notna(name_keys)])
+    for column in phone_keys:
+        keys.update(column[pd.notna(column)])
+    customer_filter.add(keys)
+
+def to_history_rows(df):
+    """이력/출고 데이터를 저장 형식(HISTORY_COLUMNS, 주문일시는 YYYY-MM-DD)으로 변환"""
+    rows = pd.DataFrame({
+        col: df[col].to_numpy() if col in df.columns else None for col in HISTORY_COLUMNS
+    })
+    rows['주문일시'] = parse_order_dates(rows['주문일시']).dt.strftime(CUMULATIVE_DATE_FORMAT)
+    return rows
+
+def shipment_to_history_rows(shipment_df, order_date):
+    """출고내역서를 고객주문정보 형식의 이력 행으로 변환 (주문일시 = order_date)"""
+    def column(name, default):
+        return shipment_df[name].to_numpy() if name in shipment_df.columns else default
+
+    return to_history_rows(pd.DataFrame({
+        '주문일시': order_date,
+        '주문자이름': column('주문자이름', ''),
+        '주문자전화번호': column('주문자전화번호1', ''),
+        '상품이름': column('상품이름', ''),
+        '상품수량': column('상품수량', 1),
+        '상품결제금액': column('상품결제금액', 0),
+        '수취인이름': column('수취인이름', ''),
+        '옵션이름': column('옵션이름', ''),
+    }, index=shipment_df.index))
+
+def merge_history_rows(existing, new_rows):
+    """기존 이력에 새 행 추가 - 같은 주문은 새 행으로 대체, 주문일시 내림차순 정렬"""
+    merged = pd.concat([existing, new_rows], ignore_index=True)
+    merged = merged.drop_duplicates(subset=DEDUP_COLUMNS, keep='last')
+    return merged.sort_values('주문일시', ascending=False, kind='stable', ignore_index=True)
+
+def cumulative_order(history_df, new_rows):
+    """누적 고객주문정보의 행 순서 - 두 프레임을 이어 붙인 위치 기준 (중복 주문은 마지막 행만, 주문일시 내림차순)
+
+    중복 판별은 DEDUP_COLUMNS의 행 해시로, 정렬은 주문일시 컬럼만 모아서 계산하므로
+    다른 컬럼은 복사하지 않습니다. 반환값: (위치 배열, 위치별 주문일시 datetime64 배열)
+    """
+    key_hashes = np.concatenate([
+        pd.util.hash_pandas_object(df.reindex(columns=DEDUP_COLUMNS), index=False).to_numpy()
+        for df in (history_df, new_rows)
+    ])
+    keep = np.flatnonzero(~pd.Series(key_hashes).duplicated(keep='last').to_numpy())
+
+    raw_dates = pd.concat([
+        df['주문일시'] if '주문일시' in df.columns else pd.Series(None, index=df.index, dtype=object)
+        for df in (history_df, new_rows)
+    ], ignore_index=True).iloc[keep]
+    dates = parse_order_dates(raw_dates).reset_index(drop=True)
+    order = dates.sort_values(ascending=False, na_position='last', kind='stable').index.to_numpy()
+    return keep[order], dates.to_numpy()[order]
+
+def iter_cumulative_history(history_df, new_rows, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """기존 이력 + 새 이력 행을 누적 고객주문정보 순서대로 chunk_rows행씩 생성
+
+    기존 이력에 HISTORY_COLUMNS가 모두 있으면 그 컬럼만, 아니면 기존 컬럼 전체를 사용합니다.
+    주문일시는 YYYY-MM-DD로 기록되고, 새 행이 없으면 기존 이력을 그대로 돌려줍니다.
+    전체를 한 번에 복사하지 않으므로 추가 메모리는 정렬 키와 청크 하나 크기입니다.
+    """
+    if all(col in history_df.columns for col in HISTORY_COLUMNS):
+        history_df = history_df[HISTORY_COLUMNS]
+    if len(new_rows) == 0:
+        for start in range(0, len(history_df), chunk_rows):
+            yield history_df.iloc[start:start + chunk_rows]
+        return
+
+    columns = list(dict.fromkeys([*history_df.columns, *new_rows.columns]))
+    history_df = history_df.reindex(columns=columns)
+    new_rows = new_rows.reindex(columns=columns)
+    positions, dates = cumulative_order(history_df, new_rows)
+    history_count = len(history_df)
+
+    for start in range(0, len(positions), chunk_rows):
+        chunk_positions = positions[start:start + chunk_rows]
+        from_history = chunk_positions < history_count
+        chunk = pd.concat([
+            history_df.iloc[chunk_positions[from_history]],
+            new_rows.iloc[chunk_positions[~from_history] - history_count],
+        ], ignore_index=True)
+
+        # 기존/새 행으로 나눠 가져온 청크를 원래 순서로 되돌림
+        order = np.empty(len(chunk_positions), dtype=np.int64)
+        history_rows = int(from_history.sum())
+        order[from_history] = np.arange(history_rows)
+        order[~from_history] = history_rows + np.arange(len(chunk_positions) - history_rows)
+        chunk = chunk.iloc[order].reset_index(drop=True)
+        chunk['주문일시'] = pd.Series(dates[start:start + len(chunk_positions)]).dt.strftime(CUMULATIVE_DATE_FORMAT)
+        yield chunk
+
+def cumulative_export(history_df, shipment_df, events, fmt, today):
+    """기존 이력 + 오늘 출고내역 = 누적 고객주문정보 파일 바이트 (xlsx/csv/parquet) - 실패하면 None
+
+    원본 프레임은 복사하지 않고, 정렬된 행을 청크 단위로 바로 파일에 기록합니다.
+    """
+    try:
+        # 중복 제거(같은 날 같은 고객의 같은 상품은 마지막 행) + 날짜순 정렬 결과를 청크 단위로 기록
+        return export_frames(
+            iter_cumulative_history(history_df, shipment_to_history_rows(shipment_df, today)),
+            fmt, '고객주문정보', columns=history_df.columns
+        )
+    except Exception as e:
+        events.error(f"❌ 누적 고객 데이터 파일 생성 실패: {str(e)}")
+        return None
+
+def partition_history_rows(rows, shard_count):
+    """이력 행을 배치 키(뒤 4자리, 번호가 없으면 정규화한 이름)의 샤드별로 나눔 - {샤드 번호: DataFrame} (행마다 샤드 하나)"""
+    placement, _, _ = lookup_keys(rows['주문자이름'], rows['주문자전화번호'])
+    shard_ids = placement_shards(placement, shard_count)
+    return {int(shard_id): group for shard_id, group in rows.groupby(shard_ids, sort=False)}
+
+def combine_shards(frames):
+    """불러온 샤드들을 하나의 이력으로 - 주문일시 내림차순"""
+    history = pd.concat(frames, ignore_index=True)
+    return history.sort_values('주문일시', ascending=False, kind='stable', ignore_index=True)
+
+def rows_to_payload(rows):
+    """이력 DataFrame → 암호화 저장용 JSON 직렬화 가능한 dict"""
+    values = rows[HISTORY_COLUMNS].astype(object)
+    values = values.where(values.notna(), None)
+    return {'columns': HISTORY_COLUMNS, 'rows': values.values.tolist()}
+
+def payload_to_rows(payload):
+    """rows_to_payload() 결과 → 이력 DataFrame (빈 샤드면 빈 프레임)"""
+    if not payload:
+        return pd.DataFrame(columns=HISTORY_COLUMNS)
+    return pd.DataFrame(payload.get('rows', []), columns=payload.get('columns', HISTORY_COLUMNS))
+
+def same_payload_rows(first, second):
+    """두 샤드 payload의 행 집합이 같은지 (순서 무관) - 같으면 다시 쓸 필요 없음"""
+    def row_set(payload):
+        return sorted(json.dumps(row, ensure_ascii=False, default=str) for row in payload['rows'])
+    return len(first['rows']) == len(second['rows']) and row_set(first) == row_set(second)
+
+
+class HistoryStore:
+    """GitHub에 저장된 샤드 단위 고객 주문 이력 - 토큰과 키는 호출한 쪽에서 전달
+
+    shard_count를 주면 그 샤드 수로 고정하고, 없으면 저장 행 수에 맞춰 늘립니다 (shard_count_for_rows).
+    """
+
+    def __init__(self, token, key, events=None, directory=CUSTOMER_HISTORY_DIR, shard_count=None):
+        self.token = token
+        self.key = key
+        self.events = events if events is not None else EventLog()
+        self.directory = directory
+        self.shard_count = shard_count
+        self.fixed_shard_count = shard_count
+        self._manifest = None
+        self._filter = None
+
+    @property
+    def manifest_path(self):
+        return f"{self.directory}/manifest_encrypted.json"
+
+    @property
+    def filter_path(self):
+        return f"{self.directory}/customer_filter_encrypted.json"
+
+    def shard_path(self, shard_id):
+        return f"{self.directory}/shard_{shard_id:03d}_encrypted.json"
+
+    def legacy_index_paths(self, manifest):
+        """이전 형식 목록이 가리키는 색인 파일 경로 (전화번호 뒤 4자리 색인, 형식 2의 블로킹 키 색인)"""
+        paths = []
+        if manifest.get('phone_index'):
+            paths.append(f"{self.directory}/phone_index_encrypted.json")
+        if manifest.get('layout') == 2:
+            paths.append(f"{self.directory}/customer_index_encrypted.json")
+        return paths
+
+    def manifest(self):
+        """저장소 목록 - 한 번만 불러옴
+
+        {'shard_count', 'shards': {번호: 행 수}, 'total_rows', 'layout', 'updated_at'}
+        """
+        if self._manifest is None:
+            manifest, _ = fetch(self.manifest_path, self.token, self.key, self.events)
+            self._manifest = manifest or {'shard_count': self.shard_count, 'shards': {}, 'total_rows': 0}
+            # 저장된 샤드 배치를 그대로 사용 (샤드 수는 다시 나눠 저장할 때만 바뀜)
+            self.shard_count = self._manifest.get('shard_count') or self.shard_count
+        return self._manifest
+
+    def is_empty(self):
+        return not self.manifest().get('shards')
+
+    def is_current_layout(self):
+        """현재 형식(STORE_LAYOUT)의 배치/필터로 저장된 저장소인지"""
+        return self.manifest().get('layout') == STORE_LAYOUT
+
+    def target_shard_count(self, total_rows):
+        """total_rows행을 저장할 샤드 수 - 고정 샤드 수가 있으면 그 값"""
+        return self.fixed_shard_count or shard_count_for_rows(total_rows)
+
+    def needs_more_shards(self, total_rows):
+        """샤드당 행 수가 목표(HISTORY_SHARD_TARGET_ROWS)의 2배를 넘었는지 - 고정 샤드 수면 늘리지 않음"""
+        return (self.fixed_shard_count is None and self.shard_count < HISTORY_MAX_SHARDS
+                and total_rows > 2 * HISTORY_SHARD_TARGET_ROWS * self.shard_count)
+
+    def load_shards(self, shard_ids):
+        """샤드들을 동시에 불러와 {번호: DataFrame} 반환 - 목록에 없는 샤드는 요청하지 않음"""
+        stored = self.manifest().get('shards', {})
+        shard_ids = sorted(shard_id for shard_id in shard_ids if str(shard_id) in stored)
+
+        def load(shard_id):
+            payload, _ = fetch(self.shard_path(shard_id), self.token, self.key, self.events)
+            return shard_id, payload_to_rows(payload)
+
+        with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as pool:
+            return dict(pool.map(load, shard_ids))
+
+    def customer_filter(self):
+        """저장된 고객 블룸 필터 - 현재 형식의 필터가 없는 저장소면 None"""
+        if self._filter is None and self.is_current_layout():
+            payload, _ = fetch(self.filter_path, self.token, self.key, self.events)
+            self._filter = BloomFilter.from_payload(payload) if payload else None
+        return self._filter
+
+    def candidate_shards(self, names, phones):
+        """오늘 고객의 매칭에 필요한 샤드 - (고객별 재주문 가능성 bool 배열, 샤드 번호 집합)
+
+        '블로킹 키|뒤 4자리'가 필터에 있으면 뒤 4자리 샤드, 정규화한 이름이 필터에 있으면 이름 샤드를 불러옵니다.
+        둘 다 없는 고객(False)은 저장소 모드에서 신규 고객입니다.
+        현재 형식의 필터가 없는 저장소면 모든 고객이 True이고 저장된 샤드 전체가 필요합니다.
+        """
+        placement, phone_keys, name_keys = lookup_keys(names, phones)
+        customer_filter = self.customer_filter()
+        if customer_filter is None:
+            return np.ones(len(placement), dtype=bool), {int(shard_id) for shard_id in self.manifest().get('shards', {})}
+
+        def filter_hits(keys):
+            present = pd.notna(keys)
+            hits = np.zeros(len(keys), dtype=bool)
+            hits[present] = customer_filter.might_contain(keys[present])
+            return hits
+
+        phone_hit = np.zeros(len(placement), dtype=bool)
+        for keys in phone_keys:
+            phone_hit |= filter_hits(keys)
+        name_hit = filter_hits(name_keys)
+
+        # 번호가 없는 이력 행은 이름 키 자체가 배치 키
+        shards = set(placement_shards(placement[phone_hit], self.shard_count).tolist())
+        shards.update(placement_shards(name_keys[name_hit], self.shard_count).tolist())
+        return phone_hit | name_hit, shards
+
+    def possibly_returning(self, names, phones):
+        """고객별 재주문 가능성 (bool 배열) - False면 저장소 모드에서 매칭될 이력이 없는 신규 고객"""
+        possible, _ = self.candidate_shards(names, phones)
+        return possible
+
+    def load_for_customers(self, names, phones):
+        """오늘 고객과 매칭될 수 있는 이력만 불러옴 - (이력 DataFrame, 불러온 샤드 수, 신규 고객 수)
+
+        블로킹 키 하나 + 전화번호 뒤 4자리가 같은 이력과 번호 없이 정규화한 이름이 같은 이력은 모두 포함됩니다
+        (그 밖의 오타 매칭은 모듈 설명 참고).
+        """
+        self.manifest()
+        possible, shard_ids = self.candidate_shards(names, phones)
+        new_count = int((~possible).sum())
+
+        shards = self.load_shards(shard_ids)
+        if not shards:
+            return pd.DataFrame(columns=HISTORY_COLUMNS), 0, new_count
+
+        return combine_shards(shards.values()), len(shards), new_count
+
+    def load_all(self):
+        """저장된 이력 전체"""
+        shards = self.load_shards(int(shard_id) for shard_id in self.manifest().get('shards', {}))
+        if not shards:
+            return pd.DataFrame(columns=HISTORY_COLUMNS)
+        return combine_shards(shards.values())
+
+    def append(self, rows, label):
+        """이력 행을 해당 샤드에만 추가 - 내용이 바뀐 샤드, 필터, 목록을 커밋 하나로 저장하면 True
+
+        이전 형식 저장소이거나 샤드당 행 수가 목표의 2배를 넘으면 전체 이력을 새 샤드 수로 한 번 다시 나눠 저장합니다.
+        """
+        manifest = self.manifest()
+        rows = to_history_rows(rows)
+        stored = manifest.get('shards', {})
+        files = {}
+
+        total_rows = manifest.get('total_rows', 0) + len(rows)
+        if stored and (not self.is_current_layout() or self.needs_more_shards(total_rows)):
+            # 이전 샤드/색인 파일은 삭제 (새 배치에서 같은 경로를 쓰는 샤드는 아래에서 다시 기록)
+            files = {self.shard_path(int(shard_id)): None for shard_id in stored}
+            files.update({path: None for path in self.legacy_index_paths(manifest)})
+            rows = merge_history_rows(self.load_all(), rows)
+            self.shard_count = self.target_shard_count(len(rows))
+            shard_rows, existing, customer_filter = {}, {}, None
+            partitions = partition_history_rows(rows, self.shard_count)
+        else:
+            if not stored:
+                self.shard_count = self.target_shard_count(total_rows)
+            shard_rows, customer_filter = dict(stored), self.customer_filter()
+            partitions = partition_history_rows(rows, self.shard_count)
+            existing = self.load_shards(partitions.keys())
+
+        for shard_id, new_rows in sorted(partitions.items()):
+            current = existing.get(shard_id)
+            merged = merge_history_rows(current if current is not None else pd.DataFrame(columns=HISTORY_COLUMNS), new_rows)
+            payload = rows_to_payload(merged)
+            if current is not None and same_payload_rows(payload, rows_to_payload(current)):
+                continue
+            files[self.shard_path(shard_id)] = payload
+            shard_rows[str(shard_id)] = len(merged)
+
+        # 필터는 새 행의 키만 추가
+        if customer_filter is None:
+            customer_filter = BloomFilter(CUSTOMER_FILTER_BITS, CUSTOMER_FILTER_HASHES)
+        add_customers_to_filter(customer_filter, rows)
+
+        manifest = {
+            'shard_count': self.shard_count,
+            'shards': shard_rows,
+            'total_rows': sum(shard_rows.values()),
+            'layout': STORE_LAYOUT,
+            'updated_at': get_current_time_str(),
+        }
+        files[self.filter_path] = customer_filter.to_payload()
+        files[self.manifest_path] = manifest
+
+        commit_message = f"고객 이력 업데이트 ({label}) - {get_current_time_str()}"
+        if not publish_files(files, commit_message, self.token, self.key, self.events):
+            return False
+        self._manifest, self._filter = manifest, customer_filter
+        return True
+
+def store_customer_history(history_df, shipment_df, events, store, source, today):
+    """오늘 출고내역(source='shipment') 또는 고객주문정보(source='history')를 고객 이력 저장소에 추가
+
+    store: (토큰, 암호화 키) - 없으면 저장하지 않음
+    반환값: 저장한 행 수 (실패하면 0)
+    """
+    if store is None:
+        events.error("❌ 고객 이력 저장소에 연결할 수 없습니다.")
+        return 0
+    if source == 'shipment':
+        rows, label = shipment_to_history_rows(shipment_df, today), f"{today} 출고"
+    else:
+        rows, label = history_df, "고객주문정보 가져오기"
+    saved = HistoryStore(*store, events=events).append(rows, label)
+    return len(rows) if saved else 0
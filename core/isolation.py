@@ -0,0 +1,100 @@
+# core/isolation.py
+"""격리 실행 - 고객 개인정보를 다루는 작업을 잠깐 띄운 워커 프로세스에서 실행 (Streamlit 의존 없음)
+
+워커는 업로드 바이트를 받아 파싱/분석하고 결과와 메시지만 돌려준 뒤 종료됩니다.
+파싱한 DataFrame은 서버 프로세스에 만들어지지 않고, 워커가 쓴 메모리는 종료와 함께 운영체제가 모두 회수합니다.
+"""
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from core.analytics import analyze_history
+from core.customers import (
+    read_customer_workbooks, match_and_analyze_customers,
+    SHIPMENT_COLUMNS, SHIPMENT_REQUIRED_COLUMNS
+)
+from core.events import EventLog
+from core.excel import read_excel_frame, record_read_outcome
+from core.history_store import HistoryStore
+
+def run_isolated(func, *args):
+    """func(*args)를 새 워커 프로세스 하나에서 실행하고 결과 반환 - 작업이 끝나면 워커는 종료
+
+    func와 인자/결과는 pickle 가능해야 하며, 워커에서 발생한 예외는 그대로 다시 발생합니다.
+    """
+    # Streamlit 서버 스레드를 fork하지 않도록 spawn 사용
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+        return pool.submit(func, *args).result()
+
+def load_customer_frames(history_upload, shipment_upload, store, events):
+    """업로드 바이트로 고객 분석 프레임 준비 - (history_df, shipment_df, 저장소 불러오기 정보)
+
+    history_upload, shipment_upload: (파일명, bytes) - history_upload가 None이면
+    store(토큰, 암호화 키)의 고객 이력 저장소에서 오늘 고객과 관련된 샤드만 불러옵니다.
+    읽지 못한 프레임은 None이며 이유는 events에 기록됩니다.
+    """
+    shipment_name, shipment_data = shipment_upload
+
+    if history_upload is not None:
+        history_name, history_data = history_upload
+        # 워커 안에서도 두 파일은 파일별 프로세스에서 동시에 파싱 (작은 파일은 read_customer_workbooks가 순서대로 처리)
+        frames = read_customer_workbooks(history_data, shipment_data)
+        return (record_read_outcome(history_name, frames['history'], events),
+                record_read_outcome(shipment_name, frames['shipment'], events), None)
+
+    try:
+        shipment_df = read_excel_frame(shipment_data, SHIPMENT_COLUMNS, SHIPMENT_REQUIRED_COLUMNS)
+    except Exception as e:
+        shipment_df = e
+    shipment_df = record_read_outcome(shipment_name, shipment_df, events)
+    if shipment_df is None:
+        return None, None, None
+    if store is None:
+        events.error("❌ 고객 이력 저장소에 연결할 수 없습니다.")
+        return None, shipment_df, None
+
+    history_df, loaded_shards, new_count = HistoryStore(*store, events=events).load_for_customers(
+        shipment_df['주문자이름'], shipment_df['주문자전화번호1']
+    )
+    return history_df, shipment_df, {'shards': loaded_shards, 'rows': len(history_df), 'new_customers': new_count}
+
+def customer_analysis_job(history_upload, shipment_upload, store=None):
+    """워커 작업: 재주문/신규 고객 분석 - (결과 dict 또는 None, 메시지 목록)
+
+    결과에는 원본 프레임이 없고, 저장소에서 이력을 불러왔으면 'store_load'(샤드 수, 행 수, 신규 고객 수)가 들어 있습니다.
+    """
+    events = EventLog()
+    history_df, shipment_df, store_load = load_customer_frames(history_upload, shipment_upload, store, events)
+    if history_df is None or shipment_df is None:
+        return None, list(events)
+
+    results = match_and_analyze_customers(history_df, shipment_df)
+    results['store_load'] = store_load
+    return results, list(events)
+
+def source_task_job(task, history_upload, shipment_upload, store, *args):
+    """워커 작업: 업로드를 다시 읽어 task(history_df, shipment_df, events, *args) 실행 - (task 결과, 메시지 목록)
+
+    누적 파일 생성, 저장소 저장 등 분석 후 원본 프레임이 필요한 작업을 서버에 프레임을 두지 않고 실행합니다.
+    워커마다 업로드를 다시 파싱하므로 서버의 파싱 캐시는 쓰지 않습니다 (작업마다 파싱 시간만큼 느려짐).
+    """
+    events = EventLog()
+    history_df, shipment_df, _ = load_customer_frames(history_upload, shipment_upload, store, events)
+    if history_df is None or shipment_df is None:
+        return None, list(events)
+    return task(history_df, shipment_df, events, *args), list(events)
+
+def store_analytics_job(store):
+    """워커 작업: 고객 이력 저장소 전체 분석 - (analyze_history() 집계에서 주문 프레임을 뺀 dict 또는 None, 메시지 목록)"""
+    events = EventLog()
+    if store is None:
+        events.error("❌ 고객 이력 저장소에 연결할 수 없습니다.")
+        return None, list(events)
+
+    history_df = HistoryStore(*store, events=events).load_all()
+    analytics = analyze_history(history_df) if not history_df.empty else None
+    if analytics is None:
+        events.warning("⚠️ 분석할 고객 이력이 없습니다.")
+        return None, list(events)
+    analytics.pop('orders')
+    return analytics, list(events)
@@ -0,0 +1,163 @@
+# core/matching.py
+"""고객 매칭 - 이름 정규화, 블로킹 키로 후보 축소, 이름 유사도 + 전화번호 뒤 4자리로 매칭 신뢰도 계산 (Streamlit 의존 없음)
+
+이력 전체와 비교하지 않고 블로킹 키(전화번호 뒤 4자리, 이름 첫 음절 기반 키)가 같은
+고객끼리만 비교하므로, 비교 횟수는 이력 크기가 아니라 블록 크기에 비례합니다.
+"""
+import unicodedata
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from core.pii import wipe_buffer
+
+# 이 신뢰도 이상이면 같은 고객으로 판단
+MATCH_THRESHOLD = 0.8
+
+# 전화번호 뒤 4자리가 같을 때 이름 유사도에 더하는 점수
+# - 세 음절 이름의 한 음절 오타(이영희/이영이, 유사도 약 0.71)까지 통과
+SAME_PHONE_BONUS = 0.1
+
+# 어느 한쪽에 전화번호가 없어 뒤 4자리로 확인할 수 없는 매칭에 곱하는 가중치
+# - 정규화한 이름이 같으면 통과(0.85), 이름만으로는 긴 이름의 자모 한두 개 차이까지만 통과
+# 양쪽 모두 번호가 있는데 뒤 4자리가 다르면 이름이 같아도 다른 고객으로 판단 (흔한 이름의 동명이인)
+NAME_ONLY_WEIGHT = 0.85
+
+# 한글 음절 → 자모 분해 (유사도를 자모 단위로 계산해 받침/모음 하나 차이는 부분 점수)
+_HANGUL_FIRST, _HANGUL_LAST = 0xAC00, 0xD7A3
+
+def normalize_names(names):
+    """매칭용 이름 - 유니코드 NFC 정규화(자모 분리 입력 결합), 모든 공백 제거, 영문 소문자"""
+    text = names.astype('string').fillna('')
+    return text.str.normalize('NFC').str.replace(r'\s+', '', regex=True).str.lower()
+
+def name_blocking_keys(normalized):
+    """이름 블로킹 키 두 개 - (첫 두 음절, 첫 음절 + 마지막 음절)
+
+    첫 음절(성)만으로는 블록이 너무 커지므로 음절 하나를 더 붙입니다.
+    가운데 음절 오타는 첫 번째 키로, 두 번째 음절 오타는 두 번째 키로 같은 블록에 들어갑니다.
+    """
+    return normalized.str[:2], normalized.str[:1] + normalized.str[-1:]
+
+def _jamo(text):
+    """한글 음절을 초성/중성/종성 자모로 분해 (그 외 문자는 그대로)"""
+    return ''.join(
+        unicodedata.normalize('NFD', char) if _HANGUL_FIRST <= ord(char) <= _HANGUL_LAST else char
+        for char in text
+    )
+
+def _edit_distance(a, b):
+    """레벤슈타인 편집 거리 (이름 길이의 짧은 문자열용)"""
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return previous[-1]
+
+@lru_cache(maxsize=65536)
+def name_similarity(a, b):
+    """정규화한 두 이름의 유사도 (0 ~ 1) - 자모 단위 편집 거리 기반, 어느 한쪽이 비어 있으면 0"""
+    if not a or not b:
+        return 0.0
+    if a == b:
+        return 1.0
+    jamo_a, jamo_b = _jamo(a), _jamo(b)
+    return 1.0 - _edit_distance(jamo_a, jamo_b) / max(len(jamo_a), len(jamo_b))
+
+def match_confidence(similarity, same_phone, phone_conflict):
+    """이름 유사도와 전화번호 뒤 4자리 비교로 같은 고객일 신뢰도 계산 (0 ~ 1, 배열/스칼라 모두 가능)
+
+    same_phone: 양쪽 뒤 4자리가 같음 - 유사도 + SAME_PHONE_BONUS
+    phone_conflict: 양쪽 모두 번호가 있는데 뒤 4자리가 다름 - 0 (다른 고객)
+    둘 다 아니면(어느 한쪽 번호 없음) 유사도 × NAME_ONLY_WEIGHT
+    전화번호 뒤 4자리만 같고 이름이 다른 고객은 이름 유사도가 낮아 매칭되지 않습니다.
+    """
+    return np.select(
+        [same_phone, phone_conflict],
+        [np.minimum(similarity + SAME_PHONE_BONUS, 1.0), 0.0],
+        similarity * NAME_ONLY_WEIGHT
+    )
+
+def _identities(keys):
+    """매칭 키 버퍼(CustomerKeys)를 고유 (이름, 뒤 4자리) 조합 단위로 묶기 - (조합 프레임, 행별 조합 코드)
+
+    고정 폭 바이트 버퍼를 그대로 정렬해 정수 코드로 바꾸고, 문자열 변환과 이름 정규화는 고유 값에만 적용합니다.
+    np.unique가 만든 고유 값/코드 배열은 키 버퍼의 사본이므로 끝나면 제자리에서 지웁니다
+    (조합 프레임의 디코딩한 문자열은 지우지 않음 - core.pii 참고).
+    """
+    names, name_codes = np.unique(keys.names, return_inverse=True)
+    phones, phone_codes = np.unique(keys.phone_last4, return_inverse=True)
+    try:
+        codes, combined = pd.factorize(name_codes.astype('int64') * len(phones) + phone_codes)
+
+        normalized = normalize_names(pd.Series([name.decode('utf-8', 'replace') for name in names], dtype=object))
+        first_two, first_last = name_blocking_keys(normalized)
+        phone_text = np.array([phone.decode() if phone else None for phone in phones], dtype=object)
+        name_index = combined // len(phones)
+        identities = pd.DataFrame({
+            'identity': np.arange(len(combined)),
+            'norm_name': normalized.to_numpy(dtype=object)[name_index],
+            'phone_last4': phone_text[combined % len(phones)],
+            'block_prefix': first_two.to_numpy(dtype=object)[name_index],
+            'block_ends': first_last.to_numpy(dtype=object)[name_index],
+        })
+        return identities, codes
+    finally:
+        for buffer in (names, name_codes, phones, phone_codes):
+            wipe_buffer(buffer)
+
+def candidate_pairs(today, history):
+    """블로킹 키가 하나라도 같은 (오늘 고객, 이력 표기) 후보 쌍 - 전화번호 뒤 4자리 또는 이름 키"""
+    blocks = [
+        today.dropna(subset=['phone_last4']).merge(
+            history.dropna(subset=['phone_last4'])[['identity', 'phone_last4']], on='phone_last4'
+        ),
+    ]
+    for key in ('block_prefix', 'block_ends'):
+        named_today = today[today[key] != '']
+        blocks.append(named_today.merge(history.loc[history[key] != '', ['identity', key]], on=key))
+
+    pairs = pd.concat([block[['customer', 'identity']] for block in blocks], ignore_index=True)
+    return pairs.drop_duplicates(ignore_index=True)
+
+def score_pairs(pairs, today, history):
+    """후보 쌍별 이름 유사도와 신뢰도 - 유사도는 고유 이름 쌍마다 한 번만 계산"""
+    today_names = today['norm_name'].to_numpy(dtype=object)[pairs['customer'].to_numpy()]
+    history_names = history['norm_name'].to_numpy(dtype=object)[pairs['identity'].to_numpy()]
+    today_phones = today['phone_last4'].to_numpy(dtype=object)[pairs['customer'].to_numpy()]
+    history_phones = history['phone_last4'].to_numpy(dtype=object)[pairs['identity'].to_numpy()]
+
+    name_pair_codes, name_pairs = pd.MultiIndex.from_arrays([today_names, history_names]).factorize()
+    pair_similarity = np.fromiter(
+        (name_similarity(a, b) for a, b in name_pairs), dtype=float, count=len(name_pairs)
+    )
+    similarity = pair_similarity[name_pair_codes]
+    both_phones = pd.notna(today_phones) & pd.notna(history_phones)
+    same_phone = both_phones & (today_phones == history_phones)
+    return pairs.assign(
+        similarity=similarity, confidence=match_confidence(similarity, same_phone, both_phones & ~same_phone)
+    )
+
+def match_identities(today_keys, history_keys, threshold=MATCH_THRESHOLD):
+    """오늘 고객별로 같은 고객으로 판단되는 이력 행 찾기
+
+    today_keys, history_keys: CustomerKeys 버퍼 (행 순서 = 오늘 고객 순번 / 이력 행 위치)
+    반환값: (customer, row, confidence) DataFrame - 고객 순번, 이력 행 순서로 정렬 (중복 없음)
+    """
+    today_identities, today_codes = _identities(today_keys)
+    history_identities, history_codes = _identities(history_keys)
+
+    # 오늘 고객(행)마다 표기 정보를 붙여 후보 생성
+    today = today_identities.drop(columns='identity').iloc[today_codes].reset_index(drop=True)
+    today['customer'] = np.arange(len(today))
+
+    scored = score_pairs(candidate_pairs(today, history_identities), today, history_identities)
+    accepted = scored[scored['confidence'] >= threshold]
+
+    # 표기 → 이력 행으로 펼치기
+    history_rows = pd.DataFrame({'identity': history_codes, 'row': np.arange(len(history_codes))})
+    matches = accepted[['customer', 'identity', 'confidence']].merge(history_rows, on='identity')
+    return matches[['customer', 'row', 'confidence']].sort_values(['customer', 'row'], ignore_index=True)
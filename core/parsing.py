@@ -0,0 +1,214 @@
+# core/parsing.py
+"""주문 파싱 - 상품/옵션 문자열 해석과 주문 정규화 (Streamlit 의존 없음)"""
+import re
+
+import numpy as np
+import pandas as pd
+
+# 이름/연락처 등 문자열 컬럼 타입 (pyarrow는 필수 의존성)
+TEXT_DTYPE = pd.StringDtype("pyarrow")
+
+# 업로드 파일에서 읽는 컬럼 (그 외 주소 등 개인정보 컬럼은 읽지 않음)
+SAFE_COLUMNS = ['상품이름', '옵션이름', '상품수량', '수취인이름', '주문자이름', '주문자전화번호1']
+
+ESSENTIAL_COLUMNS = ['상품이름', '옵션이름', '상품수량']
+
+# 수집한 주문 컬럼의 메모리 절약형 타입 - 반복되는 상품/옵션은 범주형, 이름/연락처는 문자열(pyarrow)
+ORDER_COLUMN_DTYPES = {
+    '상품이름': 'category',
+    '옵션이름': 'category',
+    '수취인이름': TEXT_DTYPE,
+    '주문자이름': TEXT_DTYPE,
+    '주문자전화번호1': TEXT_DTYPE,
+}
+
+def compact_order_frame(df):
+    """주문 DataFrame의 문자열 컬럼을 ORDER_COLUMN_DTYPES로 변환 (없는 컬럼은 건너뜀)"""
+    dtypes = {col: dtype for col, dtype in ORDER_COLUMN_DTYPES.items() if col in df.columns}
+    return df.astype(dtypes) if dtypes else df
+
+# 🎯 상품/옵션 파싱
+def extract_product_from_option(option_text):
+    """옵션에서 상품 분류 추출 (H열 우선)"""
+    if pd.isna(option_text):
+        return "기타"
+    
+    option_text = str(option_text).lower()
+    
+    if "단호박식혜" in option_text:
+        return "단호박식혜"
+    elif "일반식혜" in option_text or ("식혜" in option_text and "단호박" not in option_text):
+        return "식혜"
+    elif "수정과" in option_text:
+        return "수정과"
+    elif "쌀요거트" in option_text or "요거트" in option_text or "플레인" in option_text:
+        return "플레인 쌀요거트"
+    
+    return "기타"
+
+def extract_product_from_name(product_name):
+    """상품이름에서 분류 추출 (G열 - 보조용)"""
+    if pd.isna(product_name):
+        return "기타"
+    
+    product_name = str(product_name).lower()
+    
+    bracket_match = re.search(r'\[서로\s+([^\]]+)\]', product_name)
+    if bracket_match:
+        product_key = bracket_match.group(1).strip()
+        
+        if "단호박식혜" in product_key:
+            return "단호박식혜"
+        elif "진하고 깊은 식혜" in product_key or "식혜" in product_key:
+            return "식혜"
+        elif "수정과" in product_key:
+            return "수정과"
+        elif "쌀요거트" in product_key:
+            return "플레인 쌀요거트"
+    
+    if "쌀요거트" in product_name or "요거트" in product_name or "플레인" in product_name:
+        return "플레인 쌀요거트"
+    
+    return "기타"
+
+def parse_option_info(option_text):
+    """옵션에서 수량과 용량 추출"""
+    if pd.isna(option_text):
+        return 1, ""
+    
+    option_text = str(option_text)
+    
+    # 패턴 1: "5개, 240ml" 또는 "10개, 500ml"
+    pattern1 = re.search(r'(\d+)개,\s*(\d+(?:\.\d+)?(?:ml|L))', option_text)
+    if pattern1:
+        return int(pattern1.group(1)), pattern1.group(2)
+    
+    # 패턴 2: "2, 1L" 또는 "4, 1L"
+    pattern2 = re.search(r'(\d+),\s*(\d+(?:\.\d+)?(?:ml|L))', option_text)
+    if pattern2:
+        return int(pattern2.group(1)), pattern2.group(2)
+    
+    # 패턴 3: "용량 : 1L 2병"
+    pattern3 = re.search(r'용량\s*:\s*(\d+(?:\.\d+)?(?:ml|L))\s*(\d+)병', option_text)
+    if pattern3:
+        return int(pattern3.group(2)), pattern3.group(1)
+    
+    # 패턴 4: "500ml 3병" 또는 "500ml 5병"
+    pattern4 = re.search(r'(\d+(?:\.\d+)?(?:ml|L))\s*(\d+)병', option_text)
+    if pattern4:
+        return int(pattern4.group(2)), pattern4.group(1)
+    
+    # 패턴 5: 단순 용량만 "플레인 쌀요거트 1L"
+    capacity_match = re.search(r'(\d+(?:\.\d+)?(?:ml|L))', option_text)
+    if capacity_match:
+        return 1, capacity_match.group(1)
+    
+    return 1, ""
+
+def standardize_capacity(capacity, for_box=False):
+    """용량 표준화: 박스용일 경우 200ml → 240ml"""
+    if not capacity:
+        return ""
+    
+    capacity = str(capacity)
+    capacity = capacity.lower()
+
+    if re.match(r'1\.5l', capacity):
+        return "1.5L"
+    elif re.match(r'1l|1000ml', capacity):
+        return "1L"
+    elif re.match(r'500ml', capacity):
+        return "500ml"
+    elif re.match(r'240ml', capacity):
+        return "240ml"
+    elif re.match(r'200ml', capacity):
+        return "240ml" if for_box else "200ml"
+
+    return capacity
+
+def standardize_capacity_for_box(capacity):
+    """박스 계산용 용량 표준화 (200ml → 240ml)"""
+    return standardize_capacity(capacity, for_box=True)
+
+def _factorize(series):
+    """(고유값 목록, 행별 코드) 반환 - 범주형이면 기존 코드를 그대로 사용, 결측값은 ""로 취급"""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        uniques = list(series.cat.categories)
+        codes = series.cat.codes.to_numpy()
+    else:
+        codes, unique_index = pd.factorize(series)
+        uniques = list(unique_index)
+
+    if (codes < 0).any():
+        codes = np.where(codes < 0, len(uniques), codes)
+        uniques.append("")
+    return uniques, codes
+
+def _expand_categorical(values, codes, index):
+    """고유값별 결과(values)를 행별 코드로 펼친 범주형 Series - 같은 결과는 하나의 범주로 합침"""
+    value_codes, categories = pd.factorize(pd.Series(values, dtype=object))
+    return pd.Series(pd.Categorical.from_codes(value_codes[codes], categories=categories), index=index)
+
+def _map_unique(series, func):
+    """고유값마다 한 번만 func를 적용해 범주형으로 매핑 (옵션/상품명은 반복되는 값이 대부분)"""
+    uniques, codes = _factorize(series)
+    return _expand_categorical([func(value) for value in uniques], codes, series.index)
+
+def product_keys(products, capacities):
+    """'상품 용량' 키를 범주형으로 생성 - 고유한 (상품, 용량) 조합마다 한 번만 문자열을 만듦
+
+    용량이 빈 문자열이면 상품명만 키로 사용합니다.
+    """
+    pair_codes, pairs = pd.MultiIndex.from_arrays([products, capacities]).factorize()
+    keys = [f"{product} {capacity}" if capacity else product for product, capacity in pairs]
+    return _expand_categorical(keys, pair_codes, products.index)
+
+def recipient_names(values):
+    """정규화 주문의 수취인이름 컬럼 - 문자열(pyarrow), 결측값은 '알 수 없음'"""
+    return values.astype(TEXT_DTYPE).fillna('알 수 없음')
+
+# 정규화된 주문 프레임 컬럼 (출고 현황 + 박스 계산 공용)
+NORMALIZED_ORDER_COLUMNS = ['상품', '용량', '박스용량', '총수량', '수취인이름']
+
+def normalize_orders(df):
+    """업로드 주문을 한 번에 정규화 - 출고 현황과 박스 계산이 함께 사용하는 주문 프레임
+
+    옵션/상품명 문자열은 고유값마다 한 번만 파싱하고, 상품/용량/박스용량은 범주형(코드)으로,
+    수취인이름은 문자열(pyarrow)로 만듭니다. 결과 프레임은 복사 없이
+    출고 집계와 박스 계산에 그대로 전달됩니다 (읽기 전용으로 취급).
+    원본에 수취인이름 컬럼이 없으면 결과에도 포함하지 않습니다.
+    """
+    option_names = df['옵션이름'] if '옵션이름' in df.columns else pd.Series("", index=df.index)
+    product_names = df['상품이름'] if '상품이름' in df.columns else pd.Series("", index=df.index)
+
+    option_product = _map_unique(option_names, extract_product_from_option)
+    name_product = _map_unique(product_names, extract_product_from_name)
+    product_categories = option_product.cat.categories.union(name_product.cat.categories)
+    final_product = option_product.cat.set_categories(product_categories).where(
+        option_product != "기타", name_product.cat.set_categories(product_categories)
+    ).cat.remove_unused_categories()
+
+    # 옵션 고유값마다 (수량, 용량)을 한 번만 파싱
+    option_uniques, option_codes = _factorize(option_names)
+    option_info = [parse_option_info(value) for value in option_uniques]
+    option_quantity = np.array([quantity for quantity, _ in option_info], dtype='int64')[option_codes]
+    capacity = _expand_categorical(
+        [standardize_capacity(raw_capacity) for _, raw_capacity in option_info], option_codes, df.index
+    )
+    box_capacity = _map_unique(capacity, standardize_capacity_for_box)
+
+    if '상품수량' in df.columns:
+        base_quantity = pd.to_numeric(df['상품수량'], errors='coerce').fillna(1).astype('int64')
+    else:
+        base_quantity = pd.Series(1, index=df.index, dtype='int64')
+
+    columns = {
+        '상품': final_product,
+        '용량': capacity,
+        '박스용량': box_capacity,
+        '총수량': base_quantity * option_quantity,
+    }
+    if '수취인이름' in df.columns:
+        columns['수취인이름'] = recipient_names(df['수취인이름'])
+
+    return pd.DataFrame(columns).reset_index(drop=True)
@@ -0,0 +1,90 @@
+# core/pii.py
+"""개인정보 키 버퍼 - 이름/전화번호 뒤 4자리를 고정 폭 바이트 배열로 보관하고 제자리에서 지우기 (Streamlit 의존 없음)
+
+값마다 파이썬 문자열 객체를 만들지 않고 UTF-8 바이트를 (행 수 × 고정 폭) 버퍼 하나에 담습니다.
+버퍼는 원본 컬럼에서 만든 매칭 전용 사본입니다. wipe()는 새 배열을 할당하지 않고 이 사본만 0으로 덮어쓰며
+(매칭이 버퍼에서 만든 고유 값/코드 배열은 매칭이 끝날 때 같은 방식으로 지움),
+원본 DataFrame(세션 파싱 캐시 포함)의 이름/전화번호 컬럼과 매칭 중 디코딩한 고유 이름 문자열은 지우지 않습니다 -
+그 값들은 참조가 사라지거나 워커 프로세스가 종료될 때 해제됩니다.
+"""
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# 이름 버퍼에 담는 최대 글자 수 (이름 칸에 주소 등 긴 값이 섞여도 버퍼 폭이 커지지 않도록)
+NAME_MAX_CHARS = 20
+
+def _string_array(values):
+    """값들을 Arrow 문자열 배열로 - Arrow 기반 문자열 컬럼은 복사 없이, 그 외는 값별 str() (결측값은 null)"""
+    try:
+        array = pa.array(values, from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        array = None
+    if array is not None and (pa.types.is_string(array.type) or pa.types.is_large_string(array.type)):
+        return array
+    objects = pd.Series(values).astype(object)
+    return pa.array([None if pd.isna(value) else str(value) for value in objects], type=pa.string())
+
+def fixed_width_bytes(array):
+    """Arrow 문자열 배열 → UTF-8 고정 폭 바이트 배열 ('S{폭}', 결측값은 b'') - 값별 파이썬 객체 없이 오프셋으로 복사"""
+    array = pc.fill_null(array, '').cast(pa.large_string())
+    if isinstance(array, pa.ChunkedArray):
+        array = array.combine_chunks()
+
+    _, offsets_buffer, data_buffer = array.buffers()
+    offsets = np.frombuffer(offsets_buffer, dtype=np.int64)[array.offset:array.offset + len(array) + 1]
+    data = np.frombuffer(data_buffer, dtype=np.uint8) if data_buffer is not None else np.zeros(0, dtype=np.uint8)
+
+    lengths = np.diff(offsets)
+    width = max(int(lengths.max()) if len(lengths) else 0, 1)
+    buffer = np.zeros((len(array), width), dtype=np.uint8)
+
+    # 바이트 위치별로 그 위치까지 값이 있는 행만 한 번에 복사 (임시 배열은 행 수 크기)
+    starts = offsets[:-1]
+    for position in range(width):
+        has_byte = lengths > position
+        buffer[has_byte, position] = data[starts[has_byte] + position]
+    return buffer.view(f'S{width}').ravel()
+
+def wipe_buffer(buffer):
+    """버퍼 메모리를 제자리에서 0으로 덮어쓰기 (새 배열 할당 없음)"""
+    buffer.view(np.uint8).fill(0)
+
+
+class CustomerKeys:
+    """재주문 매칭 키 버퍼 - names(앞뒤 공백 제거한 이름), phone_last4(숫자 4자리, 없으면 b'')
+
+    with 문으로 쓰면 블록을 벗어날 때 두 버퍼(원본 컬럼의 사본)를 모두 0으로 지웁니다.
+    """
+
+    def __init__(self, names, phone_last4):
+        self.names = names
+        self.phone_last4 = phone_last4
+
+    @classmethod
+    def from_columns(cls, names, phones):
+        """이름/전화번호 컬럼에서 키 버퍼 생성 - 전화번호는 숫자만 남겨 뒤 4자리만 보관 (4자리 미만이면 없음)"""
+        name_array = pc.utf8_slice_codeunits(pc.utf8_trim_whitespace(_string_array(names)), 0, NAME_MAX_CHARS)
+        digits = pc.replace_substring_regex(_string_array(phones), r'\D', '')
+        last4 = pc.if_else(pc.greater_equal(pc.utf8_length(digits), 4), pc.utf8_slice_codeunits(digits, -4), None)
+        keys = cls(fixed_width_bytes(name_array), fixed_width_bytes(last4))
+        # 정리/슬라이스 중간 결과로 쓴 Arrow 메모리를 풀에 남겨두지 않고 반환
+        del name_array, digits, last4
+        pa.default_memory_pool().release_unused()
+        return keys
+
+    def __len__(self):
+        return len(self.names)
+
+    def wipe(self):
+        """이름/전화번호 버퍼를 제자리에서 0으로 덮어쓰기"""
+        wipe_buffer(self.names)
+        wipe_buffer(self.phone_last4)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.wipe()
+        return False
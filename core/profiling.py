@@ -0,0 +1,169 @@
+# core/profiling.py
+"""단계 프로파일러 - 이름 붙은 처리 단계를 중첩해서 측정 (Streamlit 의존 없음)
+
+단계마다 경과 시간(wall), CPU 시간, RSS 변화, tracemalloc 최고 사용량을 기록합니다.
+가장 바깥 단계가 열려 있는 동안에는 코어 함수에서 profile_stage()로 하위 단계를 더할 수 있습니다.
+워커 프로세스에서 실행된 코드는 측정되지 않으며, tracemalloc은 파이썬/numpy 할당만 추적합니다 (Arrow 메모리 제외).
+"""
+import contextvars
+import json
+import os
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+import pandas as pd
+import psutil
+
+_MB = 1024 * 1024
+
+# 현재 실행 중인 프로파일러 (가장 바깥 단계가 열려 있는 동안만 설정)
+_active_profiler = contextvars.ContextVar('active_stage_profiler', default=None)
+
+def _rss_mb():
+    return psutil.Process(os.getpid()).memory_info().rss / _MB
+
+def active_profiler():
+    """현재 실행 중인 StageProfiler (없으면 None)"""
+    return _active_profiler.get()
+
+def profile_stage(label):
+    """실행 중인 프로파일러가 있으면 그 안의 하위 단계로 측정, 없으면 아무것도 하지 않음 (코어 함수용)"""
+    profiler = _active_profiler.get()
+    return profiler.stage(label) if profiler is not None else nullcontext()
+
+
+class StageProfiler:
+    """한 번의 실행(업로드 처리 등)에 속한 단계 기록
+
+    records: 단계를 시작한 순서의 dict 목록 - label, path, parent(상위 단계 순번), depth, start_s,
+    wall_s, cpu_s, rss_start_mb, rss_end_mb, rss_delta_mb, peak_mb(tracemalloc, 꺼져 있으면 None), error
+    trace_memory=True면 가장 바깥 단계 동안 tracemalloc을 켭니다 (할당이 많은 단계는 느려짐).
+    """
+
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.run_id = uuid.uuid4().hex[:12]
+        self.records = []
+        self._open = []  # 열린 단계 [기록 순번, 시작 시 추적 메모리, 지금까지 최고 추적 메모리]
+        self._origin = None
+        self._tracing = False
+        self._started_tracing = False
+
+    @contextmanager
+    def stage(self, label):
+        """단계 하나를 측정 - 다른 단계 안에서 열면 하위 단계로 기록"""
+        root = not self._open
+        if root:
+            token = _active_profiler.set(self)
+            if self._origin is None:
+                self._origin = time.perf_counter()
+            if self.trace_memory and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracing = True
+            self._tracing = tracemalloc.is_tracing() and self.trace_memory
+
+        parent = self._open[-1] if self._open else None
+        index = len(self.records)
+        record = {
+            'label': label,
+            'path': f"{self.records[parent[0]]['path']} / {label}" if parent else label,
+            'parent': parent[0] if parent else None,
+            'depth': len(self._open),
+            'start_s': time.perf_counter() - self._origin,
+            'error': None,
+        }
+        self.records.append(record)
+
+        traced_start = 0
+        if self._tracing:
+            # 상위 단계의 최고치는 하위 단계를 시작하기 전까지의 값으로 보관하고 최고치를 다시 측정
+            traced_start, peak = tracemalloc.get_traced_memory()
+            if parent:
+                parent[2] = max(parent[2], peak)
+            tracemalloc.reset_peak()
+        opened = [index, traced_start, traced_start]
+        self._open.append(opened)
+
+        rss_start = _rss_mb()
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield record
+        except BaseException as e:
+            record['error'] = type(e).__name__
+            raise
+        finally:
+            record['wall_s'] = time.perf_counter() - wall_start
+            record['cpu_s'] = time.process_time() - cpu_start
+            rss_end = _rss_mb()
+            record.update(rss_start_mb=rss_start, rss_end_mb=rss_end, rss_delta_mb=rss_end - rss_start, peak_mb=None)
+
+            if self._tracing:
+                _, peak = tracemalloc.get_traced_memory()
+                peak = max(opened[2], peak)
+                tracemalloc.reset_peak()
+                record['peak_mb'] = (peak - opened[1]) / _MB
+                if parent:
+                    parent[2] = max(parent[2], peak)
+            self._open.pop()
+
+            if root:
+                _active_profiler.reset(token)
+                if self._started_tracing:
+                    tracemalloc.stop()
+                    self._started_tracing = False
+
+    def to_frame(self):
+        """단계 기록 DataFrame (시작 순서) - self_s(하위 단계를 뺀 자체 시간) 포함"""
+        frame = pd.DataFrame(self.records, columns=[
+            'label', 'path', 'parent', 'depth', 'start_s', 'wall_s', 'cpu_s',
+            'rss_start_mb', 'rss_end_mb', 'rss_delta_mb', 'peak_mb', 'error'
+        ])
+        frame['parent'] = frame['parent'].astype('Int64')
+        children_wall = frame['wall_s'].groupby(frame['parent']).sum()
+        frame['self_s'] = frame['wall_s'] - children_wall.reindex(frame.index, fill_value=0.0).to_numpy()
+        return frame
+
+    def summary(self):
+        """경로별 합계 (처음 시작한 순서) - calls, wall_s, self_s, cpu_s, rss_delta_mb, peak_mb(최대)"""
+        frame = self.to_frame()
+        return frame.groupby(['path', 'depth'], sort=False).agg(
+            calls=('label', 'size'),
+            wall_s=('wall_s', 'sum'),
+            self_s=('self_s', 'sum'),
+            cpu_s=('cpu_s', 'sum'),
+            rss_delta_mb=('rss_delta_mb', 'sum'),
+            peak_mb=('peak_mb', 'max'),
+        ).reset_index()
+
+    def report(self):
+        """단계별 합계 표 (텍스트) - 하위 단계는 들여쓰기"""
+        summary = self.summary()
+        lines = [f"{'단계':<24}{'wall(s)':>10}{'self(s)':>10}{'cpu(s)':>10}{'rssΔ(MB)':>10}{'peak(MB)':>10}"]
+        for row in summary.itertuples():
+            label = '  ' * row.depth + row.path.rsplit(' / ', 1)[-1]
+            peak = f"{row.peak_mb:>10.1f}" if pd.notna(row.peak_mb) else f"{'-':>10}"
+            lines.append(f"{label:<24}{row.wall_s:>10.3f}{row.self_s:>10.3f}{row.cpu_s:>10.3f}{row.rss_delta_mb:>10.1f}{peak}")
+        top = summary[summary['depth'] == 0]
+        lines.append(f"{'합계':<24}{top['wall_s'].sum():>10.3f}{'':>10}{top['cpu_s'].sum():>10.3f}")
+        return '\n'.join(lines)
+
+    def write_jsonl(self, path, max_bytes=None, **context):
+        """단계 기록을 JSON lines로 추가 저장 - 한 줄에 단계 하나 (run_id, recorded_at, context 포함)
+
+        상위 디렉터리가 없으면 만들고, max_bytes를 주면 기존 파일이 그 크기 이상일 때 path.1로 옮긴 뒤 새로 기록합니다.
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if max_bytes and os.path.exists(path) and os.path.getsize(path) >= max_bytes:
+            os.replace(path, f"{path}.1")
+
+        recorded_at = datetime.now().isoformat(timespec='seconds')
+        with open(path, 'a', encoding='utf-8') as f:
+            for index, record in enumerate(self.records):
+                line = {'run_id': self.run_id, 'recorded_at': recorded_at, **context, 'index': index, **record}
+                f.write(json.dumps(line, ensure_ascii=False) + '\n')
@@ -0,0 +1,117 @@
+# core/report.py
+"""보고서 파일 생성 - 행을 순서대로 흘려 쓰는 Excel(쓰기 전용)/CSV/Parquet 작성 (Streamlit 의존 없음)
+
+DataFrame 청크나 행 이터레이터를 받아 바로 파일에 기록하므로, 메모리에는
+출력 파일 바이트와 현재 청크만 남습니다 (openpyxl 셀 객체 모델을 만들지 않음).
+"""
+import csv
+import io
+import itertools
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from openpyxl import Workbook
+
+# 다운로드 형식 → (확장자, MIME 타입)
+EXPORT_FORMATS = {
+    'xlsx': ('xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+    'csv': ('csv', 'text/csv'),
+    'parquet': ('parquet', 'application/vnd.apache.parquet'),
+}
+
+def available_formats():
+    """사용 가능한 다운로드 형식"""
+    return list(EXPORT_FORMATS)
+
+def _cell(value):
+    """Excel/CSV에 기록할 값 - 결측값은 빈 칸"""
+    return None if value is None or (not isinstance(value, str) and pd.isna(value)) else value
+
+def frame_rows(chunks):
+    """DataFrame 청크들을 행 튜플로 풀어 줌 (결측값은 None)"""
+    for chunk in chunks:
+        for row in chunk.itertuples(index=False, name=None):
+            yield tuple(_cell(value) for value in row)
+
+def write_xlsx(sheets):
+    """쓰기 전용 워크북에 시트별 행을 순서대로 기록해 .xlsx 바이트 반환
+
+    sheets: [(시트 이름, 컬럼 목록, 행 이터레이터)] - 행이 없어도 헤더는 기록
+    """
+    workbook = Workbook(write_only=True)
+    for sheet_name, columns, rows in sheets:
+        worksheet = workbook.create_sheet(title=sheet_name)
+        worksheet.append(list(columns))
+        for row in rows:
+            worksheet.append(row)
+    if not workbook.worksheets:
+        workbook.create_sheet()
+
+    output = io.BytesIO()
+    workbook.save(output)
+    return output.getvalue()
+
+def write_csv(columns, rows):
+    """CSV 바이트 반환 (Excel에서 한글이 깨지지 않도록 UTF-8 BOM 포함)"""
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(columns)
+    writer.writerows(rows)
+    return output.getvalue().encode('utf-8-sig')
+
+def _arrow_table(chunk, schema):
+    """청크를 스키마에 맞춘 Arrow 테이블로 변환 - 숫자 컬럼은 float64, 그 외는 문자열 (결측값은 null)"""
+    arrays = []
+    for field in schema:
+        values = chunk[field.name] if field.name in chunk.columns else pd.Series(None, index=chunk.index, dtype=object)
+        if pa.types.is_floating(field.type):
+            arrays.append(pa.array(pd.to_numeric(values, errors='coerce'), type=field.type, from_pandas=True))
+        else:
+            text = values.astype(object).map(lambda value: None if _cell(value) is None else str(value))
+            arrays.append(pa.array(text, type=pa.string()))
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+def write_parquet(columns, chunks):
+    """DataFrame 청크를 행 그룹 단위로 기록한 Parquet 바이트 반환
+
+    첫 청크에서 숫자인 컬럼은 float64, 나머지는 문자열로 스키마를 고정해
+    청크마다 값 타입이 섞여 있어도 같은 스키마로 기록합니다.
+    """
+    output = io.BytesIO()
+    writer = None
+    try:
+        for chunk in chunks:
+            if writer is None:
+                schema = pa.schema([
+                    (col, pa.float64() if col in chunk.columns and pd.api.types.is_numeric_dtype(chunk[col]) else pa.string())
+                    for col in columns
+                ])
+                writer = pq.ParquetWriter(output, schema)
+            writer.write_table(_arrow_table(chunk, writer.schema))
+        if writer is None:
+            writer = pq.ParquetWriter(output, pa.schema([(col, pa.string()) for col in columns]))
+    finally:
+        if writer is not None:
+            writer.close()
+    return output.getvalue()
+
+def export_frames(chunks, fmt, sheet_name, columns=()):
+    """DataFrame 청크를 지정 형식(xlsx/csv/parquet) 파일 바이트로 기록
+
+    컬럼은 첫 청크에서 정하고, 청크가 하나도 없으면 columns로 헤더만 기록합니다.
+    """
+    chunks = iter(chunks)
+    first = next(chunks, None)
+    if first is not None:
+        columns = list(first.columns)
+        chunks = itertools.chain([first], chunks)
+    columns = list(columns)
+
+    if fmt == 'xlsx':
+        return write_xlsx([(sheet_name, columns, frame_rows(chunks))])
+    if fmt == 'csv':
+        return write_csv(columns, frame_rows(chunks))
+    if fmt == 'parquet':
+        return write_parquet(columns, chunks)
+    raise ValueError(f"지원하지 않는 형식입니다: {fmt}")
@@ -0,0 +1,243 @@
+# core/storage.py
+"""GitHub 저장소에 암호화된 결과 저장/불러오기 - 토큰과 키는 호출한 쪽에서 전달 (Streamlit 의존 없음)"""
+import base64
+import json
+import time
+import logging
+from datetime import datetime, timezone, timedelta
+
+import requests
+
+from config.settings import REPO_OWNER, REPO_NAME, UPLOAD_LOG_FILE_PATH
+from core.crypto import encrypt_payload, decrypt_payload
+from core.events import EventLog
+from core.profiling import profile_stage
+
+# 한국 시간대 설정
+KST = timezone(timedelta(hours=9))
+
+MAX_RETRIES = 3
+
+# 업로드 기록에 보관하는 최근 파일 수
+MAX_UPLOAD_LOG_ENTRIES = 30
+
+logger = logging.getLogger(__name__)
+
+
+def get_current_time_str() -> str:
+    """현재 한국 시간(KST)을 'YYYY-MM-DD HH:MM' 형식 문자열로 반환"""
+    return datetime.now(KST).strftime('%Y-%m-%d %H:%M')
+
+
+def contents_url(file_path):
+    """GitHub contents API 주소"""
+    return f"https://api.github.com/repos/{REPO_OWNER}/{REPO_NAME}/contents/{file_path}"
+
+
+def git_url(path):
+    """GitHub Git Data API 주소 (refs/commits/trees)"""
+    return f"https://api.github.com/repos/{REPO_OWNER}/{REPO_NAME}/git/{path}"
+
+
+def file_content(encrypted_data):
+    """저장 파일 내용 - 암호화된 데이터 + 마지막 업데이트 시각 JSON"""
+    data_package = {
+        'encrypted_data': encrypted_data,
+        'last_update': datetime.now(KST).isoformat(),
+        'timestamp': datetime.now(KST).timestamp()
+    }
+    return json.dumps(data_package, ensure_ascii=False, indent=2)
+
+
+def publish_encrypted(encrypted_data, file_path, commit_message, token, events=None):
+    """이미 암호화된 데이터를 GitHub에 저장 (재시도 + 지수 백오프)"""
+    events = events if events is not None else EventLog()
+
+    try:
+        url = contents_url(file_path)
+        text = file_content(encrypted_data)
+
+        headers = {"Authorization": f"token {token}"}
+
+        for attempt in range(MAX_RETRIES):
+            try:
+                response = requests.get(url, headers=headers, timeout=30)
+                sha = response.json().get("sha") if response.status_code == 200 else None
+
+                content = base64.b64encode(text.encode()).decode()
+
+                payload = {
+                    "message": commit_message,
+                    "content": content,
+                    "branch": "main"
+                }
+
+                if sha:
+                    payload["sha"] = sha
+
+                response = requests.put(url, headers=headers, json=payload, timeout=30)
+
+                if response.status_code in [200, 201]:
+                    return True
+                else:
+                    events.warning(f"GitHub 저장 실패 (시도 {attempt + 1}/{MAX_RETRIES}): {response.status_code}")
+
+            except requests.exceptions.RequestException as e:
+                events.warning(f"네트워크 오류 (시도 {attempt + 1}/{MAX_RETRIES}): {str(e)}")
+
+            if attempt < MAX_RETRIES - 1:
+                time.sleep(2 ** attempt)  # 지수 백오프
+
+        return False
+
+    except Exception as e:
+        events.error(f"GitHub 저장 중 오류: {e}")
+        return False
+
+
+def publish(data, file_path, commit_message, token, key, events=None):
+    """결과를 암호화해 GitHub에 저장"""
+    events = events if events is not None else EventLog()
+
+    try:
+        with profile_stage('암호화'):
+            encrypted_data = encrypt_payload(data, key)
+    except Exception as e:
+        events.error(f"암호화 중 오류: {e}")
+        return False
+
+    with profile_stage('저장'):
+        return publish_encrypted(encrypted_data, file_path, commit_message, token, events)
+
+
+def commit_files(contents, commit_message, token, events=None):
+    """여러 파일({경로: 파일 내용, 삭제할 파일은 None})을 main 브랜치에 커밋 하나로 저장 (재시도 + 지수 백오프)
+
+    contents API는 파일마다 커밋을 만들어 순서대로만 저장할 수 있으므로,
+    Git Data API로 트리 하나를 만들어 한 번에 커밋합니다. 그 사이 브랜치가 움직였으면 처음부터 다시 시도합니다.
+    """
+    events = events if events is not None else EventLog()
+    headers = {"Authorization": f"token {token}"}
+    tree = [
+        {"path": path, "mode": "100644", "type": "blob", "content": content} if content is not None
+        else {"path": path, "mode": "100644", "type": "blob", "sha": None}
+        for path, content in contents.items()
+    ]
+
+    for attempt in range(MAX_RETRIES):
+        try:
+            response = requests.get(git_url("ref/heads/main"), headers=headers, timeout=30)
+            if response.status_code == 200:
+                head = response.json()["object"]["sha"]
+                response = requests.get(git_url(f"commits/{head}"), headers=headers, timeout=30)
+            if response.status_code == 200:
+                base_tree = response.json()["tree"]["sha"]
+                response = requests.post(git_url("trees"), headers=headers, json={"base_tree": base_tree, "tree": tree}, timeout=60)
+            if response.status_code == 201:
+                new_tree = response.json()["sha"]
+                response = requests.post(git_url("commits"), headers=headers, json={
+                    "message": commit_message, "tree": new_tree, "parents": [head]
+                }, timeout=30)
+            if response.status_code == 201:
+                response = requests.patch(git_url("refs/heads/main"), headers=headers, json={"sha": response.json()["sha"]}, timeout=30)
+            if response.status_code == 200:
+                return True
+            events.warning(f"GitHub 저장 실패 (시도 {attempt + 1}/{MAX_RETRIES}): {response.status_code}")
+
+        except requests.exceptions.RequestException as e:
+            events.warning(f"네트워크 오류 (시도 {attempt + 1}/{MAX_RETRIES}): {str(e)}")
+        except Exception as e:
+            events.error(f"GitHub 저장 중 오류: {e}")
+            return False
+
+        if attempt < MAX_RETRIES - 1:
+            time.sleep(2 ** attempt)  # 지수 백오프
+
+    return False
+
+
+def publish_files(files, commit_message, token, key, events=None):
+    """여러 결과({경로: 데이터, 삭제할 파일은 None})를 각각 암호화해 커밋 하나로 GitHub에 저장"""
+    events = events if events is not None else EventLog()
+
+    try:
+        with profile_stage('암호화'):
+            contents = {
+                path: file_content(encrypt_payload(data, key)) if data is not None else None
+                for path, data in files.items()
+            }
+    except Exception as e:
+        events.error(f"암호화 중 오류: {e}")
+        return False
+
+    with profile_stage('저장'):
+        return commit_files(contents, commit_message, token, events)
+
+
+def fetch(file_path, token, key, events=None):
+    """GitHub에서 암호화된 결과를 불러와 (결과, 마지막 업데이트 시각) 반환 - 파일이 없으면 ({}, None)"""
+    events = events if events is not None else EventLog()
+
+    for attempt in range(MAX_RETRIES):
+        try:
+            url = contents_url(file_path)
+
+            headers = {"Authorization": f"token {token}"}
+            response = requests.get(url, headers=headers, timeout=30)
+
+            if response.status_code == 200:
+                content = response.json()["content"]
+                decoded_content = base64.b64decode(content).decode()
+                data = json.loads(decoded_content)
+
+                encrypted_results = data.get('encrypted_data')
+                if encrypted_results:
+                    try:
+                        results = decrypt_payload(encrypted_results, key)
+                    except Exception as e:
+                        events.error(f"복호화 중 오류: {e}")
+                        results = {}
+                    last_update_str = data.get('last_update')
+                    last_update = datetime.fromisoformat(last_update_str) if last_update_str else None
+                    return results, last_update
+
+            elif response.status_code == 404:
+                # 파일이 없는 경우 - 정상적인 상황
+                return {}, None
+            else:
+                # 다른 에러의 경우
+                if attempt == MAX_RETRIES - 1:
+                    events.warning(f"GitHub 데이터 로드 실패: {response.status_code}")
+
+        except requests.exceptions.RequestException as e:
+            if attempt == MAX_RETRIES - 1:
+                logger.error(f"네트워크 오류로 인한 데이터 로드 실패: {str(e)}")
+                events.warning(f"네트워크 오류로 인한 데이터 로드 실패: {str(e)}")
+        except Exception as e:
+            if attempt == MAX_RETRIES - 1:
+                logger.error(f"GitHub 데이터 로드 중 오류: {str(e)}")
+                events.error(f"GitHub 데이터 로드 중 오류: {str(e)}")
+
+        if attempt < MAX_RETRIES - 1:
+            time.sleep(1)  # 재시도 전 대기
+
+    return {}, None
+
+
+def load_upload_log(token, key, events=None):
+    """처리 완료된 업로드 기록 불러오기 (파일 지문 → 처리 결과)"""
+    log_data, _ = fetch(UPLOAD_LOG_FILE_PATH, token, key, events)
+    return log_data.get('uploads', {}) if log_data else {}
+
+
+def record_upload(fingerprint, outcome, token, key, events=None):
+    """출고 현황/박스 계산이 모두 저장된 업로드의 지문 기록 (최근 파일만 보관)"""
+    uploads = load_upload_log(token, key, events)
+    uploads.pop(fingerprint, None)
+    uploads[fingerprint] = outcome
+
+    while len(uploads) > MAX_UPLOAD_LOG_ENTRIES:
+        uploads.pop(next(iter(uploads)))
+
+    commit_message = f"업로드 기록 업데이트 - {get_current_time_str()}"
+    return publish({'uploads': uploads}, UPLOAD_LOG_FILE_PATH, commit_message, token, key, events)
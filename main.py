@@ -1,15 +1,9 @@
 # 표준 라이브러리
-import os
-import io
 import re
 import gc
 import time
-import base64
-import json
-import time
 from datetime import datetime, timezone, timedelta
 KST = timezone(timedelta(hours=9))
-from collections import defaultdict
 import logging
 import traceback
 from functools import wraps
@@ -19,14 +13,13 @@ import streamlit as st
 import pandas as pd
 import requests
 import plotly.express as px
-import plotly.graph_objects as go
 
 # 설정 및 상수
-from config.constants import BOX_RULES, BOX_COST_ORDER, STOCK_THRESHOLDS, BOX_DESCRIPTIONS
-from config.settings import PAGE_CONFIG, REPO_OWNER, REPO_NAME, SHIPMENT_FILE_PATH, BOX_FILE_PATH, STOCK_FILE_PATH
+from config.constants import BOX_COST_ORDER, STOCK_THRESHOLDS, BOX_DESCRIPTIONS
+from config.settings import PAGE_CONFIG, MAX_UPLOAD_SIZE_MB, CUSTOMER_ANALYSIS_CACHE_TTL_SECONDS, CUSTOMER_ANALYSIS_ISOLATED
 
 # UI 스타일 및 헬퍼
-from modules.ui_utils import apply_custom_styles, render_metric_card
+from modules.ui_utils import apply_custom_styles, render_metric_card, render_paginated_table, show_events
 
 # Streamlit 페이지 설정
 st.set_page_config(**PAGE_CONFIG)
@@ -37,31 +30,31 @@ apply_custom_styles()
 # 메모리 관리
 from modules.memory import MemoryManager, force_garbage_collection
 
-# 보안 및 개인정보 보호
-from modules.security import (
-    encrypt_results, decrypt_results,
-    mask_name, mask_phone, mask_address, mask_customer_info,
-    match_phone_number, find_matching_customer
-)
-
 # 저장/입출력
 from modules.storage import (
-    save_to_github, load_from_github,
     save_shipment_data, load_shipment_data,
     save_box_data, load_box_data,
     save_stock_data, load_stock_data,
-    get_stock_product_keys, format_stock_display_time
+    load_upload_log, record_processed_upload,
+    load_customer_history_manifest, load_customer_history, github_credentials,
+    get_current_time_str
 )
 
 # 데이터 처리
-from modules.data_processing import (
-    sanitize_data,
-    extract_product_from_option, extract_product_from_name,
-    parse_option_info, standardize_capacity, standardize_capacity_for_box,
-    group_orders_by_recipient, get_product_quantities,
-    calculate_box_for_order, calculate_box_requirements,
-    process_unified_file, get_product_color
+from modules.data_processing import validate_upload, read_excel_file_safely, read_customer_files_safely
+from core.aggregation import OrderAggregate, snapshot_excel_files
+from core.boxes import calculate_box_requirements, build_box_results
+from core.excel import ExcelHeaderError, content_hash, combine_fingerprints
+from core.customers import (
+    match_and_analyze_customers,
+    HISTORY_REQUIRED_COLUMNS, SHIPMENT_COLUMNS, SHIPMENT_REQUIRED_COLUMNS
 )
+from core.history_store import cumulative_export, store_customer_history
+from core.cache import EncryptedCache
+from core.report import EXPORT_FORMATS, available_formats, write_xlsx
+from core.analytics import history_analytics
+from core.events import EventLog
+from core.isolation import run_isolated, customer_analysis_job, source_task_job, store_analytics_job
 
 # 로깅 설정
 logging.basicConfig(
@@ -126,41 +119,60 @@ def safe_execute(func, error_message="처리 중 오류가 발생했습니다",
 
 @handle_errors
 def analyze_customer_orders(customer_history_file, shipment_file):
-    """고객 주문 이력 분석 - 메인 함수"""
+    """고객 주문 이력 분석 - 메인 함수
+
+    고객주문정보 파일이 없으면 고객 이력 저장소에서 오늘 고객과 관련된 샤드만 불러와 분석합니다.
+    CUSTOMER_ANALYSIS_ISOLATED면 워커 프로세스에서 분석하고 서버에는 결과만 남깁니다.
+    """
+    if CUSTOMER_ANALYSIS_ISOLATED:
+        return analyze_customer_orders_isolated(customer_history_file, shipment_file)
+    
     history_df = None
     shipment_df = None
     results = None
     
     try:
-        # 1. 파일 읽기
-        history_df = read_excel_file_safely(customer_history_file)
-        shipment_df = read_excel_file_safely(shipment_file)
+        # 1. 파일 읽기 (두 파일은 필요한 컬럼만 동시에 파싱)
+        if customer_history_file is not None:
+            history_df, shipment_df = read_customer_files_safely(customer_history_file, shipment_file)
+        else:
+            shipment_df = read_excel_file_safely(shipment_file, SHIPMENT_COLUMNS, SHIPMENT_REQUIRED_COLUMNS)
         
-        if history_df is None or shipment_df is None:
+        if shipment_df is None:
             return None
         
-        # 2. 데이터 검증 (기존 코드 유지)
-        required_history_cols = ['주문자이름', '주문자전화번호', '상품이름', '상품수량']
-        required_shipment_cols = ['주문자이름', '주문자전화번호1']
+        required_shipment_cols = SHIPMENT_REQUIRED_COLUMNS
+        missing_shipment = [col for col in required_shipment_cols if col not in shipment_df.columns]
         
+        if missing_shipment:
+            st.error(f"❌ 출고내역서 파일에 필수 컬럼이 없습니다: {', '.join(missing_shipment)}")
+            return None
+        
+        if customer_history_file is None:
+            history_df, loaded_shards, new_count = load_customer_history(shipment_df['주문자이름'], shipment_df['주문자전화번호1'])
+            if history_df is not None:
+                st.caption(f"🗂️ 고객 이력 저장소에서 {loaded_shards}개 샤드, {len(history_df):,}건 불러옴 "
+                           f"(이력 조회 없이 신규 고객으로 확인: {new_count}건)")
+        
+        if history_df is None:
+            return None
+        
+        # 2. 데이터 검증 (기존 코드 유지)
+        required_history_cols = HISTORY_REQUIRED_COLUMNS
         missing_history = [col for col in required_history_cols if col not in history_df.columns]
-        missing_shipment = [col for col in required_shipment_cols if col not in shipment_df.columns]
         
         if missing_history:
             st.error(f"❌ 고객주문정보 파일에 필수 컬럼이 없습니다: {', '.join(missing_history)}")
             return None
         
-        if missing_shipment:
-            st.error(f"❌ 출고내역서 파일에 필수 컬럼이 없습니다: {', '.join(missing_shipment)}")
-            return None
-        
         # 3. 고객 매칭 및 분석
         results = match_and_analyze_customers(history_df, shipment_df)
         
-        # ⭐ DataFrame을 결과에 포함 (누적 파일 생성용)
+        # ⭐ DataFrame을 결과에 포함 (누적 파일 생성용) - 복사하지 않고 참조만 보관 (읽기 전용으로 사용)
         results['source_data'] = {
-            'history_df': history_df.copy(),
-            'shipment_df': shipment_df.copy()
+            'history_df': history_df,
+            'shipment_df': shipment_df,
+            'history_from_store': customer_history_file is None
         }
         
         return results
@@ -183,26 +195,135 @@ def analyze_customer_orders(customer_history_file, shipment_file):
             sys._clear_type_cache()
 
 
-def force_memory_cleanup(*variables):
-    """개인정보 포함 변수들의 강제 메모리 정리"""
-    import sys
+def analyze_customer_orders_isolated(customer_history_file, shipment_file):
+    """고객 주문 분석을 워커 프로세스에서 실행 - 파싱/매칭에 쓴 메모리는 워커 종료와 함께 회수
+
+    결과의 source_data에는 프레임 대신 업로드 바이트만 보관하고, 누적 파일 생성 등
+    원본이 필요한 작업은 run_source_task()가 다시 워커에서 실행합니다.
+    """
+    uploads = [customer_history_file, shipment_file] if customer_history_file is not None else [shipment_file]
+    if not all(validate_upload(uploaded_file) for uploaded_file in uploads):
+        return None
     
-    # 변수들 삭제
-    for var in variables:
-        if var is not None:
-            try:
-                del var
-            except:
-                pass
+    source_data = {
+        'isolated': True,
+        'history_upload': (customer_history_file.name, customer_history_file.getvalue()) if customer_history_file is not None else None,
+        'shipment_upload': (shipment_file.name, shipment_file.getvalue()),
+        'history_from_store': customer_history_file is None
+    }
+    results = run_customer_job(
+        customer_analysis_job, source_data['history_upload'], source_data['shipment_upload'],
+        github_credentials() if source_data['history_from_store'] else None
+    )
+    if results is None:
+        return None
+    
+    store_load = results.pop('store_load', None)
+    if store_load:
+        st.caption(f"🗂️ 고객 이력 저장소에서 {store_load['shards']}개 샤드, {store_load['rows']:,}건 불러옴 "
+                   f"(이력 조회 없이 신규 고객으로 확인: {store_load['new_customers']}건)")
+    results['source_data'] = source_data
+    return results
+
+def run_customer_job(job, *args):
+    """고객 데이터 작업(core.isolation의 *_job) 실행 후 메시지 표시 - 격리 모드면 워커 프로세스에서 실행
+
+    반환값: 작업 결과 (실패하면 None)
+    """
+    try:
+        value, events = run_isolated(job, *args) if CUSTOMER_ANALYSIS_ISOLATED else job(*args)
+    except Exception as e:
+        st.error(f"❌ 고객 데이터 처리 중 오류: {str(e)}")
+        logging.error("고객 데이터 작업 실패 (민감정보 제외)")
+        return None
+    show_events(events)
+    return value
+
+def run_source_task(results, task, *args):
+    """분석에 쓴 원본으로 task(history_df, shipment_df, events, *args) 실행 - 결과 반환 (실패하면 None)
+
+    격리 분석 결과면 워커 프로세스에서 업로드를 다시 읽어 실행하고, 아니면 보관한 프레임으로 바로 실행합니다.
+    """
+    source_data = results.get('source_data', {})
+    if source_data.get('isolated'):
+        store = github_credentials() if source_data.get('history_from_store') else None
+        return run_customer_job(
+            source_task_job, task, source_data['history_upload'], source_data['shipment_upload'], store, *args
+        )
     
+    history_df = source_data.get('history_df')
+    shipment_df = source_data.get('shipment_df')
+    if history_df is None or shipment_df is None:
+        st.error("❌ 처리에 필요한 고객 데이터가 없습니다.")
+        return None
+    events = EventLog()
+    value = task(history_df, shipment_df, events, *args)
+    show_events(events)
+    return value
+
+def uploaded_file_fingerprint(uploaded_file):
+    """업로드 파일 지문 - 업로드(file_id)별로 세션에 보관해 rerun마다 다시 해시하지 않음 (최근 16개)"""
+    fingerprints = st.session_state.setdefault('upload_fingerprints', {})
+    fingerprint = fingerprints.get(uploaded_file.file_id)
+    if fingerprint is None:
+        fingerprint = fingerprints[uploaded_file.file_id] = content_hash(uploaded_file.getvalue())
+        while len(fingerprints) > 16:
+            fingerprints.pop(next(iter(fingerprints)))
+    return fingerprint
+
+def get_customer_history_manifest():
+    """고객 이력 저장소 목록 - 세션에 보관해 rerun마다 GitHub에서 다시 불러오지 않음
+
+    CUSTOMER_ANALYSIS_CACHE_TTL_SECONDS가 지나거나 이 세션에서 저장소에 저장하면 다시 불러옵니다.
+    """
+    cached = st.session_state.get('customer_history_manifest')
+    if cached is None or time.monotonic() - cached[0] > CUSTOMER_ANALYSIS_CACHE_TTL_SECONDS:
+        cached = st.session_state.customer_history_manifest = (time.monotonic(), load_customer_history_manifest())
+    return cached[1]
+
+def get_customer_analysis(customer_history_file, shipment_file, history_version):
+    """입력 파일 지문별로 캐시된 고객 분석 결과 - 없으면 분석 후 세션 캐시(암호화)에 보관
+
+    고객주문정보 파일 없이 저장소로 분석하면 history_version(저장소 마지막 업데이트)을 이력 지문으로 사용합니다.
+    """
+    cache = st.session_state.get('customer_analysis_cache')
+    if cache is None:
+        cache = st.session_state.customer_analysis_cache = EncryptedCache(CUSTOMER_ANALYSIS_CACHE_TTL_SECONDS)
+    
+    history_key = (uploaded_file_fingerprint(customer_history_file)
+                   if customer_history_file is not None else f"저장소:{history_version}")
+    cache_key = (history_key, uploaded_file_fingerprint(shipment_file))
+    
+    results, source_data = cache.get(cache_key)
+    if results is not None:
+        if source_data is not None:
+            results['source_data'] = source_data
+        return results
+    
+    results = analyze_customer_orders(customer_history_file, shipment_file)
+    if results:
+        source_data = results.pop('source_data', None)
+        if source_data and not source_data.get('isolated') and not source_data.get('history_from_store'):
+            # 두 프레임 모두 세션 파싱 캐시(excel_parse_cache)에 있는 프레임이므로 암호화 사본 없이 참조만 보관
+            cache.put(cache_key, results, shared=source_data)
+        else:
+            # 격리 모드의 업로드 바이트, 저장소에서 불러온 이력은 세션의 다른 곳에 없으므로 결과와 함께 암호화
+            cache.put(cache_key, {**results, 'source_data': source_data})
+        results['source_data'] = source_data
+    return results
+
+def force_memory_cleanup():
+    """해제된 객체의 강제 메모리 정리 - 참조는 호출한 쪽에서 먼저 끊어야 하며, 메모리 내용을 덮어쓰지는 않음"""
+    import sys
+
     # 가비지 컬렉션 강제 실행
     gc.collect()
-    
+
     # 시스템 레벨 캐시 정리
     if hasattr(sys, '_clear_type_cache'):
         sys._clear_type_cache()
-    
-    # 추가 메모리 압박
+
+    # 해제된 힙 메모리를 운영체제에 반환
     try:
         import ctypes
         libc = ctypes.CDLL("libc.so.6")
@@ -210,202 +331,43 @@ def force_memory_cleanup(*variables):
     except:
         pass  # Linux가 아닌 경우 무시
 
-def secure_dataframe_delete(df):
-    """DataFrame의 보안 삭제 (개인정보 완전 제거)"""
-    if df is not None:
-        try:
-            # DataFrame 내용을 0으로 덮어쓰기 (보안 삭제)
-            for col in df.columns:
-                if df[col].dtype == 'object':
-                    df[col] = ''
-                else:
-                    df[col] = 0
-            
-            # DataFrame 삭제
-            del df
-        except:
-            pass
-    
-    gc.collect()
-
-
-def match_and_analyze_customers(history_df, shipment_df):
-    """고객 매칭 및 상세 분석"""
-    results = {
-        'reorder_customers': [],
-        'new_customers': [],
-        'total_today_orders': len(shipment_df),
-        'reorder_rate': 0
-    }
-    
-    # 오늘 출고 고객 정보 추출
-    today_customers = []
-    
-    for _, row in shipment_df.iterrows():
-        customer_info = {
-            'name': str(row.get('주문자이름', '')).strip(),
-            'phone': clean_phone_number(str(row.get('주문자전화번호1', ''))),
-            'recipient': str(row.get('수취인이름', '')).strip(),
-            'product': str(row.get('상품이름', '')),
-            'option': str(row.get('옵션이름', '')),
-            'quantity': row.get('상품수량', 1),
-            'amount': row.get('상품결제금액', 0)
-        }
-        
-        # 상품 정보 정제
-        if customer_info['option']:
-            option_quantity, capacity = parse_option_info(customer_info['option'])
-            total_quantity = customer_info['quantity'] * option_quantity
-            
-            product_name = extract_product_from_option(customer_info['option'])
-            if product_name == "기타":
-                product_name = extract_product_from_name(customer_info['product'])
-            
-            standardized_capacity = standardize_capacity(capacity)
-            if standardized_capacity:
-                customer_info['processed_product'] = f"{product_name} {standardized_capacity}"
-                customer_info['processed_quantity'] = total_quantity
-            else:
-                customer_info['processed_product'] = product_name
-                customer_info['processed_quantity'] = total_quantity
-        else:
-            customer_info['processed_product'] = customer_info['product']
-            customer_info['processed_quantity'] = customer_info['quantity']
-        
-        today_customers.append(customer_info)
-    
-    # 각 고객에 대해 과거 이력 검색
-    for today_customer in today_customers:
-        matched_history = find_customer_history(today_customer, history_df)
-        
-        if matched_history:
-            # 재주문 고객
-            customer_analysis = analyze_customer_history(today_customer, matched_history)
-            results['reorder_customers'].append(customer_analysis)
-        else:
-            # 신규 고객
-            results['new_customers'].append({
-                'name': today_customer['name'],
-                'product': today_customer['processed_product'],
-                'quantity': today_customer['processed_quantity'],
-                'amount': today_customer['amount']
-            })
-    
-    # 재주문율 계산
-    if results['total_today_orders'] > 0:
-        results['reorder_rate'] = (len(results['reorder_customers']) / results['total_today_orders']) * 100
-    
-    return results
-
-def find_customer_history(today_customer, history_df):
-    """고객 과거 이력 찾기 (이름 + 전화번호 매칭)"""
-    matched_orders = []
-    
-    for _, history_row in history_df.iterrows():
-        history_name = str(history_row.get('주문자이름', '')).strip()
-        history_phone = clean_phone_number(str(history_row.get('주문자전화번호', '')))
-        
-        # 이름 매칭 또는 전화번호 뒤 4자리 매칭
-        name_match = history_name == today_customer['name']
-        phone_match = False
-        
-        if len(history_phone) >= 4 and len(today_customer['phone']) >= 4:
-            phone_match = history_phone[-4:] == today_customer['phone'][-4:]
-        
-        if name_match or phone_match:
-            # 상품 정보 정제
-            product_name = str(history_row.get('상품이름', ''))
-            option_info = str(history_row.get('옵션이름', ''))
-            quantity = history_row.get('상품수량', 1)
-            amount = history_row.get('상품결제금액', 0)
-            order_date = history_row.get('주문일시', '')
-            
-            # 날짜 정제
-            try:
-                if pd.notna(order_date):
-                    order_datetime = pd.to_datetime(order_date, errors='coerce')
-                    if pd.notna(order_datetime):
-                        formatted_date = order_datetime.strftime('%Y-%m-%d')
-                    else:
-                        formatted_date = str(order_date)
-                else:
-                    formatted_date = "날짜 미확인"
-            except:
-                formatted_date = "날짜 미확인"
-            
-            # 상품 정보 처리
-            if option_info and option_info != 'nan':
-                option_quantity, capacity = parse_option_info(option_info)
-                total_quantity = quantity * option_quantity
-                
-                processed_product = extract_product_from_option(option_info)
-                if processed_product == "기타":
-                    processed_product = extract_product_from_name(product_name)
-                
-                standardized_capacity = standardize_capacity(capacity)
-                if standardized_capacity:
-                    final_product = f"{processed_product} {standardized_capacity}"
-                else:
-                    final_product = processed_product
-            else:
-                final_product = product_name
-                total_quantity = quantity
-            
-            matched_orders.append({
-                'date': formatted_date,
-                'product': final_product,
-                'quantity': total_quantity,
-                'amount': amount
-            })
-    
-    return matched_orders if matched_orders else None
-
-def analyze_customer_history(today_customer, history_orders):
-    """고객 주문 이력 상세 분석"""
-    # 총 주문 횟수 (오늘 주문 포함)
-    total_orders = len(history_orders) + 1
-    
-    # 총 결제 금액
-    total_amount = sum(order.get('amount', 0) for order in history_orders)
-    total_amount += today_customer.get('amount', 0)
-    
-    # 최근 주문일 (오늘 제외)
-    valid_dates = []
-    for order in history_orders:
-        if order['date'] != "날짜 미확인":
-            try:
-                date_obj = pd.to_datetime(order['date'], errors='coerce')
-                if pd.notna(date_obj):
-                    valid_dates.append(date_obj)
-            except:
-                continue
-    
-    last_order_date = max(valid_dates).strftime('%Y-%m-%d') if valid_dates else "확인 불가"
-    
-    # 주문 이력 정리 (최근 10개만)
-    recent_history = sorted(history_orders, 
-                           key=lambda x: pd.to_datetime(x['date'], errors='coerce') 
-                           if x['date'] != "날짜 미확인" else pd.Timestamp('1900-01-01'), 
-                           reverse=True)[:10]
-    
-    return {
-        'name': today_customer['name'],
-        'real_name': today_customer['name'],  # 실명 (분석용)
-        'phone': today_customer['phone'],
-        'total_orders': total_orders,
-        'total_amount': total_amount,
-        'last_order_date': last_order_date,
-        'current_order': {
-            'product': today_customer['processed_product'],
-            'quantity': today_customer['processed_quantity'],
-            'amount': today_customer.get('amount', 0)
-        },
-        'order_history': recent_history
-    }
-
-def clean_phone_number(phone):
-    """전화번호에서 숫자만 추출"""
-    return re.sub(r'\D', '', str(phone))
+# 고객 목록 표의 컬럼 표시 형식 (금액/수량은 숫자 그대로 두고 표시만 서식 적용)
+CUSTOMER_TABLE_COLUMNS = {
+    "순번": st.column_config.NumberColumn("순번", format="%d"),
+    "총 주문횟수": st.column_config.NumberColumn("총 주문횟수", format="%d회"),
+    "누적 결제금액": st.column_config.NumberColumn("누적 결제금액", format="localized", help="원"),
+    "최근 주문일": st.column_config.DateColumn("최근 주문일", format="YYYY-MM-DD"),
+    "매칭 신뢰도": st.column_config.ProgressColumn("매칭 신뢰도", format="percent", min_value=0.0, max_value=1.0),
+    "오늘 수량": st.column_config.NumberColumn("오늘 수량", format="%d개"),
+    "오늘 결제금액": st.column_config.NumberColumn("오늘 결제금액", format="localized", help="원"),
+    "주문일": st.column_config.DateColumn("주문일", format="YYYY-MM-DD"),
+    "수량": st.column_config.NumberColumn("수량", format="%d개"),
+    "결제금액": st.column_config.NumberColumn("결제금액", format="localized", help="원"),
+}
+
+def reorder_customer_frame(reorder_customers):
+    """재주문 고객 목록 → 표 하나 (인덱스 = reorder_customers 위치, 날짜 미확인은 빈 칸)"""
+    return pd.DataFrame({
+        "순번": range(1, len(reorder_customers) + 1),
+        "고객명": [customer['name'] for customer in reorder_customers],
+        "총 주문횟수": [customer['total_orders'] for customer in reorder_customers],
+        "누적 결제금액": pd.to_numeric([customer['total_amount'] for customer in reorder_customers], errors='coerce'),
+        "최근 주문일": pd.to_datetime([customer['last_order_date'] for customer in reorder_customers], errors='coerce', format='%Y-%m-%d'),
+        "매칭 신뢰도": [customer.get('match_confidence', 1.0) for customer in reorder_customers],
+        "오늘 주문상품": [customer['current_order']['product'] for customer in reorder_customers],
+        "오늘 수량": [customer['current_order']['quantity'] for customer in reorder_customers],
+        "오늘 결제금액": pd.to_numeric([customer['current_order']['amount'] for customer in reorder_customers], errors='coerce'),
+    })
+
+def order_history_frame(order_history):
+    """고객 한 명의 최근 주문 목록 → 표 (날짜를 변환할 수 없으면 빈 칸)"""
+    return pd.DataFrame({
+        "순번": range(1, len(order_history) + 1),
+        "주문일": pd.to_datetime([order['date'] for order in order_history], errors='coerce', format='%Y-%m-%d'),
+        "상품명": [order['product'] for order in order_history],
+        "수량": pd.to_numeric([order['quantity'] for order in order_history], errors='coerce'),
+        "결제금액": pd.to_numeric([order['amount'] for order in order_history], errors='coerce'),
+    })
 
 def display_customer_analysis(results):
     """고객 분석 결과 표시"""
@@ -455,60 +417,40 @@ def display_customer_analysis(results):
     if reorder_customers:
         st.markdown("---")
         st.markdown("### 🔄 재주문 고객 상세 분석")
+        st.caption("💡 행을 선택하면 해당 고객의 과거 주문 이력(최근 10건)을 볼 수 있습니다.")
         
-        for i, customer in enumerate(reorder_customers, 1):
-            st.markdown(f"""
-            <div style="background: linear-gradient(135deg, #e8f5e8 0%, #c8e6c9 100%); 
-                        padding: 25px; border-radius: 15px; margin: 20px 0; 
-                        border-left: 5px solid #4caf50;">
-                <h4 style="margin: 0 0 15px 0; color: #2e7d32; font-weight: 600;">
-                    👤 {customer['name']} (고객 #{i})
-                </h4>
-                <div style="font-size: 16px; color: #424242; line-height: 1.6;">
-                    📊 <strong>총 주문 횟수:</strong> {customer['total_orders']}회<br>
-                    💰 <strong>누적 결제금액:</strong> {customer['total_amount']:,}원<br>
-                    📅 <strong>최근 주문일:</strong> {customer['last_order_date']}<br>
-                    🛒 <strong>오늘 주문:</strong> {customer['current_order']['product']} {customer['current_order']['quantity']}개 
-                    ({customer['current_order']['amount']:,}원)
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
-            
-            # 주문 이력 상세 표시
+        # 재주문 고객 전체를 하나의 표로 - 검색/페이지 나누기 후 현재 페이지만 표시
+        selected = render_paginated_table(
+            reorder_customer_frame(reorder_customers), "reorder_customers",
+            search_columns=["고객명", "오늘 주문상품"], column_config=CUSTOMER_TABLE_COLUMNS, selectable=True
+        )
+        
+        # 선택한 고객의 주문 이력만 표시
+        if selected is not None:
+            customer = reorder_customers[selected]
+            st.markdown(f"**📋 {customer['name']} 님의 과거 주문 이력 (최근 10건)**")
             if customer['order_history']:
-                st.markdown("**📋 과거 주문 이력 (최근 10건)**")
-                
-                history_data = []
-                for j, order in enumerate(customer['order_history'], 1):
-                    history_data.append({
-                        "순번": j,
-                        "주문일": order['date'],
-                        "상품명": order['product'],
-                        "수량": f"{order['quantity']}개",
-                        "결제금액": f"{order['amount']:,}원"
-                    })
-                
-                history_df = pd.DataFrame(history_data)
-                st.dataframe(history_df, use_container_width=True, hide_index=True)
-            
-            st.markdown("---")
+                st.dataframe(
+                    order_history_frame(customer['order_history']),
+                    column_config=CUSTOMER_TABLE_COLUMNS, use_container_width=True, hide_index=True
+                )
+            else:
+                st.info("📋 표시할 과거 주문 이력이 없습니다.")
     
     # 신규 고객 정보
     if new_customers:
         st.markdown("### ✨ 신규 고객")
         
-        new_customer_data = []
-        for i, customer in enumerate(new_customers, 1):
-            new_customer_data.append({
-                "순번": i,
-                "고객명": customer['name'],
-                "주문상품": customer['product'],
-                "수량": f"{customer['quantity']}개",
-                "결제금액": f"{customer['amount']:,}원"
-            })
-        
-        new_df = pd.DataFrame(new_customer_data)
-        st.dataframe(new_df, use_container_width=True, hide_index=True)
+        new_df = pd.DataFrame({
+            "순번": range(1, len(new_customers) + 1),
+            "고객명": [customer['name'] for customer in new_customers],
+            "주문상품": [customer['product'] for customer in new_customers],
+            "수량": [customer['quantity'] for customer in new_customers],
+            "결제금액": [customer['amount'] for customer in new_customers],
+        })
+        render_paginated_table(
+            new_df, "new_customers", search_columns=["고객명", "주문상품"], column_config=CUSTOMER_TABLE_COLUMNS
+        )
     
     # 결과 다운로드 버튼
     # 결과 다운로드 버튼 (기존 위치에서 수정)
@@ -534,24 +476,26 @@ def display_customer_analysis(results):
 
     with col2:
         st.markdown("**📋 누적 고객정보 파일**")
-        if st.button("📁 고객주문정보_누적.xlsx 다운로드", help="다음날 업로드용 누적 데이터"):
-            # DataFrame 데이터 추출
-            history_df = results.get('source_data', {}).get('history_df')
-            shipment_df = results.get('source_data', {}).get('shipment_df')
+        export_format = st.selectbox(
+            "파일 형식", available_formats(), key="cumulative_export_format",
+            help="xlsx: 다음날 업로드용 / csv, parquet: 다른 프로그램에서 읽기용"
+        )
+        extension, mime = EXPORT_FORMATS[export_format]
+        if st.button(f"📁 고객주문정보_누적.{extension} 다운로드", help="다음날 업로드용 누적 데이터"):
+            with st.spinner('📁 누적 고객정보 파일 생성 중...'):
+                cumulative_file = create_updated_customer_file(results, export_format)
             
-            if history_df is not None and shipment_df is not None:
-                cumulative_file = create_updated_customer_file(history_df, shipment_df)
-                
-                if cumulative_file:
-                    st.download_button(
-                        label="📥 고객주문정보_누적.xlsx",
-                        data=cumulative_file,
-                        file_name=f"고객주문정보_누적_{datetime.now().strftime('%Y%m%d')}.xlsx",
-                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                    )
-                    st.success("✅ 누적 고객정보 파일이 준비되었습니다!")
-            else:
-                st.error("❌ 누적 파일 생성에 필요한 데이터가 없습니다.")
+            if cumulative_file:
+                st.download_button(
+                    label=f"📥 고객주문정보_누적.{extension}",
+                    data=cumulative_file,
+                    file_name=f"고객주문정보_누적_{datetime.now().strftime('%Y%m%d')}.{extension}",
+                    mime=mime
+                )
+                st.success("✅ 누적 고객정보 파일이 준비되었습니다!")
+
+    display_history_store_actions(results)
+    display_history_analytics(results)
 
     st.info("""
     📋 **파일 사용 가이드:**
@@ -564,182 +508,150 @@ def display_customer_analysis(results):
     # 다운로드 후 메모리 정리
     if 'output_file' in locals():
         del output_file
-    force_memory_cleanup(results)        
+    force_memory_cleanup()
 
 
 def create_analysis_report(results):
-    """분석 결과를 Excel 파일로 생성 (재주문고객 + 신규고객만)"""
+    """분석 결과를 Excel 파일로 생성 (재주문고객 + 신규고객만) - 행을 바로 쓰기 전용 워크북에 기록"""
     try:
-        from io import BytesIO
-        output = BytesIO()
+        sheets = []
         
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            # 재주문 고객 시트
-            if results['reorder_customers']:
-                reorder_data = []
-                for customer in results['reorder_customers']:
-                    reorder_data.append({
-                        '고객명': customer['real_name'],
-                        '총주문횟수': customer['total_orders'],
-                        '누적결제금액': customer['total_amount'],
-                        '최근주문일': customer['last_order_date'],
-                        '오늘주문상품': customer['current_order']['product'],
-                        '오늘주문수량': customer['current_order']['quantity'],
-                        '오늘결제금액': customer['current_order']['amount']
-                    })
-                
-                reorder_df = pd.DataFrame(reorder_data)
-                reorder_df.to_excel(writer, sheet_name='재주문고객', index=False)
-            
-            # 신규 고객 시트
-            if results['new_customers']:
-                new_data = []
-                for customer in results['new_customers']:
-                    new_data.append({
-                        '고객명': customer['name'],
-                        '주문상품': customer['product'],
-                        '수량': customer['quantity'],
-                        '결제금액': customer['amount']
-                    })
-                
-                new_df = pd.DataFrame(new_data)
-                new_df.to_excel(writer, sheet_name='신규고객', index=False)
+        # 재주문 고객 시트
+        if results['reorder_customers']:
+            sheets.append((
+                '재주문고객',
+                ['고객명', '총주문횟수', '누적결제금액', '최근주문일', '오늘주문상품', '오늘주문수량', '오늘결제금액'],
+                ((customer['real_name'], customer['total_orders'], customer['total_amount'],
+                  customer['last_order_date'], customer['current_order']['product'],
+                  customer['current_order']['quantity'], customer['current_order']['amount'])
+                 for customer in results['reorder_customers'])
+            ))
         
-        output.seek(0)
-        return output.getvalue()
+        # 신규 고객 시트
+        if results['new_customers']:
+            sheets.append((
+                '신규고객',
+                ['고객명', '주문상품', '수량', '결제금액'],
+                ((customer['name'], customer['product'], customer['quantity'], customer['amount'])
+                 for customer in results['new_customers'])
+            ))
+        
+        return write_xlsx(sheets)
     
     except Exception as e:
         st.error(f"❌ 분석 결과 Excel 파일 생성 실패: {str(e)}")
         return None
 
-def create_updated_customer_file(history_df, shipment_df):
-    """기존 이력 + 오늘 출고내역 = 누적 고객주문정보 파일 생성"""
-    try:
-        from io import BytesIO
-        output = BytesIO()
-        
-        # 기존 고객주문정보 데이터 복사
-        updated_data = history_df.copy()
-        
-        # 오늘 출고내역을 고객주문정보 형식으로 변환
-        today = datetime.now().strftime('%Y-%m-%d')
-        
-        shipment_records = []
-        for _, row in shipment_df.iterrows():
-            # 출고내역서 → 고객주문정보 형식 변환
-            record = {
-                '주문일시': today,
-                '주문자이름': row.get('주문자이름', ''),
-                '주문자전화번호': row.get('주문자전화번호1', ''),
-                '상품이름': row.get('상품이름', ''),
-                '상품수량': row.get('상품수량', 1),
-                '상품결제금액': row.get('상품결제금액', 0),
-                '수취인이름': row.get('수취인이름', ''),
-                '옵션이름': row.get('옵션이름', '')
-            }
-            shipment_records.append(record)
-        
-        # 새로운 출고내역을 DataFrame으로 변환
-        new_records_df = pd.DataFrame(shipment_records)
-        
-        # 기존 데이터와 새로운 데이터 합치기
-        if not new_records_df.empty:
-            # 컬럼 순서 맞추기
-            common_columns = ['주문일시', '주문자이름', '주문자전화번호', '상품이름', 
-                            '상품수량', '상품결제금액', '수취인이름', '옵션이름']
-            
-            # 기존 데이터에서 공통 컬럼만 선택
-            history_subset = updated_data[common_columns].copy() if all(col in updated_data.columns for col in common_columns) else updated_data.copy()
-            
-            # 새로운 데이터 추가
-            final_data = pd.concat([history_subset, new_records_df], ignore_index=True)
-            
-            # 중복 제거 (동일한 고객이 같은 날 같은 상품을 주문한 경우)
-            final_data = final_data.drop_duplicates(
-                subset=['주문일시', '주문자이름', '주문자전화번호', '상품이름'], 
-                keep='last'
-            )
-            
-            # 날짜순 정렬
-            final_data['주문일시'] = pd.to_datetime(final_data['주문일시'], errors='coerce')
-            final_data = final_data.sort_values('주문일시', ascending=False)
-            final_data['주문일시'] = final_data['주문일시'].dt.strftime('%Y-%m-%d')
-        else:
-            final_data = updated_data
-        
-        # Excel 파일로 저장
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            final_data.to_excel(writer, sheet_name='고객주문정보', index=False)
-        
-        output.seek(0)
-        return output.getvalue()
-        
-    except Exception as e:
-        st.error(f"❌ 누적 고객 데이터 파일 생성 실패: {str(e)}")
-        return None
-
-
-def read_excel_file_safely(uploaded_file):
-    """안전한 엑셀 파일 읽기 - 강화된 에러 처리"""
-    if uploaded_file is None:
-        st.error("❌ 업로드된 파일이 없습니다.")
-        return None
-    
-    # 파일 크기 확인
-    file_size = uploaded_file.size
-    if file_size > 50 * 1024 * 1024:  # 50MB 제한
-        st.error("❌ 파일 크기가 너무 큽니다. (최대 50MB)")
-        st.info("💡 파일 크기를 줄이거나 다른 파일을 선택해주세요.")
-        return None
-    
-    # 파일 확장자 확인
-    if not uploaded_file.name.lower().endswith('.xlsx'):
-        st.error("❌ .xlsx 파일만 지원합니다.")
-        st.info("💡 엑셀 파일을 .xlsx 형식으로 저장해주세요.")
-        return None
+def display_history_store_actions(results):
+    """고객 이력 저장소 저장 버튼 - 오늘 출고내역 추가, 업로드한 고객주문정보 가져오기"""
+    source_data = results.get('source_data')
+    if not source_data:
+        return
     
-    df = None
-    read_options = [
-        {'engine': 'openpyxl', 'data_only': True},
-        {'engine': 'openpyxl', 'data_only': False},
-        {'engine': 'openpyxl'},
-    ]
+    st.markdown("### 🗂️ 고객 이력 저장소")
+    col1, col2 = st.columns(2)
     
-    for i, options in enumerate(read_options):
-        try:
-            # 파일 포인터 리셋
-            uploaded_file.seek(0)
-            df = pd.read_excel(uploaded_file, **options)
-            
-            if len(df) == 0:
-                st.warning(f"⚠️ {uploaded_file.name}: 파일이 비어있습니다")
-                continue
-                
-            if i == 0:
-                st.success(f"✅ {uploaded_file.name}: 파일 읽기 성공 ({len(df):,}행)")
+    with col1:
+        if st.button("➕ 오늘 출고내역을 저장소에 추가", help="다음 분석부터 고객주문정보 파일 없이 출고내역서만으로 분석"):
+            today = datetime.now().strftime('%Y-%m-%d')
+            with st.spinner('💾 고객 이력 저장 중...'):
+                saved = run_source_task(results, store_customer_history, github_credentials(), 'shipment', today)
+            if saved:
+                st.session_state.pop('customer_history_manifest', None)  # 저장소가 바뀌었으므로 목록을 다시 불러옴
+                st.success(f"✅ 오늘 출고내역 {saved:,}건을 고객 이력 저장소에 추가했습니다!")
             else:
-                st.info(f"ℹ️ {uploaded_file.name}: 대체 방식으로 읽기 성공 ({len(df):,}행)")
-            break
-            
-        except pd.errors.EmptyDataError:
-            st.error(f"❌ {uploaded_file.name}: 파일에 데이터가 없습니다")
-            continue
-        except pd.errors.ParserError as e:
-            st.error(f"❌ {uploaded_file.name}: 파일 형식 오류")
-            if i == len(read_options) - 1:
-                st.info("💡 파일이 손상되었거나 올바른 Excel 형식이 아닙니다.")
-            continue
-        except Exception as e:
-            if i == len(read_options) - 1:
-                st.error(f"❌ {uploaded_file.name}: 모든 읽기 방식 실패")
-                st.info("💡 파일을 다시 저장하거나 다른 파일을 시도해주세요.")
-                logging.error(f"Excel 파일 읽기 실패 (파일 세부사항 제외) ")
-            continue
+                st.error("❌ 고객 이력 저장소 저장에 실패했습니다.")
     
-    return df
+    with col2:
+        if not source_data.get('history_from_store'):
+            if st.button("📥 고객주문정보 파일을 저장소로 가져오기", help="업로드한 누적 이력 전체를 저장소에 저장 (같은 주문은 한 번만 저장)"):
+                today = datetime.now().strftime('%Y-%m-%d')
+                with st.spinner('💾 고객 이력 가져오는 중...'):
+                    saved = run_source_task(results, store_customer_history, github_credentials(), 'history', today)
+                if saved:
+                    st.session_state.pop('customer_history_manifest', None)  # 저장소가 바뀌었으므로 목록을 다시 불러옴
+                    st.success(f"✅ 고객주문정보 {saved:,}건을 고객 이력 저장소로 가져왔습니다!")
+                else:
+                    st.error("❌ 고객 이력 저장소 저장에 실패했습니다.")
+
+def display_history_analytics(results):
+    """고객 이력 전체 분석 섹션 - 업로드한 이력 또는 (저장소 분석이면) 저장소 전체 이력을 버튼으로 분석"""
+    source_data = results.get('source_data')
+    if not source_data:
+        return
+    
+    st.markdown("### 📈 고객 이력 분석 (RFM · 코호트)")
+    if source_data.get('history_from_store'):
+        # 분석에 쓴 이력은 오늘 고객의 샤드뿐이므로 저장소 전체를 불러와 분석
+        if st.button("📈 저장소 전체 이력 분석", help="저장된 모든 고객 이력으로 RFM, 코호트 재구매율 계산"):
+            with st.spinner('📊 고객 이력 전체 분석 중...'):
+                analytics = run_customer_job(store_analytics_job, github_credentials())
+            if analytics is not None:
+                display_customer_analytics(analytics)
+    elif st.button("📈 업로드한 이력 분석", help="업로드한 고객주문정보 전체로 RFM, 코호트 재구매율 계산"):
+        with st.spinner('📊 고객 이력 분석 중...'):
+            analytics = run_source_task(results, history_analytics)
+        if analytics is not None:
+            display_customer_analytics(analytics)
+
+def display_customer_analytics(analytics):
+    """RFM 세그먼트, 첫 구매 월 코호트 재구매율, 상품별 재구매율 표시 - 고객 이름 없이 집계만 표시"""
+    rfm = analytics['rfm']
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("분석 고객 수", f"{len(rfm):,}명")
+    with col2:
+        st.metric("재구매 고객 비율", f"{(rfm['frequency'] >= 2).mean():.1%}")
+    with col3:
+        st.metric("고객당 평균 결제금액", f"{rfm['monetary'].mean():,.0f}원")
+    
+    # 🏷️ RFM 세그먼트
+    st.markdown("#### 🏷️ RFM 고객 세그먼트")
+    segments = rfm.groupby('segment').agg(
+        고객수=('segment', 'size'),
+        평균경과일=('recency_days', 'mean'),
+        평균구매일수=('frequency', 'mean'),
+        평균결제금액=('monetary', 'mean'),
+    ).sort_values('고객수', ascending=False)
+    col1, col2 = st.columns(2)
+    with col1:
+        fig = px.bar(segments.reset_index(), x='segment', y='고객수', text='고객수',
+                     labels={'segment': '세그먼트', '고객수': '고객 수'})
+        st.plotly_chart(fig, use_container_width=True)
+    with col2:
+        st.dataframe(segments.round(1), use_container_width=True)
+    
+    # 📅 코호트 재구매율
+    st.markdown("#### 📅 첫 구매 월 코호트 재구매율")
+    retention = analytics['retention']
+    retention.index = retention.index.astype(str)
+    fig = px.imshow(
+        retention * 100, text_auto='.0f', aspect='auto', color_continuous_scale='Blues',
+        labels={'x': '첫 구매 후 경과 개월', 'y': '첫 구매 월', 'color': '재구매율(%)'}
+    )
+    st.plotly_chart(fig, use_container_width=True)
+    st.caption("각 칸은 첫 구매 월 코호트 중 해당 개월에 다시 구매한 고객 비율(%)입니다. "
+               f"코호트 크기: {', '.join(f'{month} {size:,}명' for month, size in analytics['cohort_sizes'].astype(int).items())}")
+    
+    # 🔁 상품별 재구매율
+    st.markdown("#### 🔁 상품별 재구매율")
+    product_repeat = analytics['product_repeat']
+    product_repeat = product_repeat[product_repeat['customers'] >= 2].head(20).reset_index()
+    if product_repeat.empty:
+        st.info("📋 구매 고객이 2명 이상인 상품이 없습니다.")
+    else:
+        fig = px.bar(product_repeat, x='repeat_rate', y='product', orientation='h', text_auto='.0%',
+                     hover_data=['customers', 'repeat_customers'],
+                     labels={'repeat_rate': '재구매율', 'product': '상품',
+                             'customers': '구매 고객 수', 'repeat_customers': '재구매 고객 수'})
+        fig.update_layout(yaxis={'categoryorder': 'total ascending'}, xaxis_tickformat='.0%')
+        st.plotly_chart(fig, use_container_width=True)
+
+def create_updated_customer_file(results, fmt='xlsx'):
+    """기존 이력 + 오늘 출고내역 = 누적 고객주문정보 파일 생성 (xlsx/csv/parquet)"""
+    today = datetime.now().strftime('%Y-%m-%d')
+    return run_source_task(results, cumulative_export, fmt, today)
 
-# 한국 시간대 설정
-KST = timezone(timedelta(hours=9))
 
 # 🔒 관리자 인증 함수
 def check_admin_access():
@@ -783,72 +695,126 @@ def check_admin_access():
             st.session_state.admin_mode = False
             if "admin_password" in st.session_state:
                 del st.session_state.admin_password
+            # 세션에 보관된 엑셀 파싱 결과(개인정보 포함)·업로드 스냅샷·고객 분석 결과·저장소 목록 삭제
+            st.session_state.pop('excel_parse_cache', None)
+            st.session_state.pop('upload_snapshots', None)
+            st.session_state.pop('customer_analysis_cache', None)
+            st.session_state.pop('upload_fingerprints', None)
+            st.session_state.pop('customer_history_manifest', None)
             st.rerun()
         
         return True
 
 @handle_errors
-def process_uploaded_file_once(uploaded_file):
-    """파일을 한 번만 읽고 모든 처리에 재사용 - 강화된 에러 처리"""
-    if uploaded_file is None:
+def process_uploaded_files_once(uploaded_files):
+    """업로드된 파일들을 파일별로 병렬 집계한 뒤 하나의 집계로 합침 - 출고 현황/박스 계산 공용"""
+    if not uploaded_files:
         st.error("❌ 업로드된 파일이 없습니다.")
-        return None, None, None, None
+        return None
     
-    # 1. 파일 읽기
-    df = read_excel_file_safely(uploaded_file)
+    # 1. 파일 읽기 + 정규화 + 집계 (처음 올린 파일은 파일별 프로세스, 필요한 컬럼만 읽음)
+    #    오늘 같은 이름으로 처리한 파일이 있으면 현재 프로세스에서 추가된 행만 정규화해 다시 집계
+    upload_state = load_upload_snapshots()
+    file_results = snapshot_excel_files(
+        [(f.name, f.getvalue()) for f in uploaded_files], upload_state['files']
+    )
     
-    if df is None:
-        st.error("❌ 파일 읽기에 실패했습니다.")
-        return None, None, None, None
+    # 2. 파일별 결과 확인 후 병합 (하나라도 실패하면 저장하지 않음)
+    merged = OrderAggregate()
+    failed = False
     
-    # 2. 데이터 유효성 검사
-    if df.empty:
-        st.error("❌ 파일에 데이터가 없습니다.")
-        st.info("💡 데이터가 포함된 엑셀 파일을 업로드해주세요.")
-        return None, None, None, None
+    for file_name, result in file_results:
+        if isinstance(result, ExcelHeaderError):
+            st.error(f"❌ {file_name}: 필수 컬럼이 누락되었습니다: {', '.join(result.missing_columns)}")
+            st.info("💡 올바른 출고내역서 파일인지 확인해주세요.")
+            
+            # 사용 가능한 컬럼 표시
+            with st.expander(f"🔍 {file_name} 컬럼 목록 보기"):
+                st.write("현재 파일에 포함된 컬럼:")
+                for col in result.available_columns:
+                    st.write(f"- {col}")
+            failed = True
+            
+        elif isinstance(result, Exception):
+            st.error(f"❌ {file_name}: 파일 읽기에 실패했습니다.")
+            st.info("💡 파일이 손상되었거나 올바른 Excel 형식이 아닙니다.")
+            if st.session_state.get('admin_mode', False):
+                st.error(f"🔧 **오류 상세**: {str(result)}")
+            logging.error(f"데이터 처리 중 시스템 오류 발생 (데이터 내용 제외)")
+            failed = True
+            
+        elif result.aggregate.row_count == 0:
+            st.error(f"❌ {file_name}: 파일에 데이터가 없습니다.")
+            st.info("💡 데이터가 포함된 엑셀 파일을 업로드해주세요.")
+            failed = True
+            
+        else:
+            if result.incremental:
+                st.write(
+                    f"📄 **{file_name}**: {result.aggregate.row_count:,}개 주문 "
+                    f"(이전 업로드 대비 추가 {result.added_rows:,}행 / 삭제 {result.removed_rows:,}행만 반영)"
+                )
+            else:
+                st.write(f"📄 **{file_name}**: {result.aggregate.row_count:,}개 주문")
+            merged.merge(result.aggregate)
     
-    # 3. 필수 컬럼 확인
-    required_columns = ['상품이름', '옵션이름', '상품수량']
-    missing_columns = [col for col in required_columns if col not in df.columns]
+    if failed:
+        return None
     
-    if missing_columns:
-        st.error(f"❌ 필수 컬럼이 누락되었습니다: {', '.join(missing_columns)}")
-        st.info("💡 올바른 출고내역서 파일인지 확인해주세요.")
-        
-        # 사용 가능한 컬럼 표시
-        available_columns = list(df.columns)
-        with st.expander("🔍 파일의 컬럼 목록 보기"):
-            st.write("현재 파일에 포함된 컬럼:")
-            for col in available_columns:
-                st.write(f"- {col}")
-        
-        return None, None, None, None
+    # 같은 파일 묶음에서 집계에 쓰이는 행이 하나도 바뀌지 않았는지 기록 (저장 생략 판단용)
+    upload_state['unchanged'] = (
+        set(upload_state['files']) == {name for name, _ in file_results}
+        and all(snapshot.incremental and not snapshot.added_rows and not snapshot.removed_rows
+                for _, snapshot in file_results)
+    )
+    # 다음 재업로드 비교용으로 행 지문과 수취인 없는 정규화 값만 보관
+    upload_state['files'] = {name: snapshot.retained() for name, snapshot in file_results}
     
-    # 4. 데이터 정제
-    try:
-        df_clean = sanitize_data(df)
-        
-        if df_clean.empty:
-            st.error("❌ 데이터 정제 후 사용 가능한 데이터가 없습니다.")
-            st.info("💡 데이터 형식을 확인하고 다시 시도해주세요.")
-            return None, None, None, None
-        
-        # 5. 복사본 생성
-        df_shipment = df_clean.copy()
-        df_box = df_clean.copy()
-        df_customer = df_clean.copy()
-        
-        st.success(f"✅ 파일 처리 완료: {len(df_clean):,}개 주문 준비됨")
-        
-        return df_clean, df_shipment, df_box, df_customer
-        
-    except Exception as e:
-        st.error(f"❌ 데이터 처리 중 오류가 발생했습니다.")
-        if st.session_state.get('admin_mode', False):
-            st.error(f"🔧 **오류 상세**: {str(e)}")
-        logging.error(f"데이터 처리 중 시스템 오류 발생 (데이터 내용 제외)")
-        return None, None, None, None
+    st.success(f"✅ 파일 처리 완료: {len(file_results)}개 파일, {merged.row_count:,}개 주문 준비됨")
+    
+    return merged
+
 
+def load_upload_snapshots():
+    """오늘 처리한 업로드 파일별 스냅샷(행 지문 + 수취인 없는 정규화 값) - 날짜가 바뀌면 비움"""
+    today = datetime.now(KST).strftime('%Y-%m-%d')
+    upload_state = st.session_state.get('upload_snapshots')
+    if not upload_state or upload_state.get('date') != today:
+        upload_state = {'date': today, 'files': {}, 'unchanged': False, 'published': False}
+        st.session_state.upload_snapshots = upload_state
+    return upload_state
+
+def find_processed_upload(fingerprint):
+    """이미 처리된 업로드인지 확인 - 세션 기록 우선, 없으면 저장소의 업로드 기록 확인"""
+    processed_uploads = st.session_state.setdefault('processed_uploads', {})
+    if fingerprint in processed_uploads:
+        return processed_uploads[fingerprint]
+    
+    # 저장소 기록은 세션당 한 번만 불러옴
+    if 'published_uploads' not in st.session_state:
+        st.session_state.published_uploads = load_upload_log()
+    
+    return st.session_state.published_uploads.get(fingerprint)
+
+def remember_processed_upload(fingerprint, outcome):
+    """업로드 처리 결과 기록 - 세션에는 항상, 저장소에는 모두 저장된 경우에만"""
+    st.session_state.setdefault('processed_uploads', {})[fingerprint] = outcome
+    
+    if outcome.get('shipment_saved') and outcome.get('box_saved'):
+        if record_processed_upload(fingerprint, outcome):
+            st.session_state.setdefault('published_uploads', {})[fingerprint] = outcome
+
+def show_processed_upload(outcome):
+    """이미 처리된 업로드의 저장된 결과 표시"""
+    st.success(
+        f"✅ 이미 처리된 파일입니다: {outcome.get('file_name', '')} "
+        f"({outcome.get('processed_at', '')} 처리, {outcome.get('rows', 0):,}개 주문)"
+    )
+    
+    shipment_status = "저장 완료" if outcome.get('shipment_saved') else "저장 실패"
+    box_status = "저장 완료" if outcome.get('box_saved') else "저장 실패"
+    st.markdown(f"- 📦 출고 현황: **{shipment_status}**\n- 📦 박스 계산: **{box_status}**")
+    st.info("💡 같은 파일을 다시 처리하려면 '🔄 다시 처리' 버튼을 누르세요.")
 
 # 한국 시간 기준 날짜 정보 생성
 def get_korean_date():
@@ -867,6 +833,11 @@ st.markdown("### 🔒 테스트 버전")
 # 관리자 권한 확인
 is_admin = check_admin_access()
 
+# 일정 시간 사용하지 않은 고객 분석 결과와 엑셀 파싱 결과(개인정보 포함) 삭제
+for cache_key in ('customer_analysis_cache', 'excel_parse_cache'):
+    if cache_key in st.session_state:
+        st.session_state[cache_key].evict_expired()
+
 # 탭 구성
 tab1, tab2, tab3, tab4 = st.tabs(["📦 출고 현황", "📦 박스 계산", "📊 재고 관리", "👥 고객 관리"])
 
@@ -888,27 +859,42 @@ if is_admin:
     - **.xlsx 형식만 지원**
     """)
     
-    uploaded_file = st.file_uploader(
-        "📁 통합 엑셀 파일을 업로드하세요 (.xlsx만 지원)",
+    uploaded_files = st.file_uploader(
+        "📁 출고내역 엑셀 파일을 업로드하세요 (.xlsx만 지원, 판매 채널별 여러 파일 가능)",
         type=['xlsx'],
-        help="통합 출고내역서(.xlsx)를 업로드하세요. 고객 정보는 자동으로 제거됩니다.",
+        accept_multiple_files=True,
+        help="출고내역서(.xlsx)를 하나 이상 업로드하세요. 여러 파일은 합산되며, 고객 정보는 자동으로 제거됩니다.",
         key="unified_file_uploader"
     )
     
-    if uploaded_file:
+    if uploaded_files:
         # 파일 유효성 사전 검사
-        if not uploaded_file.name.lower().endswith('.xlsx'):
-            st.error("❌ .xlsx 파일만 업로드 가능합니다.")
-            st.info("💡 엑셀 파일을 .xlsx 형식으로 저장해주세요.")
-            st.stop()
-        
-        if uploaded_file.size > 50 * 1024 * 1024:  # 50MB 제한
-            st.error("❌ 파일 크기가 너무 큽니다. (최대 50MB)")
-            st.info("💡 파일 크기를 줄이거나 나누어서 업로드해주세요.")
-            st.stop()
+        for uploaded_file in uploaded_files:
+            if not uploaded_file.name.lower().endswith('.xlsx'):
+                st.error(f"❌ {uploaded_file.name}: .xlsx 파일만 업로드 가능합니다.")
+                st.info("💡 엑셀 파일을 .xlsx 형식으로 저장해주세요.")
+                st.stop()
+            
+            if uploaded_file.size > MAX_UPLOAD_SIZE_MB * 1024 * 1024:  # 스트리밍 처리 - 업로드 한도만 확인
+                st.error(f"❌ {uploaded_file.name}: 파일 크기가 너무 큽니다. (최대 {MAX_UPLOAD_SIZE_MB}MB)")
+                st.info("💡 파일 크기를 줄이거나 나누어서 업로드해주세요.")
+                st.stop()
         
         # 세션 상태에 파일 저장
-        st.session_state.last_uploaded_file = uploaded_file
+        st.session_state.last_uploaded_file = uploaded_files
+        
+        # 업로드 파일 지문 (파일 순서와 무관) - 이미 처리된 파일 묶음은 다시 읽고 저장하지 않음
+        fingerprint = combine_fingerprints([uploaded_file_fingerprint(f) for f in uploaded_files])
+        previous_outcome = find_processed_upload(fingerprint)
+        reprocess_requested = False
+        
+        if previous_outcome:
+            show_processed_upload(previous_outcome)
+            reprocess_requested = st.button(
+                "🔄 다시 처리",
+                help="같은 파일이라도 다시 읽고 집계하여 저장합니다",
+                key="reprocess_upload"
+            )
     
         # 전체 처리를 안전하게 실행
         def safe_process_all():
@@ -922,14 +908,29 @@ if is_admin:
                 with st.spinner('🔒 통합 파일 보안 처리 및 영구 저장 중...'):
                     # 1. 파일 전처리
                     try:
-                        df_clean, df_shipment, df_box, _ = process_uploaded_file_once(uploaded_file)
+                        with MemoryManager("파일 전처리"):
+                            aggregate = process_uploaded_files_once(uploaded_files)
                         
-                        if df_clean is None:
+                        if aggregate is None:
                             st.error("❌ 파일 처리에 실패했습니다.")
                             st.info("💡 파일 형식이나 내용을 확인하고 다시 시도해주세요.")
                             return False
                         
-                        st.success(f"✅ 파일 전처리 완료: {len(df_clean):,}개 주문")
+                        st.success(f"✅ 파일 전처리 완료: {aggregate.row_count:,}개 주문")
+                        row_count = aggregate.row_count
+                        
+                        # 이전에 저장한 업로드와 집계가 같으면 GitHub 저장 생략
+                        upload_state = load_upload_snapshots()
+                        if upload_state['unchanged'] and upload_state['published'] and not reprocess_requested:
+                            st.info("💡 이전 업로드와 비교해 집계에 영향을 주는 변경이 없어 저장을 생략합니다.")
+                            remember_processed_upload(fingerprint, {
+                                'file_name': ", ".join(f.name for f in uploaded_files),
+                                'processed_at': get_current_time_str(),
+                                'rows': row_count,
+                                'shipment_saved': True,
+                                'box_saved': True
+                            })
+                            return True
                         
                     except Exception as e:
                         st.error("❌ 파일 전처리 중 치명적 오류가 발생했습니다.")
@@ -942,7 +943,7 @@ if is_admin:
                     with MemoryManager("출고 현황 처리") as shipment_mem:
                         try:
                             with st.spinner('📦 출고 현황 처리 중...'):
-                                results = process_shipment_data(df_shipment)
+                                results = dict(aggregate.shipment_totals)
                                 
                                 if results:
                                     shipment_saved = save_shipment_data(results)
@@ -961,8 +962,6 @@ if is_admin:
                             # 강화된 메모리 정리
                             if 'results' in locals() and results is not None:
                                 del results
-                            if 'df_shipment' in locals() and df_shipment is not None:
-                                del df_shipment
                             gc.collect()
                             
                             # 추가 시스템 정리
@@ -980,7 +979,7 @@ if is_admin:
                         
                         finally:
                             # finally 블록에서 확실한 정리
-                            for var_name in ['results', 'df_shipment']:
+                            for var_name in ['results']:
                                 if var_name in locals():
                                     del locals()[var_name]
                             gc.collect()
@@ -989,21 +988,11 @@ if is_admin:
                     with MemoryManager("박스 계산 처리") as box_mem:
                         try:
                             with st.spinner('📦 박스 계산 처리 중...'):
-                                if df_box is not None and not df_box.empty:
-                                    if '수취인이름' in df_box.columns:
-                                        total_boxes, box_e_orders = calculate_box_requirements(df_box)
-                                        
-                                        box_results = {
-                                            'total_boxes': dict(total_boxes),
-                                            'box_e_orders': [
-                                                {
-                                                    'recipient': order['recipient'],
-                                                    'quantities': dict(order['quantities']),
-                                                    'products': dict(order['products'])
-                                                }
-                                                for order in box_e_orders
-                                            ]
-                                        }
+                                if aggregate.row_count > 0:
+                                    if aggregate.has_recipient:
+                                        with MemoryManager("박스 계산"):
+                                            total_boxes, box_e_orders = calculate_box_requirements(aggregate.recipient_orders())
+                                            box_results = build_box_results(total_boxes, box_e_orders)
                                         
                                         box_saved = save_box_data(box_results)
                                         
@@ -1027,11 +1016,6 @@ if is_admin:
                                     box_saved = False
                                     error_details.append("박스 계산용 데이터 없음")
                             
-                            # DataFrame 정리
-                            if df_box is not None:
-                                del df_box
-                                gc.collect()
-                            
                         except Exception as e:
                             st.error("❌ 박스 계산 처리 중 오류가 발생했습니다.")
                             if st.session_state.get('admin_mode', False):
@@ -1041,10 +1025,20 @@ if is_admin:
                             box_saved = False
                     
                     # 최종 DataFrame 정리
-                    if df_clean is not None:
-                        del df_clean
+                    if aggregate is not None:
+                        del aggregate
                         gc.collect()
                     
+                    # 처리 결과 기록 (같은 파일 재업로드 시 재처리 생략)
+                    remember_processed_upload(fingerprint, {
+                        'file_name': ", ".join(f.name for f in uploaded_files),
+                        'processed_at': get_current_time_str(),
+                        'rows': row_count,
+                        'shipment_saved': bool(shipment_saved),
+                        'box_saved': bool(box_saved)
+                    })
+                    upload_state['published'] = bool(shipment_saved and box_saved)
+                    
                     # 결과 요약 및 복구 가이드
                     if success_count == total_processes:
                         st.success("🎉 모든 처리가 성공적으로 완료되었습니다!")
@@ -1069,10 +1063,10 @@ if is_admin:
                         
                         # 복구 방법 제안
                         with st.expander("🔧 문제 해결 방법"):
-                            st.markdown("""
+                            st.markdown(f"""
                             **파일 관련 문제:**
                             1. 파일이 .xlsx 형식인지 확인
-                            2. 파일 크기가 50MB 이하인지 확인
+                            2. 파일 크기가 {MAX_UPLOAD_SIZE_MB}MB 이하인지 확인
                             3. 필수 컬럼(상품이름, 옵션이름, 상품수량)이 있는지 확인
                             
                             **네트워크 관련 문제:**
@@ -1094,9 +1088,10 @@ if is_admin:
                     
                     return success_count > 0
     
-        # 안전한 처리 실행
+        # 안전한 처리 실행 (처음 보는 파일이거나 재처리 요청 시에만)
         try:
-            safe_execute(safe_process_all, "전체 파일 처리", False)
+            if previous_outcome is None or reprocess_requested:
+                safe_execute(safe_process_all, "전체 파일 처리", False)
         except Exception as critical_error:
             st.error("❌ 치명적인 시스템 오류가 발생했습니다.")
             st.info("💡 페이지를 새로고침하고 다시 시도해주세요.")
@@ -1336,28 +1331,28 @@ with tab2:
             st.markdown("### ⚠️ 박스 검토 필요 주문")
             st.warning(f"📋 **총 {len(box_e_orders)}건의 주문이 박스 검토가 필요합니다.**")
             
-            # 간단한 요약 테이블 - 주문 내역 중심
-            summary_data = []
-            for i, order in enumerate(box_e_orders, 1):
-                quantities = order.get('quantities', {})
-                
-                # 주문 내역 문자열 생성
-                order_details = []
-                for capacity in ['1.5L', '1L', '500ml', '240ml']:
-                    qty = quantities.get(capacity, 0)
-                    if qty > 0:
-                        order_details.append(f"{capacity} {qty}개")
-                
-                summary_data.append({
-                    "주문 번호": f"주문 {i}",
-                    "수취인": order.get('recipient', '알 수 없음'),
-                    "주문 내역": ", ".join(order_details) if order_details else "확인 필요"
-                })
+            # 간단한 요약 테이블 - 주문 내역 중심 (용량별 수량 컬럼을 한 번에 구성)
+            capacities = ['1.5L', '1L', '500ml', '240ml']
+            quantities = pd.DataFrame(
+                [order.get('quantities', {}) for order in box_e_orders], columns=capacities
+            ).fillna(0).astype(int)
+            details = quantities.apply(
+                lambda row: ", ".join(f"{capacity} {qty}개" for capacity, qty in row.items() if qty > 0), axis=1
+            )
+            summary_df = pd.concat([
+                pd.DataFrame({
+                    "주문 번호": [f"주문 {i}" for i in range(1, len(box_e_orders) + 1)],
+                    "수취인": [order.get('recipient', '알 수 없음') for order in box_e_orders],
+                    "주문 내역": details.where(details != "", "확인 필요"),
+                }),
+                quantities,
+            ], axis=1)
             
-            if summary_data:
-                st.markdown("#### 📋 박스 검토 주문 요약")
-                summary_df = pd.DataFrame(summary_data)
-                st.dataframe(summary_df, use_container_width=True)
+            st.markdown("#### 📋 박스 검토 주문 요약")
+            render_paginated_table(
+                summary_df, "box_review", search_columns=["수취인", "주문 내역"],
+                column_config={capacity: st.column_config.NumberColumn(capacity, format="%d개") for capacity in capacities}
+            )
         else:
             st.success("✅ **모든 주문이 일반 박스(A~D, F)로 처리 가능합니다!**")
     
@@ -1802,13 +1797,21 @@ with tab4:
     - ✅ 상세 주문 이력 시각화
     """)
     
+    # 고객 이력 저장소 상태
+    history_manifest = get_customer_history_manifest()
+    history_store_rows = history_manifest.get('total_rows', 0) if history_manifest else 0
+    if history_store_rows:
+        st.success(f"🗂️ 고객 이력 저장소: {len(history_manifest.get('shards', {}))}개 샤드, "
+                   f"주문 {history_store_rows:,}건 (마지막 업데이트 {history_manifest.get('updated_at', '-')}) "
+                   f"- 출고내역서만 업로드해도 분석할 수 있습니다.")
+    
     # 파일 업로드 섹션
     st.markdown("#### 📁 파일 업로드")
     
     col1, col2 = st.columns(2)
     
     with col1:
-        st.markdown("**1️⃣ 고객주문정보 파일 (.xlsx)**")
+        st.markdown("**1️⃣ 고객주문정보 파일 (.xlsx)**" + (" - 선택" if history_store_rows else ""))
         customer_history_file = st.file_uploader(
             "과거 고객 주문 이력이 담긴 엑셀 파일을 업로드하세요",
             type=['xlsx'],
@@ -1825,14 +1828,17 @@ with tab4:
             key="today_shipment_upload"
         )
     
-    # 두 파일이 모두 업로드되었을 때 분석 실행
-    if customer_history_file and shipment_file:
+    # 두 파일이 모두 업로드되었거나, 저장소에 이력이 있고 출고내역서가 업로드되었을 때 분석 실행
+    if shipment_file and (customer_history_file or history_store_rows):
         st.markdown("---")
         
         try:
             with st.spinner('🔄 고객 주문 데이터 분석 중...'):
                 # 분석 실행
-                analysis_results = analyze_customer_orders(customer_history_file, shipment_file)
+                analysis_results = get_customer_analysis(
+                    customer_history_file, shipment_file,
+                    f"{history_manifest.get('updated_at')}/{history_store_rows}" if history_manifest else None
+                )
                 
                 if analysis_results:
                     display_customer_analysis(analysis_results)
@@ -1866,6 +1872,8 @@ with tab4:
     
     elif customer_history_file or shipment_file:
         st.info("📋 두 파일을 모두 업로드해야 분석이 가능합니다.")
+        if customer_history_file:
+            st.info("💡 출고내역서와 함께 분석한 뒤 '고객주문정보 파일을 저장소로 가져오기'로 이력을 저장하면, 다음부터는 출고내역서만 업로드하면 됩니다.")
     
     else:
         st.markdown("#### 📝 파일 형식 가이드")
@@ -1921,7 +1929,14 @@ def cleanup_session():
     cleanup_keys = [
         'last_uploaded_file',
         'temp_data',
-        'processed_results'
+        'processed_results',
+        'excel_parse_cache',
+        'processed_uploads',
+        'published_uploads',
+        'upload_snapshots',
+        'customer_analysis_cache',
+        'upload_fingerprints',
+        'customer_history_manifest'
     ]
     
     for key in cleanup_keys:
@@ -1,7 +1,16 @@
 import os
 import gc
+import logging
 import streamlit as st
+import pandas as pd
 import psutil
+import plotly.graph_objects as go
+
+from config.settings import STAGE_PROFILE_LOG_PATH, STAGE_PROFILE_LOG_MAX_MB
+from core.profiling import StageProfiler, active_profiler
+
+# 세션에 보관하는 최근 프로파일 실행 수
+STAGE_PROFILE_HISTORY = 5
 
 def is_admin_mode():
     return st.session_state.get('admin_mode', False)
@@ -13,20 +22,92 @@ def force_garbage_collection():
     return collected
 
 class MemoryManager:
+    """이름 붙은 처리 단계 측정 - with MemoryManager("출고 현황 처리"): ...
+
+    다른 MemoryManager 안에서 열면 하위 단계로 기록합니다.
+    가장 바깥 단계가 끝나면 실행 기록을 JSON lines 로그에 남기고 메모리를 정리하며,
+    관리자 모드에서는 tracemalloc 최고 사용량까지 측정해 단계별 waterfall을 표시합니다.
+    """
+
+    def __init__(self, label):
+        self.label = label
+        self.profiler = None
+        self.record = None
+        self._stage = None
+        self._owner = False
+
     def __enter__(self):
-        self.initial_memory = self.get_memory_usage()
+        self.profiler = active_profiler()
+        self._owner = self.profiler is None
+        if self._owner:
+            self.profiler = StageProfiler(trace_memory=is_admin_mode())
+        self._stage = self.profiler.stage(self.label)
+        self.record = self._stage.__enter__()
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
+        self._stage.__exit__(exc_type, exc_val, exc_tb)
+        if not self._owner:
+            return False
+
+        # 측정이 끝난 뒤 정리 (정리 시간은 단계 시간에 포함하지 않음)
+        memory_before = self.get_memory_usage()
         collected = gc.collect()
+        memory_freed = memory_before - self.get_memory_usage()
+
+        try:
+            self.profiler.write_jsonl(STAGE_PROFILE_LOG_PATH, STAGE_PROFILE_LOG_MAX_MB * 1024 * 1024, run=self.label)
+        except OSError as e:
+            logging.warning(f"단계 프로파일 로그 저장 실패: {e}")
+
+        runs = st.session_state.setdefault('stage_profiles', [])
+        runs.append({'run_id': self.profiler.run_id, 'label': self.label, 'stages': self.profiler.to_frame()})
+        del runs[:-STAGE_PROFILE_HISTORY]
+
         if is_admin_mode():
-            final_memory = self.get_memory_usage()
-            memory_freed = self.initial_memory - final_memory
+            show_stage_profile(self.profiler, self.label)
             st.info(f"🧹 메모리 정리 완료! 해제된 메모리: {memory_freed:.2f} MB, 수집된 객체: {collected}")
-            
+
             if exc_type:
                 st.warning(f"⚠️ 예외 발생: {exc_type.__name__}: {exc_val}")
+        return False
 
     def get_memory_usage(self):
         process = psutil.Process(os.getpid())
         return process.memory_info().rss / (1024 * 1024)
+
+def stage_waterfall(stages):
+    """단계 기록 DataFrame(StageProfiler.to_frame()) → 시작 시각 기준 가로 막대 waterfall"""
+    labels = [f"{'　' * depth}{label}" for depth, label in zip(stages['depth'], stages['label'])]
+    hover = [
+        f"{path}<br>wall {wall:.3f}s · 자체 {self_s:.3f}s · cpu {cpu:.3f}s"
+        f"<br>RSS {rss:+.1f}MB" + (f" · peak {peak:.1f}MB" if pd.notna(peak) else "")
+        for path, wall, self_s, cpu, rss, peak in zip(
+            stages['path'], stages['wall_s'], stages['self_s'], stages['cpu_s'],
+            stages['rss_delta_mb'], stages['peak_mb']
+        )
+    ]
+    fig = go.Figure(go.Bar(
+        x=stages['wall_s'], base=stages['start_s'], y=list(range(len(stages))), orientation='h',
+        marker_color=stages['depth'], marker_colorscale='Blues_r', hovertext=hover, hoverinfo='text',
+        text=[f"{wall:.2f}s" for wall in stages['wall_s']], textposition='auto'
+    ))
+    fig.update_yaxes(tickmode='array', tickvals=list(range(len(stages))), ticktext=labels, autorange='reversed')
+    fig.update_layout(xaxis_title='경과 시간 (초)', height=max(240, 34 * len(stages) + 80), margin=dict(l=10, r=10, t=30, b=10))
+    return fig
+
+def show_stage_profile(profiler, title):
+    """단계별 waterfall과 경로별 합계 표시 (관리자 전용)"""
+    with st.expander(f"⏱️ 단계별 처리 프로파일 - {title} (관리자 전용)"):
+        st.plotly_chart(stage_waterfall(profiler.to_frame()), use_container_width=True)
+
+        summary = profiler.summary()
+        summary['path'] = ['　' * depth + path.rsplit(' / ', 1)[-1] for depth, path in zip(summary['depth'], summary['path'])]
+        st.dataframe(
+            summary.drop(columns='depth').rename(columns={
+                'path': '단계', 'calls': '횟수', 'wall_s': 'wall(초)', 'self_s': '자체(초)',
+                'cpu_s': 'CPU(초)', 'rss_delta_mb': 'RSS 변화(MB)', 'peak_mb': 'peak(MB)'
+            }).round(3),
+            hide_index=True, use_container_width=True
+        )
+        st.caption("자체 시간은 하위 단계를 뺀 시간입니다. peak는 tracemalloc 기준(파이썬/numpy 할당)이며 워커 프로세스 안의 처리는 측정되지 않습니다.")
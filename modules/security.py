@@ -1,18 +1,12 @@
-import json
-import base64
 import re
 import streamlit as st
-from cryptography.fernet import Fernet
+
+from core.crypto import encrypt_payload, decrypt_payload
 
 def encrypt_results(results):
     """집계 결과 암호화"""
     try:
-        key = st.secrets["encryption_key"]
-        f = Fernet(key.encode())
-        
-        json_str = json.dumps(results, ensure_ascii=False)
-        encrypted_data = f.encrypt(json_str.encode())
-        return base64.b64encode(encrypted_data).decode()
+        return encrypt_payload(results, st.secrets["encryption_key"])
     except Exception as e:
         st.error(f"암호화 중 오류: {e}")
         return None
@@ -20,12 +14,7 @@ def encrypt_results(results):
 def decrypt_results(encrypted_data):
     """암호화된 결과 복호화"""
     try:
-        key = st.secrets["encryption_key"]
-        f = Fernet(key.encode())
-        
-        decoded_data = base64.b64decode(encrypted_data.encode())
-        decrypted_data = f.decrypt(decoded_data)
-        return json.loads(decrypted_data.decode())
+        return decrypt_payload(encrypted_data, st.secrets["encryption_key"])
     except Exception as e:
         st.error(f"복호화 중 오류: {e}")
         return {}
@@ -83,30 +72,3 @@ def mask_customer_info(customer_info):
         'recipient_name': mask_name(customer_info.get('recipient_name', '')),
         'order_info': customer_info.get('order_info', '')
     }
-
-def find_matching_customer(daily_customer, customer_df):
-    """고객 정보 매칭 (이름 또는 연락처 기반)"""
-    for _, row in customer_df.iterrows():
-        # 이름 매칭
-        if row.get('name', '') == daily_customer['orderer_name']:
-            return row
-        
-        # 연락처 매칭 (뒤 4자리 비교)
-        if match_phone_number(row.get('phone', ''), daily_customer['orderer_phone']):
-            return row
-    
-    return None
-
-def match_phone_number(stored_phone, current_phone):
-    """전화번호 매칭 (개인정보 보호를 위해 뒤 4자리만 비교)"""
-    if not stored_phone or not current_phone:
-        return False
-    
-    # 숫자만 추출
-    stored_digits = re.sub(r'\D', '', str(stored_phone))
-    current_digits = re.sub(r'\D', '', str(current_phone))
-    
-    # 뒤 4자리 비교
-    return len(stored_digits) >= 4 and len(current_digits) >= 4 and \
-           stored_digits[-4:] == current_digits[-4:]
-
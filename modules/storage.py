@@ -1,15 +1,8 @@
-import base64
-import json
-import time
 import os
 import logging
 import pandas as pd
 import streamlit as st
-import requests
-from datetime import datetime, timezone, timedelta
-
-# 한국 시간대 설정
-KST = timezone(timedelta(hours=9))
+from datetime import datetime
 
 # 로깅 설정
 logging.basicConfig(
@@ -19,116 +12,43 @@ logging.basicConfig(
 )
 
 # 다른 모듈에서 가져오는 함수들
-from modules.security import encrypt_results, decrypt_results
-from config.settings import REPO_OWNER, REPO_NAME, SHIPMENT_FILE_PATH, BOX_FILE_PATH, STOCK_FILE_PATH
-
-def get_current_time_str() -> str:
-    """현재 한국 시간(KST)을 'YYYY-MM-DD HH:MM' 형식 문자열로 반환"""
-    return datetime.now(KST).strftime('%Y-%m-%d %H:%M')
-
+from config.settings import SHIPMENT_FILE_PATH, BOX_FILE_PATH, STOCK_FILE_PATH
+from core import storage as core_storage
+from core.events import EventLog
+from core.history_store import HistoryStore
+from core.storage import KST, get_current_time_str
+from modules.ui_utils import show_events
 
 def save_to_github(data, file_path, commit_message):
     """GitHub에 암호화된 데이터 저장 (공통 함수)"""
     try:
         github_token = st.secrets["github_token"]
-        url = f"https://api.github.com/repos/{REPO_OWNER}/{REPO_NAME}/contents/{file_path}"
-        
-        encrypted_data = encrypt_results(data)
-        if not encrypted_data:
-            return False
-        
-        data_package = {
-            'encrypted_data': encrypted_data,
-            'last_update': datetime.now(KST).isoformat(),
-            'timestamp': datetime.now(KST).timestamp()
-        }
-        
-        headers = {"Authorization": f"token {github_token}"}
-        
-        # 재시도 로직 추가
-        max_retries = 3
-        for attempt in range(max_retries):
-            try:
-                response = requests.get(url, headers=headers, timeout=30)
-                sha = response.json().get("sha") if response.status_code == 200 else None
-                
-                content = base64.b64encode(json.dumps(data_package, ensure_ascii=False, indent=2).encode()).decode()
-                
-                payload = {
-                    "message": commit_message,
-                    "content": content,
-                    "branch": "main"
-                }
-                
-                if sha:
-                    payload["sha"] = sha
-                
-                response = requests.put(url, headers=headers, json=payload, timeout=30)
-                
-                if response.status_code in [200, 201]:
-                    return True
-                else:
-                    st.warning(f"GitHub 저장 실패 (시도 {attempt + 1}/{max_retries}): {response.status_code}")
-                    
-            except requests.exceptions.RequestException as e:
-                st.warning(f"네트워크 오류 (시도 {attempt + 1}/{max_retries}): {str(e)}")
-                
-            if attempt < max_retries - 1:
-                time.sleep(2 ** attempt)  # 지수 백오프
-        
-        return False
-        
+        encryption_key = st.secrets["encryption_key"]
     except Exception as e:
         st.error(f"GitHub 저장 중 오류: {e}")
         return False
 
+    events = EventLog()
+    saved = core_storage.publish(data, file_path, commit_message, github_token, encryption_key, events)
+    show_events(events)
+    return saved
+
 def load_from_github(file_path):
-    """GitHub에서 암호화된 데이터 불러오기 (공통 함수) - 개선된 에러 처리"""
-    max_retries = 3
-    
-    for attempt in range(max_retries):
-        try:
-            github_token = st.secrets["github_token"]
-            url = f"https://api.github.com/repos/{REPO_OWNER}/{REPO_NAME}/contents/{file_path}"
-            
-            headers = {"Authorization": f"token {github_token}"}
-            response = requests.get(url, headers=headers, timeout=30)
-            
-            if response.status_code == 200:
-                content = response.json()["content"]
-                decoded_content = base64.b64decode(content).decode()
-                data = json.loads(decoded_content)
-                
-                encrypted_results = data.get('encrypted_data')
-                if encrypted_results:
-                    results = decrypt_results(encrypted_results)
-                    last_update_str = data.get('last_update')
-                    last_update = datetime.fromisoformat(last_update_str) if last_update_str else None
-                    return results, last_update
-                    
-            elif response.status_code == 404:
-                # 파일이 없는 경우 - 정상적인 상황
-                return {}, None
-            else:
-                # 다른 에러의 경우
-                if attempt == max_retries - 1 and st.session_state.get('admin_mode', False):
-                    st.warning(f"GitHub 데이터 로드 실패: {response.status_code}")
-                    
-        except requests.exceptions.RequestException as e:
-            if attempt == max_retries - 1:
-                logging.error(f"네트워크 오류로 인한 데이터 로드 실패: {str(e)}")
-                if st.session_state.get('admin_mode', False):
-                    st.warning(f"네트워크 오류로 인한 데이터 로드 실패: {str(e)}")
-        except Exception as e:
-            if attempt == max_retries - 1:
-                logging.error(f"GitHub 데이터 로드 중 오류: {str(e)}")
-                if st.session_state.get('admin_mode', False):
-                    st.error(f"GitHub 데이터 로드 중 오류: {str(e)}")
-        
-        if attempt < max_retries - 1:
-            time.sleep(1)  # 재시도 전 대기
-    
-    return {}, None
+    """GitHub에서 암호화된 데이터 불러오기 (공통 함수) - 오류 메시지는 관리자에게만 표시"""
+    try:
+        github_token = st.secrets["github_token"]
+        encryption_key = st.secrets["encryption_key"]
+    except Exception as e:
+        logging.error(f"GitHub 데이터 로드 중 오류: {str(e)}")
+        if st.session_state.get('admin_mode', False):
+            st.error(f"GitHub 데이터 로드 중 오류: {str(e)}")
+        return {}, None
+
+    events = EventLog()
+    results, last_update = core_storage.fetch(file_path, github_token, encryption_key, events)
+    if st.session_state.get('admin_mode', False):
+        show_events(events)
+    return results, last_update
 
 def save_shipment_data(results):
     """출고 현황 데이터 저장"""
@@ -157,6 +77,61 @@ def load_stock_data():
     """재고 현황 데이터 불러오기"""
     return load_from_github(STOCK_FILE_PATH)
 
+def load_upload_log():
+    """처리 완료된 업로드 기록 불러오기 (파일 지문 → 처리 결과) - 오류 메시지는 관리자에게만 표시"""
+    credentials = github_credentials()
+    if credentials is None:
+        return {}
+
+    events = EventLog()
+    uploads = core_storage.load_upload_log(*credentials, events)
+    if st.session_state.get('admin_mode', False):
+        show_events(events)
+    return uploads
+
+def record_processed_upload(fingerprint, outcome):
+    """출고 현황/박스 계산이 모두 저장된 업로드의 지문 기록 (최근 파일만 보관)"""
+    credentials = github_credentials()
+    if credentials is None:
+        st.error("❌ GitHub 저장 정보(토큰/암호화 키)를 찾을 수 없습니다.")
+        return False
+
+    events = EventLog()
+    saved = core_storage.record_upload(fingerprint, outcome, *credentials, events)
+    show_events(events)
+    return saved
+
+def github_credentials():
+    """GitHub 저장 정보 (토큰, 암호화 키) - st.secrets에 없으면 None"""
+    try:
+        return st.secrets["github_token"], st.secrets["encryption_key"]
+    except Exception as e:
+        logging.error(f"GitHub 저장 정보 확인 중 오류: {str(e)}")
+        return None
+
+def open_customer_history_store():
+    """고객 이력 저장소 (st.secrets의 토큰/키 사용) - 비밀 값이 없으면 None"""
+    credentials = github_credentials()
+    return HistoryStore(*credentials) if credentials is not None else None
+
+def load_customer_history_manifest():
+    """고객 이력 저장소 목록 (샤드별 행 수) 불러오기 - 저장소를 쓸 수 없으면 {}"""
+    store = open_customer_history_store()
+    if store is None:
+        return {}
+    manifest = store.manifest()
+    show_events(store.events)
+    return manifest
+
+def load_customer_history(names, phones):
+    """오늘 고객과 매칭될 수 있는 샤드의 이력만 불러오기 - (이력 DataFrame, 불러온 샤드 수, 저장소 모드에서 신규 고객으로 확인된 수)"""
+    store = open_customer_history_store()
+    if store is None:
+        return None, 0, 0
+    history_df, shard_count, new_count = store.load_for_customers(names, phones)
+    show_events(store.events)
+    return history_df, shard_count, new_count
+
 def get_stock_product_keys():
     """재고 관리용 상품 키 목록 생성 (출고 현황과 동기화)"""
     shipment_results, _ = load_shipment_data()
@@ -1,6 +1,12 @@
 # 🎨 CSS 스타일 적용 - 가독성 향상
+import math
+
+import pandas as pd
 import streamlit as st
 
+# 긴 목록 표의 페이지당 행 수 선택지
+TABLE_PAGE_SIZES = [25, 50, 100]
+
 def apply_custom_styles():
     """스트림릿 CSS 사용자 정의 스타일 적용"""
     st.markdown("""
@@ -175,3 +181,50 @@ def render_metric_card(title, value, background_gradient, font_color="#ffffff"):
         </div>
     </div>
     """
+
+def show_events(events):
+    """코어 처리 이벤트(EventLog)를 수준에 맞는 Streamlit 메시지로 표시"""
+    for level, message in events:
+        getattr(st, level)(message)
+
+#긴 목록 표 렌더링 함수
+def render_paginated_table(df, key, search_columns=(), column_config=None, selectable=False):
+    """검색과 페이지 나누기를 서버에서 처리하고 현재 페이지만 하나의 st.dataframe으로 표시
+
+    목록이 길어져도 브라우저로 보내는 행은 한 페이지 분량뿐입니다.
+    selectable=True면 행 하나를 선택할 수 있고, 선택한 행의 원본 인덱스를 반환합니다 (없으면 None).
+    """
+    col1, col2, col3 = st.columns([3, 1, 1])
+    with col1:
+        query = st.text_input("🔍 검색", key=f"{key}_search", placeholder=", ".join(search_columns)) if search_columns else ""
+    with col2:
+        page_size = st.selectbox("페이지당 행 수", TABLE_PAGE_SIZES, key=f"{key}_page_size")
+
+    if query and query.strip():
+        matched = pd.Series(False, index=df.index)
+        for column in search_columns:
+            matched |= df[column].astype(str).str.contains(query.strip(), case=False, regex=False)
+        df = df[matched]
+
+    # 검색 결과가 줄어 현재 페이지가 범위를 벗어나면 마지막 페이지로
+    page_count = max(1, math.ceil(len(df) / page_size))
+    page_key = f"{key}_page"
+    if st.session_state.get(page_key, 1) > page_count:
+        st.session_state[page_key] = page_count
+    with col3:
+        page = st.number_input("페이지", min_value=1, max_value=page_count, step=1, key=page_key)
+
+    start = (int(page) - 1) * page_size
+    page_df = df.iloc[start:start + page_size]
+    st.caption(f"총 {len(df):,}건 중 {min(start + 1, len(df)):,}~{start + len(page_df):,}번째")
+
+    if not selectable:
+        st.dataframe(page_df, column_config=column_config, use_container_width=True, hide_index=True)
+        return None
+
+    event = st.dataframe(
+        page_df, column_config=column_config, use_container_width=True, hide_index=True,
+        key=f"{key}_table", on_select="rerun", selection_mode="single-row"
+    )
+    rows = event.selection.rows if event is not None else []
+    return page_df.index[rows[0]] if rows and rows[0] < len(page_df) else None
@@ -0,0 +1,97 @@
+# tests/test_aggregation.py
+"""수정 재업로드 증분 집계 - 청크 단위 증분 결과가 전체 재집계와 같은지 확인"""
+import io
+import random
+
+import pandas as pd
+import pytest
+
+from core.aggregation import snapshot_excel_file
+
+OPTION_SAMPLES = [
+    ("[서로 단호박식혜]", "단호박식혜 1.5L 2병"),
+    ("[서로 진하고 깊은 식혜]", "10개, 240ml"),
+    ("[서로 수정과]", "500ml 3병"),
+    ("[서로 플레인 쌀요거트]", "5개, 200ml"),
+]
+
+# 작은 청크로 읽어 같은 수취인/같은 행이 여러 청크에 걸치게 함
+CHUNK_ROWS = 37
+
+
+def order_rows(count, seed):
+    rng = random.Random(seed)
+    rows = []
+    for index in range(count):
+        product_name, option_name = rng.choice(OPTION_SAMPLES)
+        rows.append({
+            '상품이름': product_name,
+            '옵션이름': option_name,
+            '상품수량': rng.choice([1, 1, 2]),
+            '수취인이름': f"수취인{index % 60:02d}",
+        })
+    return pd.DataFrame(rows)
+
+
+def to_xlsx(df):
+    buffer = io.BytesIO()
+    df.to_excel(buffer, index=False)
+    return buffer.getvalue()
+
+
+def assert_same_aggregate(incremental, full):
+    assert incremental.aggregate.row_count == full.aggregate.row_count
+    assert list(incremental.aggregate.shipment_totals.items()) == list(full.aggregate.shipment_totals.items())
+    pd.testing.assert_frame_equal(
+        incremental.aggregate.recipient_orders().astype(str), full.aggregate.recipient_orders().astype(str)
+    )
+    assert (incremental.fingerprints == full.fingerprints).all()
+
+
+def edited(df):
+    """수량 수정, 행 삭제, 같은 행 중복 추가, 수취인 변경"""
+    df = df.copy()
+    df.loc[3, '상품수량'] = 7
+    df.loc[50, '수취인이름'] = '새수취인'
+    df = df.drop(index=[10, 11, 120])
+    return pd.concat([df, df.iloc[[0, 0, 40]]], ignore_index=True)
+
+
+@pytest.fixture
+def original():
+    return order_rows(200, seed=1)
+
+
+def test_reupload_matches_full_aggregation(original):
+    previous = snapshot_excel_file(to_xlsx(original), chunk_rows=CHUNK_ROWS).retained()
+    data = to_xlsx(edited(original))
+
+    incremental = snapshot_excel_file(data, previous, chunk_rows=CHUNK_ROWS)
+    full = snapshot_excel_file(data, chunk_rows=CHUNK_ROWS)
+
+    assert incremental.incremental and not full.incremental
+    # 수정 2행 + 중복 3행이 추가, 수정 전 2행 + 삭제 3행이 빠짐
+    assert (incremental.added_rows, incremental.removed_rows) == (5, 5)
+    assert_same_aggregate(incremental, full)
+
+
+def test_unchanged_reupload_adds_nothing(original):
+    data = to_xlsx(original)
+    previous = snapshot_excel_file(data, chunk_rows=CHUNK_ROWS).retained()
+
+    incremental = snapshot_excel_file(data, previous, chunk_rows=CHUNK_ROWS)
+
+    assert (incremental.added_rows, incremental.removed_rows) == (0, 0)
+    assert_same_aggregate(incremental, snapshot_excel_file(data, chunk_rows=CHUNK_ROWS))
+
+
+def test_repeated_reuploads_chain_from_retained_snapshot(original):
+    snapshot = snapshot_excel_file(to_xlsx(original), chunk_rows=CHUNK_ROWS).retained()
+    current = original
+    for _ in range(3):
+        current = edited(current)
+        data = to_xlsx(current)
+        incremental = snapshot_excel_file(data, snapshot, chunk_rows=CHUNK_ROWS)
+        assert_same_aggregate(incremental, snapshot_excel_file(data, chunk_rows=CHUNK_ROWS))
+        snapshot = incremental.retained()
+    assert '수취인이름' not in snapshot.orders.columns and snapshot.aggregate is None
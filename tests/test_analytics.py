@@ -0,0 +1,36 @@
+# tests/test_analytics.py
+"""고객 이력 분석 - RFM 점수/세그먼트"""
+import pandas as pd
+
+from core.analytics import rfm_scores
+
+
+def orders_frame(purchases):
+    """[(고객 번호, 주문일)] → 분석용 주문 프레임"""
+    return pd.DataFrame({
+        'customer': [customer for customer, _ in purchases],
+        'order_date': pd.to_datetime([date for _, date in purchases]),
+        'amount': 15000.0,
+        'product': '수정과 500ml',
+    })
+
+
+def test_one_time_buyers_get_lowest_frequency_score_when_they_are_the_majority():
+    # 고객 0~79: 한 번 구매 (동점 다수), 고객 80~99: 여러 번 구매
+    purchases = [(customer, '2025-01-10') for customer in range(80)]
+    purchases += [(customer, f'2025-01-{day:02d}') for customer in range(80, 100) for day in range(1, 3 + customer % 5)]
+    rfm = rfm_scores(orders_frame(purchases), as_of='2025-01-10')
+
+    one_time = rfm[rfm['frequency'] == 1]
+    assert len(one_time) > len(rfm) / 2
+    assert (one_time['F'] == 1).all()
+    assert not one_time['segment'].isin(["VIP", "충성 고객", "이탈 위험"]).any()
+    assert (one_time['segment'] == "최근 고객").all()
+
+
+def test_frequency_score_uses_purchase_day_thresholds():
+    purchases = [(days, f'2025-01-{day:02d}') for days in (1, 2, 3, 5, 8) for day in range(1, days + 1)]
+    rfm = rfm_scores(orders_frame(purchases), as_of='2025-01-10')
+
+    assert rfm.sort_values('frequency')['F'].tolist() == [1, 2, 3, 4, 5]
+    assert (rfm.loc[rfm['frequency'] >= 3, 'segment'] != "휴면 고객").all()
@@ -0,0 +1,85 @@
+# tests/test_boxes.py
+"""박스 계산 - 단일 용량 분할(박스 수 → 비용 최소), 수량 벡터 분할, 수취인별 박스 합계"""
+from functools import lru_cache
+
+import pandas as pd
+import pytest
+
+from config.constants import BOX_RULES, BOX_COST_ORDER
+from core.boxes import BOX_CAPACITIES, _pack_single_capacity, pack_quantity_vector, calculate_box_requirements
+
+
+def box_score(boxes):
+    """(박스 수, 비용 합)"""
+    return len(boxes), sum(BOX_COST_ORDER[name] for name in boxes)
+
+
+def brute_force_score(capacity, qty):
+    """박스 조합을 모두 따져 본 최소 (박스 수, 비용) - 분할할 수 없으면 None"""
+    sizes = [
+        (box_name, size) for box_name, ranges in BOX_RULES.items() if capacity in ranges
+        for size in range(ranges[capacity][0], ranges[capacity][1] + 1)
+    ]
+
+    @lru_cache(maxsize=None)
+    def best(remaining):
+        if remaining == 0:
+            return (0, 0)
+        options = [
+            (sub[0] + 1, sub[1] + BOX_COST_ORDER[box_name])
+            for box_name, size in sizes if size <= remaining
+            for sub in [best(remaining - size)] if sub is not None
+        ]
+        return min(options) if options else None
+
+    return best(qty)
+
+
+@pytest.mark.parametrize('capacity, qty, expected', [
+    ('1L', 1, ('박스 A',)),
+    ('1L', 7, ('박스 B', '박스 B')),
+    ('240ml', 12, ('박스 A', '박스 B')),
+    ('500ml', 10, ('박스 C',)),
+    ('1.5L', 5, ('박스 E', '박스 F')),
+    ('1L', 0, ()),
+])
+def test_single_capacity_pins_box_choice(capacity, qty, expected):
+    assert _pack_single_capacity(capacity, qty) == expected
+
+
+def test_single_capacity_is_minimal_and_matches_uncached():
+    _pack_single_capacity.cache_clear()
+    for capacity in BOX_CAPACITIES:
+        for qty in range(1, 31):
+            cached = _pack_single_capacity(capacity, qty)
+            assert cached == _pack_single_capacity.__wrapped__(capacity, qty)
+            expected = brute_force_score(capacity, qty)
+            assert (box_score(cached) if cached is not None else None) == expected
+
+
+def test_unknown_capacity_cannot_be_packed():
+    assert _pack_single_capacity('2L', 3) is None
+
+
+def test_quantity_vector_combines_capacities():
+    pack_quantity_vector.cache_clear()
+    vector = (0, 7, 10, 12)
+    expected = (('박스 A', 1), ('박스 B', 3), ('박스 C', 1))
+    assert pack_quantity_vector(vector) == expected
+    assert pack_quantity_vector(vector) == pack_quantity_vector.__wrapped__(vector) == expected
+    assert pack_quantity_vector((0, 0, 0, 0)) is None
+
+
+def test_box_requirements_per_recipient_and_review_orders():
+    orders = pd.DataFrame({
+        '상품이름': ['[서로 진하고 깊은 식혜]', '[서로 진하고 깊은 식혜]', '[서로 플레인 쌀요거트]', '선물세트'],
+        '옵션이름': ['10개, 240ml', '4, 1L', '5개, 200ml', '구성 선택'],
+        '상품수량': [1, 1, 1, 1],
+        '수취인이름': ['가', '가', '나', '다'],
+    })
+
+    total_boxes, review_orders = calculate_box_requirements(orders)
+
+    # 가: 1L 4개(박스 B) + 240ml 10개(박스 B), 나: 200ml은 240ml로 5개(박스 A), 다: 용량을 알 수 없어 검토 대상
+    assert dict(total_boxes) == {'박스 B': 2, '박스 A': 1}
+    assert review_orders == [{'recipient': '다', 'quantities': {}, 'products': {'기타': 1}}]
@@ -0,0 +1,61 @@
+# tests/test_cache.py
+"""세션 캐시 - 만료/개수 제한과 암호화 보관"""
+import pickle
+
+import pandas as pd
+
+from core.cache import EncryptedCache, TimedCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_timed_cache_expires_entries_not_used_within_ttl():
+    clock = FakeClock()
+    cache = TimedCache(ttl_seconds=60, max_entries=4, clock=clock)
+    cache['a'] = 1
+    cache['b'] = 2
+
+    clock.now = 50
+    assert cache['a'] == 1  # 조회하면 만료 시간이 연장됨
+    clock.now = 100
+    assert 'a' in cache and 'b' not in cache
+    assert len(cache) == 1
+
+
+def test_timed_cache_drops_least_recently_used_over_max_entries():
+    cache = TimedCache(ttl_seconds=60, max_entries=2, clock=FakeClock())
+    cache['a'] = 1
+    cache['b'] = 2
+    cache['a']
+    cache['c'] = 3
+    assert list(cache) == ['a', 'c']
+
+
+def test_encrypted_cache_round_trip_and_expiry():
+    clock = FakeClock()
+    cache = EncryptedCache(ttl_seconds=60, clock=clock)
+    shared = pd.DataFrame({'주문자이름': ['김민수']})
+    cache.put('key', {'reorder_customers': ['김민수']}, shared=shared)
+
+    result, returned_shared = cache.get('key')
+    assert result == {'reorder_customers': ['김민수']}
+    assert returned_shared is shared
+
+    clock.now = 61
+    assert cache.get('key') == (None, None)
+    assert cache.evict_expired() == 0 and len(cache) == 0
+
+
+def test_encrypted_cache_keeps_key_and_plaintext_out_of_the_object():
+    cache = EncryptedCache(ttl_seconds=60)
+    cache.put('key', {'name': '김민수'})
+
+    dumped = pickle.dumps(cache._entries)
+    assert '김민수'.encode() not in dumped
+    assert not any(hasattr(value, 'encrypt') for value in vars(cache).values())
@@ -0,0 +1,189 @@
+# tests/test_history_store.py
+"""고객 이력 저장소 - GitHub 대신 메모리 저장소로 샤드/필터/색인 동작 확인"""
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+from cryptography.fernet import Fernet
+
+import core.history_store as history_store
+from core.customers import match_and_analyze_customers
+from core.crypto import encrypt_payload, decrypt_payload
+
+
+@pytest.fixture
+def remote(monkeypatch):
+    """암호화된 파일을 메모리에 보관하는 가짜 GitHub 저장소 - {'files': {경로: 암호문}, 'commits': 커밋 수}"""
+    remote = {'files': {}, 'commits': 0}
+
+    def fetch(path, token, key, events=None):
+        if path not in remote['files']:
+            return {}, None
+        return decrypt_payload(remote['files'][path], key), None
+
+    def publish_files(files, commit_message, token, key, events=None):
+        remote['commits'] += 1
+        for path, data in files.items():
+            if data is None:
+                del remote['files'][path]
+            else:
+                remote['files'][path] = encrypt_payload(json.loads(json.dumps(data)), key)
+        return True
+
+    monkeypatch.setattr(history_store, 'fetch', fetch)
+    monkeypatch.setattr(history_store, 'publish_files', publish_files)
+    return remote
+
+
+@pytest.fixture
+def key():
+    return Fernet.generate_key().decode()
+
+
+def korean_names(count, seed):
+    """겹치지 않는 세 음절 한글 이름 count개"""
+    rng = np.random.default_rng(seed)
+    codes = rng.choice(11172 ** 2, size=count, replace=False)
+    surnames = rng.choice(list('김이박최정강조윤장임'), size=count)
+    return [f"{surname}{chr(0xAC00 + code // 11172)}{chr(0xAC00 + code % 11172)}" for surname, code in zip(surnames, codes)]
+
+
+def history_rows(names, phones, date='2025-01-01'):
+    return pd.DataFrame({
+        '주문일시': date,
+        '주문자이름': names,
+        '주문자전화번호': phones,
+        '상품이름': '[서로 수정과]',
+        '상품수량': 1,
+        '상품결제금액': 15000,
+        '수취인이름': names,
+        '옵션이름': '500ml 3병',
+    })
+
+
+def random_phones(count, seed):
+    rng = np.random.default_rng(seed)
+    return [f"010-{a:04d}-{b:04d}" for a, b in zip(rng.integers(1000, 10000, count), rng.integers(0, 10000, count))]
+
+
+def test_append_stores_each_row_once_in_one_commit(remote, key):
+    names = korean_names(500, seed=1)
+    store = history_store.HistoryStore('token', key, shard_count=8)
+
+    assert store.append(history_rows(names, random_phones(500, seed=2)), '테스트')
+
+    assert remote['commits'] == 1
+    manifest = history_store.HistoryStore('token', key).manifest()
+    assert manifest['total_rows'] == 500
+    assert len(history_store.HistoryStore('token', key).load_all()) == 500
+
+
+def test_new_customer_false_positive_rate_with_realistic_history(remote, key):
+    stored_names = korean_names(22000, seed=3)
+    history_names, new_names = stored_names[:20000], stored_names[20000:]
+    history_phones = random_phones(20000, seed=4)
+    store = history_store.HistoryStore('token', key)
+    assert store.append(history_rows(history_names, history_phones), '테스트')
+
+    # 전화번호 뒤 4자리는 거의 모두 이미 저장되어 있어도 이름이 처음인 고객은 신규 고객으로 판별
+    fresh = history_store.HistoryStore('token', key)
+    possible = fresh.possibly_returning(pd.Series(new_names), pd.Series(random_phones(2000, seed=5)))
+    assert possible.mean() < 0.01
+    assert fresh.possibly_returning(pd.Series(history_names[:2000]), pd.Series(history_phones[:2000])).all()
+
+
+def test_store_mode_matches_spacing_and_typo_variants(remote, key):
+    names = korean_names(300, seed=7) + ['김철수', '박영희']
+    phones = random_phones(300, seed=8) + ['010-1111-2222', '010-3333-4444']
+    history = history_rows(names, phones)
+    store = history_store.HistoryStore('token', key, shard_count=8)
+    assert store.append(history, '테스트')
+
+    # 띄어쓰기만 다른 이름, 마지막 음절 오타 + 같은 전화번호
+    today = pd.DataFrame({
+        '주문자이름': ['김 철수', '박영휘'],
+        '주문자전화번호1': ['010-9999-2222', '010-3333-4444'],
+        '수취인이름': ['김 철수', '박영휘'],
+        '상품이름': '[서로 수정과]',
+        '옵션이름': '500ml 3병',
+        '상품수량': 1,
+        '상품결제금액': 15000,
+    })
+    loaded, _, new_count = history_store.HistoryStore('token', key).load_for_customers(
+        today['주문자이름'], today['주문자전화번호1']
+    )
+
+    assert new_count == 0
+    expected = match_and_analyze_customers(history_store.to_history_rows(history), today)
+    assert len(expected['reorder_customers']) == 2
+    assert match_and_analyze_customers(loaded, today) == expected
+
+
+def test_daily_lookup_and_append_touch_few_shards(remote, key):
+    # 이력 5만 건 저장소에 오늘 고객 2,000명 (재주문 200명)
+    names = korean_names(52000, seed=12)
+    phones = random_phones(52000, seed=13)
+    store = history_store.HistoryStore('token', key)
+    assert store.append(history_rows(names[:50000], phones[:50000]), '테스트')
+    shard_count = store.manifest()['shard_count']
+    assert shard_count >= 1024
+
+    today_names = names[:200] + names[50000:51800]
+    today_phones = phones[:200] + phones[50000:51800]
+    fresh = history_store.HistoryStore('token', key)
+    loaded, loaded_shards, new_count = fresh.load_for_customers(pd.Series(today_names), pd.Series(today_phones))
+    assert loaded_shards / shard_count < 0.15
+    assert new_count >= 1790
+    assert set(names[:200]) <= set(loaded['주문자이름'])
+
+    # 저장할 때는 오늘 행이 들어간 샤드만 다시 씀
+    written = {}
+    original_publish = history_store.publish_files
+
+    def counting_publish(files, *args, **kwargs):
+        written.update(files)
+        return original_publish(files, *args, **kwargs)
+
+    history_store.publish_files = counting_publish
+    try:
+        assert fresh.append(history_rows(today_names, today_phones, date='2025-02-01'), '테스트')
+    finally:
+        history_store.publish_files = original_publish
+    shard_files = [path for path in written if '/shard_' in path]
+    assert len(shard_files) <= len(set(today_phones))
+    assert all(data is not None for data in written.values())
+    assert history_store.HistoryStore('token', key).manifest()['total_rows'] == 52000
+
+
+def test_append_skips_unchanged_shards(remote, key):
+    names = korean_names(100, seed=14)
+    phones = random_phones(100, seed=15)
+    store = history_store.HistoryStore('token', key, shard_count=16)
+    assert store.append(history_rows(names, phones), '테스트')
+    before = dict(remote['files'])
+
+    # 이미 저장된 주문을 다시 저장하면 샤드 파일은 그대로
+    assert history_store.HistoryStore('token', key).append(history_rows(names[:10], phones[:10]), '테스트')
+    assert all(remote['files'][path] == data for path, data in before.items() if '/shard_' in path)
+
+
+def test_append_repartitions_previous_layout(remote, key):
+    names = korean_names(200, seed=9)
+    store = history_store.HistoryStore('token', key, shard_count=8)
+    assert store.append(history_rows(names, random_phones(200, seed=10)), '테스트')
+
+    # 이전 형식 저장소 - 목록에 형식 표시가 없고 샤드 수가 다름
+    manifest = history_store.HistoryStore('token', key).manifest()
+    old_shard_paths = {store.shard_path(int(shard_id)) for shard_id in manifest['shards']}
+    remote['files'][store.manifest_path] = encrypt_payload({**manifest, 'layout': None, 'shard_count': 8}, key)
+
+    upgraded = history_store.HistoryStore('token', key, shard_count=4)
+    assert upgraded.append(history_rows(names[:10], random_phones(10, seed=11), date='2025-02-01'), '테스트')
+
+    manifest = history_store.HistoryStore('token', key).manifest()
+    assert manifest['shard_count'] == 4 and manifest['layout'] == history_store.STORE_LAYOUT
+    assert manifest['total_rows'] == 210
+    stale_paths = old_shard_paths - {upgraded.shard_path(shard_id) for shard_id in range(4)}
+    assert stale_paths and not stale_paths & remote['files'].keys()
+    assert len(history_store.HistoryStore('token', key).load_all()) == 210
@@ -0,0 +1,61 @@
+# tests/test_matching.py
+"""고객 매칭 - 이름 유사도 + 전화번호 뒤 4자리 신뢰도"""
+import pandas as pd
+import pytest
+
+import core.matching as matching
+from core.matching import MATCH_THRESHOLD, match_identities, name_similarity, normalize_names
+from core.pii import CustomerKeys
+
+
+def matched_pairs(today, history):
+    """[(이름, 전화번호)] 두 목록 → 매칭된 (오늘 고객 순번, 이력 행) 집합"""
+    today_keys = CustomerKeys.from_columns(pd.Series([n for n, _ in today]), pd.Series([p for _, p in today]))
+    history_keys = CustomerKeys.from_columns(pd.Series([n for n, _ in history]), pd.Series([p for _, p in history]))
+    matches = match_identities(today_keys, history_keys)
+    return set(zip(matches['customer'], matches['row']))
+
+
+def test_same_name_with_conflicting_last4_is_a_different_customer():
+    assert matched_pairs([('김민수', '010-1111-2222')], [('김민수', '010-3333-4444')]) == set()
+
+
+def test_same_name_matches_when_a_phone_is_missing():
+    assert matched_pairs([('김민수', '010-1111-2222')], [('김민수', '')]) == {(0, 0)}
+    assert matched_pairs([('김민수', None)], [('김민수', '010-3333-4444')]) == {(0, 0)}
+
+
+def test_one_syllable_typo_matches_only_with_the_same_last4():
+    assert name_similarity('이영희', '이영이') < MATCH_THRESHOLD
+    assert matched_pairs([('이영이', '010-5555-6666')], [('이영희', '010-7777-6666')]) == {(0, 0)}
+    assert matched_pairs([('이영이', '010-5555-6666')], [('이영희', '')]) == set()
+
+
+def test_spacing_and_case_variants_normalize_to_the_same_name():
+    names = normalize_names(pd.Series(['김 철수', ' 김철수 ', 'Kim Chulsoo', 'kimchulsoo']))
+    assert names.tolist() == ['김철수', '김철수', 'kimchulsoo', 'kimchulsoo']
+    assert matched_pairs([('김 철수', '010-1111-2222')], [('김철수', '010-9999-2222')]) == {(0, 0)}
+
+
+@pytest.mark.parametrize('today, history', [
+    (('박서준', '010-1234-5678'), ('최서준', '010-1234-5678')),
+    (('이민호', '010-1234-5678'), ('이민지', '010-8765-4321')),
+])
+def test_different_customers_do_not_match(today, history):
+    assert matched_pairs([today], [history]) == set()
+
+
+def test_unique_key_copies_are_wiped_after_matching(monkeypatch):
+    wiped = []
+    original_wipe = matching.wipe_buffer
+
+    def recording_wipe(buffer):
+        original_wipe(buffer)
+        wiped.append(buffer)
+
+    monkeypatch.setattr(matching, 'wipe_buffer', recording_wipe)
+    assert matched_pairs([('김민수', '010-1111-2222')], [('김민수', '010-9999-2222'), ('박영희', '')]) == {(0, 0)}
+
+    # 오늘/이력 각각 고유 이름, 이름 코드, 고유 뒤 4자리, 뒤 4자리 코드
+    assert len(wiped) == 8
+    assert all(not buffer.view('uint8').any() for buffer in wiped)
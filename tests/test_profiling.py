@@ -0,0 +1,36 @@
+# tests/test_profiling.py
+"""단계 프로파일러 - JSON lines 로그 기록과 크기 제한 교체"""
+import json
+
+from core.profiling import StageProfiler
+
+
+def profiled_run():
+    profiler = StageProfiler()
+    with profiler.stage('전체'):
+        with profiler.stage('집계'):
+            pass
+    return profiler
+
+
+def test_write_jsonl_creates_directory_and_rotates_at_size_cap(tmp_path):
+    path = tmp_path / 'logs' / 'stage_profile.jsonl'
+
+    profiled_run().write_jsonl(str(path), 1, run='첫 실행')
+    first = [json.loads(line) for line in path.read_text(encoding='utf-8').splitlines()]
+    assert [record['label'] for record in first] == ['전체', '집계']
+    assert first[0]['run'] == '첫 실행'
+
+    # 크기 제한을 넘은 파일은 .1로 옮기고 새 파일에 기록
+    profiled_run().write_jsonl(str(path), 1, run='두 번째 실행')
+    rotated = path.with_name('stage_profile.jsonl.1')
+    assert rotated.read_text(encoding='utf-8').count('\n') == 2
+    assert json.loads(path.read_text(encoding='utf-8').splitlines()[0])['run'] == '두 번째 실행'
+
+
+def test_write_jsonl_appends_below_size_cap(tmp_path):
+    path = tmp_path / 'stage_profile.jsonl'
+    profiled_run().write_jsonl(str(path), 1024 * 1024)
+    profiled_run().write_jsonl(str(path), 1024 * 1024)
+    assert path.read_text(encoding='utf-8').count('\n') == 4
+    assert not path.with_name('stage_profile.jsonl.1').exists()
@@ -0,0 +1,56 @@
+# tests/test_report.py
+"""보고서 파일 - 청크를 흘려 쓴 xlsx/csv/parquet이 원본 행과 같은지 확인"""
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.report import export_frames
+
+COLUMNS = ['주문일시', '주문자이름', '상품수량', '상품결제금액']
+
+
+def chunks():
+    yield pd.DataFrame({
+        '주문일시': ['2025-01-01', '2025-01-02'],
+        '주문자이름': ['김민수', None],
+        '상품수량': [1, 2],
+        '상품결제금액': [15000.0, np.nan],
+    })
+    yield pd.DataFrame({
+        '주문일시': ['2025-01-03'],
+        '주문자이름': ['이영희'],
+        '상품수량': [3],
+        '상품결제금액': [30000.0],
+    })
+
+
+def read_back(data, fmt):
+    if fmt == 'xlsx':
+        return pd.read_excel(io.BytesIO(data), engine='openpyxl')
+    if fmt == 'csv':
+        return pd.read_csv(io.BytesIO(data), encoding='utf-8-sig')
+    return pd.read_parquet(io.BytesIO(data))
+
+
+@pytest.mark.parametrize('fmt', ['xlsx', 'csv', 'parquet'])
+def test_export_writes_all_chunks_in_order(fmt):
+    frame = read_back(export_frames(chunks(), fmt, '고객주문정보'), fmt)
+
+    assert list(frame.columns) == COLUMNS
+    assert frame['주문일시'].astype(str).tolist() == ['2025-01-01', '2025-01-02', '2025-01-03']
+    assert frame['주문자이름'].tolist()[0] == '김민수' and pd.isna(frame['주문자이름'].tolist()[1])
+    assert frame['상품수량'].astype(float).tolist() == [1.0, 2.0, 3.0]
+    assert pd.isna(frame['상품결제금액'].iloc[1]) and frame['상품결제금액'].iloc[2] == 30000
+
+
+@pytest.mark.parametrize('fmt', ['xlsx', 'csv', 'parquet'])
+def test_export_without_chunks_writes_header_only(fmt):
+    frame = read_back(export_frames(iter(()), fmt, '고객주문정보', columns=COLUMNS), fmt)
+    assert list(frame.columns) == COLUMNS and len(frame) == 0
+
+
+def test_export_rejects_unknown_format():
+    with pytest.raises(ValueError):
+        export_frames(chunks(), 'json', '고객주문정보')